@@ -16,6 +16,10 @@ from PIL import Image, ImageTk
 import shutil
 from pathlib import Path
 import json
+from logic.prediction_cache import PredictionCache
+from logic.frame_cache import FrameCache
+from logic.folder_index import FolderIndex
+from logic import materialize
 
 # Configuration - adjust these paths to match your project structure
 model_path = "yolo11x.pt"
@@ -24,6 +28,9 @@ output_img_folder = r"F:/data/annotated_images"
 output_label_folder = r"F:/data/annotated_labels"
 delete_folder = r"F:/data/deleted"
 enable_delete_mode = True
+prediction_cache_path = "config/prediction_cache.sqlite"
+frame_cache_mb = 512  # Geheugenbudget voor gedecodeerde beelden en overlays (heen en weer bladeren)
+output_strategy = "auto"  # auto | rename | hardlink | reflink | copy: hoe beelden in de output map komen
 
 class YoloAnnotationApp:
     def __init__(self, root, model_path, input_folder, output_img_folder, output_label_folder, delete_folder, enable_delete_mode):
@@ -66,9 +73,8 @@ class YoloAnnotationApp:
         os.makedirs(self.output_label_folder, exist_ok=True)
         os.makedirs(self.delete_folder, exist_ok=True)
         
-        # Get all images
-        self.image_files = [f for f in os.listdir(self.input_folder) 
-                            if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+        # Get all images (gesorteerd; os.scandir + bisect voor snel toevoegen bij undo)
+        self.image_files = FolderIndex(self.input_folder, watch=False)
         self.current_index = 0
         
         # Variables for manual bounding box drawing
@@ -89,6 +95,16 @@ class YoloAnnotationApp:
         # Load the YOLO model
         self.load_model()
         
+        # Persistente voorspellingen: teruggezette of opnieuw bekeken beelden niet opnieuw voorspellen
+        self.prediction_cache = PredictionCache(prediction_cache_path)
+        try:
+            self.prediction_cache.bind_slot('legacy', self.model_path)
+        except Exception as e:
+            print(f"Prediction cache error: {e}")
+        
+        # Gedecodeerde beelden en gerenderde overlays in het geheugen (LRU, begrensd in bytes)
+        self.frame_cache = FrameCache(frame_cache_mb)
+        
         # UI setup
         self.setup_menu()
         self.setup_ui()
@@ -326,8 +342,7 @@ class YoloAnnotationApp:
                 input_path = os.path.join(self.input_folder, img_filename)
                 if os.path.exists(delete_path):
                     shutil.move(delete_path, input_path)
-                    if img_filename not in self.image_files:
-                        self.image_files.insert(action['current_index'], img_filename)
+                    self.image_files.add(img_filename)
             
             self.status_label.config(text=f"Undid action for: {img_filename}")
             self.last_action = None
@@ -339,6 +354,7 @@ class YoloAnnotationApp:
     
     def move_to_delete_if_enabled(self, img_filename):
         if not self.delete_mode_enabled: return
+        self.frame_cache.invalidate(os.path.join(self.input_folder, img_filename))
         try:
             shutil.move(os.path.join(self.input_folder, img_filename), 
                        os.path.join(self.delete_folder, img_filename))
@@ -360,59 +376,83 @@ class YoloAnnotationApp:
         self.status_label.config(text=status_text)
         
         img_path = os.path.join(self.input_folder, self.image_files[self.current_index])
-        original_img = cv2.imread(img_path)
-        original_img = cv2.cvtColor(original_img, cv2.COLOR_BGR2RGB)
+        frame = self.frame_cache.get_frame(img_path)
+        if frame is None:
+            self.status_label.config(text=f"Cannot read: {self.image_files[self.current_index]}")
+            return
+        bgr_img = frame.bgr
+        
+        rgb_key = self.frame_cache.overlay_key(img_path, "rgb")
+        original_img = self.frame_cache.get(rgb_key)
+        if original_img is None:
+            original_img = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2RGB)
+            self.frame_cache.put(rgb_key, original_img, original_img.nbytes)
+        
+        # Het al gedecodeerde beeld aan het model geven (ultralytics verwacht BGR, torch hub RGB)
+        detections = self.predict_detections(img_path, bgr_img, original_img)
+        
+        # Overlay met voorspellingen hangt af van model en klassen (kleuren/namen)
+        pred_key = self.frame_cache.overlay_key(img_path, "pred", self.model_path, tuple(self.classes))
+        prediction_img = self.frame_cache.get(pred_key)
+        if prediction_img is None:
+            prediction_img = original_img.copy()
+            self.draw_predictions(prediction_img, detections)
+            self.frame_cache.put(pred_key, prediction_img, prediction_img.nbytes)
+        
+        self.current_detections = detections
+        self.current_img_path = img_path
+        self.current_img = original_img
         
-        prediction_img = original_img.copy()
+        self.display_image(original_img, self.original_canvas)
+        self.display_image(prediction_img, self.prediction_canvas)
         
+        # Buren in beide richtingen alvast decoderen
+        self.frame_cache.prefetch_around(self.input_folder, self.image_files, self.current_index)
+    
+    def predict_detections(self, img_path, bgr_img, rgb_img):
+        """Geeft [[x1, y1, x2, y2, conf, cls], ...] terug, uit de cache of vers van het model"""
+        try:
+            cached = self.prediction_cache.get(img_path, self.model_path, self.model_type, conf=0.3)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            print(f"Prediction cache error: {e}")
+        
+        detections = []
         try:
             if self.model_type == "ultralytics":
-                results = self.model(img_path, conf=0.3)
+                results = self.model(bgr_img, conf=0.3)
+                for r in results:
+                    for box in r.boxes:
+                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().tolist()
+                        detections.append([x1, y1, x2, y2, float(box.conf[0].item()), int(box.cls[0].item())])
             else:
                 self.model.conf = 0.3
-                results = self.model(img_path)
+                results = self.model(rgb_img)
+                for x1, y1, x2, y2, conf, cls in results.xyxy[0].cpu().numpy().tolist():
+                    detections.append([x1, y1, x2, y2, conf, int(cls)])
         except Exception as e:
             print(f"Error prediction: {e}")
-            results = None
-        
-        self.current_results = results
-        self.current_img_path = img_path
-        self.current_img = original_img
+            return []
         
-        self.draw_predictions(prediction_img, results)
-        self.display_image(original_img, self.original_canvas)
-        self.display_image(prediction_img, self.prediction_canvas)
+        try:
+            self.prediction_cache.put(img_path, self.model_path, self.model_type, detections, conf=0.3)
+        except Exception as e:
+            print(f"Prediction cache error: {e}")
+        return detections
     
-    def draw_predictions(self, img, results):
-        if results is None: return
+    def draw_predictions(self, img, detections):
         try:
-            if self.model_type == "ultralytics":
-                if len(results) > 0:
-                    for r in results:
-                        for box in r.boxes:
-                            x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy())
-                            conf = float(box.conf[0].cpu().numpy())
-                            cls_id = int(box.cls[0].item())
-                            
-                            # KLEUR OPHALEN VOOR PREDICTIONS (BGR)
-                            _, color_bgr = self.get_color(cls_id)
-                            
-                            cls_name = self.classes[cls_id] if cls_id < len(self.classes) else str(cls_id)
-                            cv2.rectangle(img, (x1, y1), (x2, y2), color_bgr, 2)
-                            cv2.putText(img, f"{cls_name}: {conf:.2f}", (x1, y1-10), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color_bgr, 2)
-            else:
-                for pred in results.xyxy[0].cpu().numpy():
-                    x1, y1, x2, y2, conf, cls = pred
-                    cls_id = int(cls)
-                    
-                    # KLEUR OPHALEN (BGR)
-                    _, color_bgr = self.get_color(cls_id)
-                    
-                    cls_name = self.classes[cls_id] if cls_id < len(self.classes) else str(cls_id)
-                    cv2.rectangle(img, (int(x1), int(y1)), (int(x2), int(y2)), color_bgr, 2)
-                    cv2.putText(img, f"{cls_name}: {conf:.2f}", (int(x1), int(y1)-10), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, color_bgr, 2)
+            for x1, y1, x2, y2, conf, cls_id in detections:
+                cls_id = int(cls_id)
+                
+                # KLEUR OPHALEN VOOR PREDICTIONS (BGR)
+                _, color_bgr = self.get_color(cls_id)
+                
+                cls_name = self.classes[cls_id] if cls_id < len(self.classes) else str(cls_id)
+                cv2.rectangle(img, (int(x1), int(y1)), (int(x2), int(y2)), color_bgr, 2)
+                cv2.putText(img, f"{cls_name}: {conf:.2f}", (int(x1), int(y1)-10), 
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color_bgr, 2)
         except Exception: pass
     
     def display_image(self, cv_img, canvas):
@@ -473,7 +513,7 @@ class YoloAnnotationApp:
         base_name = os.path.splitext(img_filename)[0]
         
         img_dest = os.path.join(self.output_img_folder, img_filename)
-        try: shutil.copy2(self.current_img_path, img_dest)
+        try: materialize.place_file(self.current_img_path, img_dest, output_strategy)
         except: return
         
         label_path = os.path.join(self.output_label_folder, f"{base_name}.txt")
@@ -493,7 +533,7 @@ class YoloAnnotationApp:
         base_name = os.path.splitext(img_filename)[0]
         
         img_dest = os.path.join(self.output_img_folder, img_filename)
-        try: shutil.copy2(self.current_img_path, img_dest)
+        try: materialize.place_file(self.current_img_path, img_dest, output_strategy)
         except: return
         
         label_path = os.path.join(self.output_label_folder, f"{base_name}.txt")
@@ -506,31 +546,17 @@ class YoloAnnotationApp:
         self.next_image()
     
     def write_label_file(self, label_path):
-        img = cv2.imread(self.current_img_path)
-        height, width = img.shape[:2]
+        # Afmetingen van het al geladen beeld gebruiken i.p.v. het bestand opnieuw te decoderen
+        height, width = self.current_img.shape[:2]
         lines_to_write = []
         
-        if self.model_type == "ultralytics":
-            if len(self.current_results) > 0:
-                for box in self.current_results[0].boxes:
-                    xyxy = box.xyxy[0].cpu().numpy()
-                    x1, y1, x2, y2 = xyxy
-                    cls_id = int(box.cls[0].item())
-                    x_center = ((x1 + x2) / 2) / width
-                    y_center = ((y1 + y2) / 2) / height
-                    w = (x2 - x1) / width
-                    h = (y2 - y1) / height
-                    lines_to_write.append(f"{cls_id} {x_center} {y_center} {w} {h}")
-        else:
-            detections = self.current_results.xyxy[0].cpu().numpy()
-            for detection in detections:
-                x1, y1, x2, y2, conf, cls = detection
-                cls_id = int(cls)
-                x_center = ((x1 + x2) / 2) / width
-                y_center = ((y1 + y2) / 2) / height
-                w = (x2 - x1) / width
-                h = (y2 - y1) / height
-                lines_to_write.append(f"{cls_id} {x_center} {y_center} {w} {h}")
+        for x1, y1, x2, y2, conf, cls in self.current_detections:
+            cls_id = int(cls)
+            x_center = ((x1 + x2) / 2) / width
+            y_center = ((y1 + y2) / 2) / height
+            w = (x2 - x1) / width
+            h = (y2 - y1) / height
+            lines_to_write.append(f"{cls_id} {x_center} {y_center} {w} {h}")
         
         if lines_to_write:
             with open(label_path, 'w') as f:
@@ -664,7 +690,7 @@ class YoloAnnotationApp:
         base_name = os.path.splitext(img_filename)[0]
         
         img_dest = os.path.join(self.output_img_folder, img_filename)
-        try: shutil.copy2(self.current_img_path, img_dest)
+        try: materialize.place_file(self.current_img_path, img_dest, output_strategy)
         except Exception as e: return
         
         label_path = os.path.join(self.output_label_folder, f"{base_name}.txt")
@@ -699,6 +725,8 @@ def main():
     root = tk.Tk()
     app = YoloAnnotationApp(root, model_path, input_folder, output_img_folder, output_label_folder, delete_folder, enable_delete_mode)
     root.mainloop()
+    print(app.frame_cache.summary())
+    print(materialize.stats.summary())
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,13 @@
+from utils.startup_timer import startup_timer  # Eerst: meet ook de imports hieronder
 import customtkinter as ctk
 from tkinter import messagebox
 import json
 import sys
 import os
 from gui.main_window import MainWindow
+from logic.io_queue import peek_io_queue
+from logic.materialize import stats as materialize_stats
+startup_timer.mark("imports")
 
 # Configuratie laden (blijft hetzelfde)
 def load_config():
@@ -26,10 +30,12 @@ def main():
     root = ctk.CTk()
     root.title("CowCatcher Annotation Suite v2.0")
     root.geometry("1400x900")
+    startup_timer.mark("root venster")
     
     # 3. Config Laden
     settings, classes = load_config()
     settings['classes'] = classes
+    startup_timer.mark("config")
     
     # 4. Start Hoofdvenster
     app = MainWindow(root, settings)
@@ -37,5 +43,38 @@ def main():
     # 5. Start Loop
     root.mainloop()
 
+    # Openstaande bestandsacties (saves, verplaatsingen) afmaken voordat het proces stopt
+    io = peek_io_queue()
+    if io is not None and io.pending:
+        print(f"Wachten op {io.pending} bestandsacties...")
+        io.flush()
+    # Inference worker proces stoppen (alleen als het deze sessie gestart is)
+    inference = sys.modules.get("logic.inference_worker")
+    worker = inference.peek_inference_worker() if inference is not None else None
+    if worker is not None:
+        print(worker.summary())
+        worker.shutdown()
+
+    # Render statistieken (profiling van de frame scheduler)
+    scheduler = getattr(root, "_frame_scheduler", None)
+    if scheduler is not None:
+        print(scheduler.summary())
+    # Alleen modules die deze sessie echt geladen zijn (niet alsnog cv2 importeren bij afsluiten)
+    frame = sys.modules.get("logic.frame")
+    if frame is not None and frame.decode_stats.reduced_decodes:
+        print(frame.decode_stats.summary())
+    frame_cache = sys.modules.get("logic.frame_cache")
+    if frame_cache is not None and frame_cache.peek_frame_cache() is not None:
+        print(frame_cache.peek_frame_cache().summary())
+    prediction_cache = sys.modules.get("logic.prediction_cache")
+    if prediction_cache is not None:
+        for cache in prediction_cache.peek_prediction_caches():
+            cache.flush()   # Uitgestelde last_used tijden (LRU) wegschrijven
+    if materialize_stats.files:
+        print(materialize_stats.summary())
+    tiling = sys.modules.get("logic.tiling")
+    if tiling is not None and tiling.tile_stats.frames:
+        print(tiling.tile_stats.summary())
+
 if __name__ == "__main__":
     main()
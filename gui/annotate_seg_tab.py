@@ -4,9 +4,18 @@ from tkinter import messagebox
 import cv2
 from PIL import Image, ImageTk
 import os
-import shutil
+import queue
 import numpy as np
-from ultralytics import YOLO 
+from concurrent.futures import ThreadPoolExecutor
+from logic.model_registry import ModelRegistry
+from logic.model_handler import ModelHandler
+from logic.frame import Frame
+from utils.viewport import ImagePyramid, render_viewport
+from gui.canvas_scene import PolygonScene
+from utils.hit_test import PolygonHitTester
+from gui.render_scheduler import get_scheduler
+from logic import manifest as mf
+from logic.io_queue import get_io_queue
 
 class AnnotateSegTab(ctk.CTkFrame):
     def __init__(self, parent, config):
@@ -18,17 +27,26 @@ class AnnotateSegTab(ctk.CTkFrame):
         self.output_img = config.get('output_img_folder', 'output/images')
         self.output_lbl = config.get('output_label_folder', 'output/labels')
         
-        model_path = config.get('model_path_seg', 'yolov11m-seg.pt')
-        try:
-            self.model = YOLO(model_path)
-        except:
-            print(f"Kon model niet laden: {model_path}")
-            self.model = None
+        # Model via een ModelHandler: gedeelde registry / inference worker en prediction cache (zelfde als de Box tab)
+        self.model_handler = ModelHandler(config)
+        # Voorspellen op de achtergrond; elke aanvraag krijgt een generatienummer, oudere resultaten vervallen
+        self.ai_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="seg-ai")
+        self.ai_results = queue.Queue()
+        self.ai_generation = 0
+        self.ai_busy = False
+        self.ai_discarded = 0
+        self.user_edited = False   # Handmatig bewerkt sinds laden/Reset: AI resultaat niet meer toepassen
         
         # State
         self.image_files = []
         self.current_index = 0
-        self.cv_img = None
+        self.current_file = None   # Naam van het getoonde beeld (positie volgen als de map verandert)
+        self.index = None          # Gedeelde FolderIndex van de input map
+        self.index_version = -1
+        self.manifest = mf.get_manifest(config)
+        self.io = get_io_queue(config)   # Kopiëren en labels schrijven op de achtergrond
+        self.frame = None        # Frame (BGR buffer, één decode gedeeld met het model)
+        self.pyramid = None      # Beeldpiramide van het frame voor snelle zoom/pan
         self.polygon_points = []
         self.selected_point_idx = None
         
@@ -40,9 +58,19 @@ class AnnotateSegTab(ctk.CTkFrame):
         self.is_dragging_pan = False # Zijn we daadwerkelijk aan het slepen?
         self.pan_start = (0, 0)  # Startpunt van slepen
 
+        # Render scheduler: bursts van resize/drag events worden één paint per frame
+        self.scheduler = get_scheduler(self)
+        self.key_draw = (id(self), "draw")
+        self.key_pan = (id(self), "pan")
+        self.key_vertex = (id(self), "vertex")
+        self.pending_pan = [0, 0]     # Nog niet getekende pan verschuiving (canvas pixels)
+        self.pending_vertex = None    # (index, canvas x, canvas y) van het laatst versleepte punt
+
         # UI Opbouw
         self.setup_ui()
         self.after(100, self.refresh_list)
+        self.after(500, self.watch_folder)
+        self.after(50, self.poll_ai)
 
     def setup_ui(self):
         self.grid_rowconfigure(0, weight=1)
@@ -50,6 +78,8 @@ class AnnotateSegTab(ctk.CTkFrame):
 
         self.canvas = tk.Canvas(self, bg="#202020", highlightthickness=0)
         self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scene = PolygonScene(self.canvas)
+        self.hit = PolygonHitTester()
         
         # --- EVENTS ---
         # Muis interacties
@@ -69,12 +99,7 @@ class AnnotateSegTab(ctk.CTkFrame):
         self.canvas.bind("<Control-Button-4>", self.on_zoom) # Linux scroll up
         self.canvas.bind("<Control-Button-5>", self.on_zoom) # Linux scroll down
 
-        # PAN: Spatiebalk logic
-        # We moeten binden aan het root window zodat spatie overal werkt
-        root = self.winfo_toplevel()
-        root.bind("<KeyPress-space>", self.start_pan_mode)
-        root.bind("<KeyRelease-space>", self.stop_pan_mode)
-        root.bind("<Return>", lambda e: self.save_and_next())
+        # PAN: Spatiebalk logic en Enter = opslaan worden centraal gebonden (MainWindow.bind_shortcuts)
 
         # Knoppenbalk
         frame_controls = ctk.CTkFrame(self, height=50)
@@ -82,9 +107,11 @@ class AnnotateSegTab(ctk.CTkFrame):
         
         self.lbl_info = ctk.CTkLabel(frame_controls, text="Laden...")
         self.lbl_info.pack(side="left", padx=20)
+        self.lbl_io = ctk.CTkLabel(frame_controls, text="", text_color="orange")
+        self.lbl_io.pack(side="left", padx=10)
 
         ctk.CTkButton(frame_controls, text="Save & Next (Enter)", command=self.save_and_next, fg_color="green").pack(side="right", padx=10)
-        ctk.CTkButton(frame_controls, text="Reset AI", command=self.run_ai, fg_color="#444").pack(side="right", padx=10)
+        ctk.CTkButton(frame_controls, text="Reset AI", command=self.reset_ai, fg_color="#444").pack(side="right", padx=10)
         
         # Instructie labeltje
         ctk.CTkLabel(frame_controls, text="[Ctrl+Scroll]: Zoom | [Spatie+Sleep]: Pan", text_color="gray").pack(side="right", padx=20)
@@ -92,51 +119,153 @@ class AnnotateSegTab(ctk.CTkFrame):
     # --- LIST & LOADING ---
     def refresh_list(self):
         if os.path.exists(self.input_folder):
-            self.image_files = [f for f in os.listdir(self.input_folder) if f.lower().endswith(('.jpg', '.png', '.jpeg'))]
+            self.index = mf.open_tracked_index(self.config, self.input_folder, self.manifest)
+            self.index_version = self.index.version
+            self.image_files = self.index
+            self.current_index = self.manifest.resume_index(self.index, self.input_folder)
             if self.image_files:
                 self.load_image()
             else:
                 self.lbl_info.configure(text="Geen afbeeldingen!")
 
+    def watch_folder(self):
+        """Wijzigingen in de input map verwerken (de index wordt gedeeld met de Box tab)"""
+        self.update_io_status()
+        if self.index is not None:
+            self.index.poll()
+            if self.index.version != self.index_version:
+                self.index_version = self.index.version
+                i = self.index.index_of(self.current_file) if self.current_file else None
+                if i is not None:
+                    self.current_index = i
+                    self.lbl_info.configure(text=self.current_name())
+                elif self.image_files:
+                    self.current_index = min(self.current_index, len(self.image_files) - 1)
+                    self.load_image()
+        self.after(500, self.watch_folder)
+
+    def update_io_status(self):
+        io_text = self.io.status_text()
+        if io_text != self.lbl_io.cget("text"):
+            self.lbl_io.configure(text=io_text)
+
     def load_image(self):
-        path = os.path.join(self.input_folder, self.image_files[self.current_index])
-        self.cv_img = cv2.imread(path)
-        if self.cv_img is not None:
-            self.cv_img = cv2.cvtColor(self.cv_img, cv2.COLOR_BGR2RGB)
-            self.lbl_info.configure(text=f"{self.image_files[self.current_index]} ({self.current_index+1}/{len(self.image_files)})")
+        self.current_file = self.image_files[self.current_index]
+        path = os.path.join(self.input_folder, self.current_file)
+        # De seg AI draait op elk beeld en heeft de volle resolutie nodig: één decode, gedeeld met het
+        # model (het Frame wordt niet meer veranderd); de piramide zorgt voor snelle weergave
+        self.frame = Frame.load(path)
+        if self.frame is not None:
+            self.pyramid = ImagePyramid(self.frame.bgr)
+            self.lbl_info.configure(text=self.current_name())
+            print(f"Decode {self.frame.name}: {self.frame.decode_info()}")
             
             # Reset zoom bij nieuwe foto
             self.fit_to_screen = True 
-            
+
+            # Beeld direct tonen; de AI polygoon volgt zodra de voorspelling klaar is
+            self.polygon_points = []
+            self.selected_point_idx = None
+            self.user_edited = False
+            self.draw()
             self.run_ai()
         else:
+            self.ai_generation += 1  # Eventueel lopende voorspelling hoort niet meer bij het getoonde beeld
             print(f"Fout laden: {path}")
 
+    def reset_ai(self):
+        """Knop 'Reset AI': handmatige wijzigingen weggooien en opnieuw voorspellen"""
+        self.user_edited = False
+        self.run_ai()
+
     def run_ai(self):
-        if self.model is None or self.cv_img is None: return
-        results = self.model(self.cv_img, verbose=False)
-        self.polygon_points = []
-        if results and results[0].masks:
-            masks = results[0].masks.xy
-            if len(masks) > 0:
-                poly = masks[0]
-                if len(poly) > 60: 
-                    indices = np.linspace(0, len(poly)-1, 50, dtype=int)
-                    poly = poly[indices]
-                self.polygon_points = poly.tolist()
-        self.draw()
+        """Voorspelling starten op de achtergrond; de GUI blijft bruikbaar (pannen, zoomen, punten zetten)"""
+        if self.frame is None: return
+        # Nieuwe generatie: resultaten van eerdere aanvragen (ander beeld, of een eerdere Reset) vervallen
+        self.ai_generation += 1
+        path = self.frame.path
+        self.model_handler.cancel_stale([path])
+        self.ai_executor.submit(self._ai_job, self.ai_generation, self.frame)
+        self.ai_busy = True
+        self.update_ai_status()
+
+    def _ai_job(self, generation, frame):
+        """Worker thread: voorspellen, resultaat via de queue terug naar de UI thread"""
+        if generation != self.ai_generation:
+            return  # Al achterhaald voordat hij aan de beurt was (bv. snel Enter drukken)
+        try:
+            poly = self.model_handler.predict_seg_polygon(frame)
+        except Exception as e:
+            print(f"AI Fout: {e}")
+            poly = []
+        self.ai_results.put((generation, poly))
+
+    def poll_ai(self):
+        """Resultaten van _ai_job verwerken (alleen de nieuwste generatie telt)"""
+        while True:
+            try:
+                generation, poly = self.ai_results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.ai_generation:
+                self.ai_discarded += 1
+                continue
+            self.ai_busy = False
+            if poly is None:
+                continue  # Geannuleerd
+            if self.user_edited:
+                # Gebruiker is zelf al begonnen: diens polygoon niet overschrijven
+                print(f"AI resultaat niet toegepast (handmatig bewerkt): {self.current_file}")
+            else:
+                self.polygon_points = poly
+                self.selected_point_idx = None
+                self.draw()
+            self.update_ai_status()
+        if self.ai_busy:
+            self.update_ai_status()
+        self.after(50, self.poll_ai)
+
+    def update_ai_status(self):
+        if not self.image_files:
+            return
+        text = self.current_name()
+        if self.ai_busy:
+            if self.model_handler.seg_state() == ModelRegistry.LOADING:
+                text += f" | {self.model_handler.status_text(self.model_handler.path_seg)}"
+            else:
+                text += " | AI bezig..."
+        if text != self.lbl_info.cget("text"):
+            self.lbl_info.configure(text=text)
+
+    def current_name(self):
+        try:
+            todo = f" | {self.manifest.count()} te gaan"
+        except Exception:
+            todo = ""
+        return f"{self.image_files[self.current_index]} ({self.current_index+1}/{len(self.image_files)}){todo}"
 
     # --- DRAWING ---
     def on_resize(self, event):
         # Alleen hertekenen als we in "fit mode" zijn, of gewoon update
         if self.fit_to_screen:
-            self.draw()
+            self.request_draw()
+
+    def request_draw(self):
+        self.scheduler.request(self.key_draw, self.draw, self)
 
     def draw(self):
-        self.canvas.delete("all")
-        if self.cv_img is None: return
+        """Volledige update van de scene (na laden, zoom of resize)"""
+        # Een volledige update maakt openstaande pan/punt updates overbodig
+        self.scheduler.cancel(self.key_pan)
+        self.scheduler.cancel(self.key_vertex)
+        self.pending_pan = [0, 0]
+        self.pending_vertex = None
+        self.hit.set_points(self.polygon_points)
+        if self.frame is None:
+            self.scene.clear()
+            return
 
-        h_img, w_img = self.cv_img.shape[:2]
+        h_img, w_img = self.frame.height, self.frame.width
         w_can = self.canvas.winfo_width()
         h_can = self.canvas.winfo_height()
         
@@ -153,49 +282,40 @@ class AnnotateSegTab(ctk.CTkFrame):
             # Gebruik huidige zoom/pan waarden (worden aangepast door scroll/drag)
             pass
 
-        # Afbeelding tekenen (alleen het zichtbare deel voor performance zou beter zijn, maar dit is makkelijker)
-        # We gebruiken warpAffine voor zoom/pan als het heel groot wordt, 
-        # maar voor eenvoud resizen we gewoon. Let op: bij extreme zoom kan dit traag worden.
-        # Voor deze implementatie gebruiken we de simpele resize methode:
-        
-        nw = int(w_img * self.scale)
-        nh = int(h_img * self.scale)
-        
-        # Om bugs bij extreme zoom te voorkomen (ImageTk limiet), cappen we de grootte of gebruiken we een crop.
-        # Voor nu houden we het simpel:
-        if nw < 1 or nh < 1: return
-
-        # PIL image maken
-        pil_img = Image.fromarray(self.cv_img)
-        pil_img = pil_img.resize((nw, nh), Image.Resampling.NEAREST) # Nearest is sneller
-        self.tk_img = ImageTk.PhotoImage(pil_img)
-        
-        self.canvas.create_image(self.offset[0], self.offset[1], image=self.tk_img, anchor="nw")
+        self.draw_image_layer()
+        self.sync_polygon()
 
-        # Polygon tekenen
-        if len(self.polygon_points) > 1:
-            display_pts = []
-            ox, oy = self.offset
-            for px, py in self.polygon_points:
-                cx = px * self.scale + ox
-                cy = py * self.scale + oy
-                display_pts.extend([cx, cy])
-            
-            # Lijnen
-            self.canvas.create_polygon(display_pts, outline="#00ff00", fill="", width=2, tags="poly")
-            
-            # Punten (alleen tekenen als ze in beeld zijn, optimalisatie)
-            for i, (px, py) in enumerate(self.polygon_points):
-                cx = px * self.scale + ox
-                cy = py * self.scale + oy
-                
-                # Check of punt binnen canvas valt (beetje marge)
-                if -10 < cx < w_can + 10 and -10 < cy < h_can + 10:
-                    col = "#ff3333" if i == self.selected_point_idx else "#ffff00"
-                    r = 5 if i == self.selected_point_idx else 3
-                    self.canvas.create_oval(cx-r, cy-r, cx+r, cy+r, fill=col, outline="black", tags=f"pt_{i}")
-
-            self.canvas.tag_raise("pt_")
+    def draw_image_layer(self):
+        """Afbeelding tekenen: alleen het zichtbare deel, vanaf het passende piramide-niveau.
+        Zo kost zoom/pan O(viewport pixels), ongeacht de zoomfactor."""
+        h_img, w_img = self.frame.height, self.frame.width
+        if w_img * self.scale < 1 or h_img * self.scale < 1: return
+        w_can = self.canvas.winfo_width()
+        h_can = self.canvas.winfo_height()
+        visible, pos = render_viewport(self.pyramid, self.scale, self.offset, w_can, h_can)
+        if visible is None:
+            self.scene.hide_image()
+            return
+        # Kleurconversie pas na het croppen/schalen: alleen viewport pixels
+        self.tk_img = ImageTk.PhotoImage(Image.fromarray(cv2.cvtColor(visible, cv2.COLOR_BGR2RGB)))
+        self.scene.set_image(self.tk_img, pos[0], pos[1])
+
+    def to_canvas(self, px, py):
+        return px * self.scale + self.offset[0], py * self.scale + self.offset[1]
+
+    def to_image(self, cx, cy):
+        return (cx - self.offset[0]) / self.scale, (cy - self.offset[1]) / self.scale
+
+    def sync_polygon(self):
+        """
+        Polygoon items gelijk trekken met polygon_points (na toevoegen/verwijderen van punten).
+        De hit tester is dan al bijgewerkt (insert/remove); draw() zet hem bij een nieuwe polygoon.
+        """
+        # Eerst een eventueel openstaande pan tekenen, anders schuift die de nieuwe items nog eens op
+        self.scheduler.flush_now(self.key_pan)
+        self.scheduler.cancel(self.key_vertex)
+        self.pending_vertex = None
+        self.scene.set_polygon([self.to_canvas(px, py) for px, py in self.polygon_points], self.selected_point_idx)
 
     # --- ZOOM & PAN LOGICA ---
     
@@ -210,7 +330,7 @@ class AnnotateSegTab(ctk.CTkFrame):
 
     def on_zoom(self, event):
         """Zoom in op de muispositie"""
-        if self.cv_img is None: return
+        if self.frame is None: return
 
         # Bepaal scroll richting
         if event.num == 5 or event.delta < 0:
@@ -238,7 +358,7 @@ class AnnotateSegTab(ctk.CTkFrame):
         
         self.scale = new_scale
         self.fit_to_screen = False # We zitten nu in manual mode
-        self.draw()
+        self.request_draw()
 
     # --- CLICK & DRAG ---
 # --- CLICK & DRAG ---
@@ -251,64 +371,44 @@ class AnnotateSegTab(ctk.CTkFrame):
             return
 
         # --- LOGICA VOOR PUNTEN/LIJNEN/ACHTERGROND ---
-        click_pt = np.array([event.x, event.y])
-        ox, oy = self.offset
+        # Hit-tests gebeuren in beeldcoördinaten; drempels (in schermpixels) omrekenen met de schaal
+        img_x, img_y = self.to_image(event.x, event.y)
         
         # A. Bestaand punt? (Drempelwaarde hardcoded: 15px)
-        best_dist = 15
-        best_idx = None
-        for i, (px, py) in enumerate(self.polygon_points):
-            cx = px * self.scale + ox
-            cy = py * self.scale + oy
-            dist = ((cx - event.x)**2 + (cy - event.y)**2)**0.5
-            if dist < best_dist:
-                best_dist = dist
-                best_idx = i
-        
+        best_idx = self.hit.nearest_vertex(img_x, img_y, 15 / self.scale)
         if best_idx is not None:
             self.selected_point_idx = best_idx
-            self.draw()
+            self.scene.set_selected(best_idx)
             return # We hebben een punt, dus we gaan NIET pannen
 
         # B. Lijn klik? (Drempelwaarde hardcoded: 10px)
-        if len(self.polygon_points) > 1:
-            line_threshold = 10
-            for i in range(len(self.polygon_points)):
-                p1_idx = i
-                p2_idx = (i + 1) % len(self.polygon_points)
-                p1_raw = self.polygon_points[p1_idx]
-                p2_raw = self.polygon_points[p2_idx]
-                
-                p1 = np.array([p1_raw[0] * self.scale + ox, p1_raw[1] * self.scale + oy])
-                p2 = np.array([p2_raw[0] * self.scale + ox, p2_raw[1] * self.scale + oy])
-                
-                p1_to_p2 = p2 - p1
-                p1_to_click = click_pt - p1
-                len_sq = np.dot(p1_to_p2, p1_to_p2)
-                
-                dist_to_line = float('inf')
-                if len_sq > 0:
-                    t = max(0, min(1, np.dot(p1_to_click, p1_to_p2) / len_sq))
-                    proj = p1 + t * p1_to_p2
-                    dist_to_line = np.linalg.norm(click_pt - proj)
-                
-                if dist_to_line < line_threshold:
-                    # Nieuw punt toevoegen op de lijn
-                    new_img_x = (event.x - ox) / self.scale
-                    new_img_y = (event.y - oy) / self.scale
-                    self.polygon_points.insert(p1_idx + 1, [new_img_x, new_img_y])
-                    self.selected_point_idx = p1_idx + 1
-                    self.draw()
-                    return # We hebben een lijn, dus we gaan NIET pannen
+        edge_idx = self.hit.nearest_edge(img_x, img_y, 10 / self.scale)
+        if edge_idx is not None:
+            # Nieuw punt toevoegen op de lijn
+            self.polygon_points.insert(edge_idx + 1, [img_x, img_y])
+            self.hit.insert(edge_idx + 1, img_x, img_y)
+            self.selected_point_idx = edge_idx + 1
+            self.user_edited = True
+            self.sync_polygon()
+            return # We hebben een lijn, dus we gaan NIET pannen
+
+        # Nog geen (volledige) polygoon, bv. terwijl de AI nog bezig is: klik zet een nieuw punt
+        if len(self.polygon_points) < 3:
+            self.polygon_points.append([img_x, img_y])
+            self.hit.insert(len(self.hit), img_x, img_y)
+            self.selected_point_idx = len(self.polygon_points) - 1
+            self.user_edited = True
+            self.sync_polygon()
+            return
 
         # C. ACHTERGROND KLIK -> AUTOMATISCH PANNEN
         # Als we hier zijn, is er niet op een punt en niet op een lijn geklikt.
         # We activeren de sleep-modus.
         self.selected_point_idx = None
+        self.scene.set_selected(None)
         self.is_dragging_pan = True
         self.pan_start = (event.x, event.y)
         self.canvas.configure(cursor="fleur")
-        self.draw()
 
     def on_drag(self, event):
         # 1. Panning logica
@@ -323,16 +423,35 @@ class AnnotateSegTab(ctk.CTkFrame):
             
             self.pan_start = (event.x, event.y)
             self.fit_to_screen = False
-            self.draw()
+            self.pending_pan[0] += dx
+            self.pending_pan[1] += dy
+            self.scheduler.request(self.key_pan, self.apply_pan, self)
             return
 
         # 2. Punt verplaatsen logica
         if self.selected_point_idx is not None:
+            self.user_edited = True
             ox, oy = self.offset
             img_x = (event.x - ox) / self.scale
             img_y = (event.y - oy) / self.scale
             self.polygon_points[self.selected_point_idx] = [img_x, img_y]
-            self.draw()
+            self.hit.move(self.selected_point_idx, img_x, img_y)
+            self.pending_vertex = (self.selected_point_idx, event.x, event.y)
+            self.scheduler.request(self.key_vertex, self.apply_vertex_move, self)
+
+    def apply_pan(self):
+        """Opgespaarde pan in één keer: bestaande items verschuiven, alleen de beeldlaag opnieuw renderen"""
+        dx, dy = self.pending_pan
+        self.pending_pan = [0, 0]
+        if dx or dy:
+            self.scene.translate(dx, dy)
+        self.draw_image_layer()
+
+    def apply_vertex_move(self):
+        if self.pending_vertex is None: return
+        i, cx, cy = self.pending_vertex
+        self.pending_vertex = None
+        self.scene.move_vertex(i, cx, cy)
 
     def on_release(self, event):
         if self.is_dragging_pan:
@@ -352,30 +471,27 @@ class AnnotateSegTab(ctk.CTkFrame):
             if self.is_panning:
                 self.canvas.configure(cursor="hand2")
         
+        # Laatste positie van het versleepte punt nog tekenen voordat de selectie vervalt
+        self.scheduler.flush_now(self.key_vertex)
         self.selected_point_idx = None
+        self.scene.set_selected(None)
         # Niet redrawen hier nodig, on_drag deed het al
 
     def on_right_click(self, event):
         """Verwijder punt"""
-        ox, oy = self.offset
-        best_dist = 15
-        best_idx = None
-        for i, (px, py) in enumerate(self.polygon_points):
-            cx = px * self.scale + ox
-            cy = py * self.scale + oy
-            dist = ((cx - event.x)**2 + (cy - event.y)**2)**0.5
-            if dist < best_dist:
-                best_dist = dist
-                best_idx = i
+        img_x, img_y = self.to_image(event.x, event.y)
+        best_idx = self.hit.nearest_vertex(img_x, img_y, 15 / self.scale)
         
         if best_idx is not None and len(self.polygon_points) > 3:
+            self.user_edited = True
             self.polygon_points.pop(best_idx)
+            self.hit.remove(best_idx)
             self.selected_point_idx = None
-            self.draw()
+            self.sync_polygon()
 
     def save_and_next(self):
         if not self.image_files: return
-        if self.cv_img is None: return
+        if self.frame is None: return
 
         filename = self.image_files[self.current_index]
         base_name = os.path.splitext(filename)[0]
@@ -383,18 +499,26 @@ class AnnotateSegTab(ctk.CTkFrame):
         os.makedirs(self.output_img, exist_ok=True)
         os.makedirs(self.output_lbl, exist_ok=True)
 
-        shutil.copy(os.path.join(self.input_folder, filename), os.path.join(self.output_img, filename))
+        # Bestandsacties in één batch naar de I/O wachtrij; de GUI gaat direct door
+        ops = [("place", os.path.join(self.input_folder, filename), os.path.join(self.output_img, filename), None)]
         
+        label = ""
         if self.polygon_points:
-            h, w = self.cv_img.shape[:2]
+            h, w = self.frame.height, self.frame.width
             label_path = os.path.join(self.output_lbl, f"{base_name}.txt")
-            with open(label_path, "w") as f:
-                line_parts = ["0"] # Class 0
-                for px, py in self.polygon_points:
-                    nx = max(0.0, min(1.0, px / w))
-                    ny = max(0.0, min(1.0, py / h))
-                    line_parts.append(f"{nx:.6f} {ny:.6f}")
-                f.write(" ".join(line_parts) + "\n")
+            line_parts = ["0"] # Class 0
+            for px, py in self.polygon_points:
+                nx = max(0.0, min(1.0, px / w))
+                ny = max(0.0, min(1.0, py / h))
+                line_parts.append(f"{nx:.6f} {ny:.6f}")
+            label = " ".join(line_parts) + "\n"
+            ops.append(("write", label_path, label))
+        self.io.submit(ops)
+        self.update_io_status()
+        try:
+            self.manifest.set_state(filename, mf.ANNOTATED, label)
+        except Exception as e:
+            print(f"Manifest fout: {e}")
         
         if self.current_index < len(self.image_files) - 1:
             self.current_index += 1
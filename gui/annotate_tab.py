@@ -4,9 +4,15 @@ from tkinter import messagebox
 import cv2
 from PIL import Image, ImageTk
 import os
-import shutil
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from logic.model_handler import ModelHandler
+from logic.prefetcher import Prefetcher
+from logic.frame import Frame
+from utils.hit_test import box_edges, nearest_segment
+from utils.image_meta import image_size
+from gui.render_scheduler import get_scheduler
+from logic import manifest as mf
+from logic.io_queue import get_io_queue
 
 class AnnotateTab(ctk.CTkFrame):
     def __init__(self, parent, config):
@@ -16,29 +22,60 @@ class AnnotateTab(ctk.CTkFrame):
         # State variabelen
         self.image_files = []
         self.current_index = 0
-        self.current_cv_image = None
+        self.current_file = None    # Naam van het getoonde beeld (om de positie te volgen als de map verandert)
+        self.index = None           # Gedeelde FolderIndex van de input map
+        self.index_version = -1
+        self.manifest = mf.get_manifest(config)   # Werkstatus per beeld (hervatten, tellingen)
+        self.io = get_io_queue(config)            # Bestandsacties op de achtergrond (write-behind)
+        self.current_frame = None   # Frame: één decode, gedeeld met de ModelHandler
         self.scale = 1.0 
         self.off_x = 0
         self.off_y = 0
         
+        # Render lagen: geschaalde achtergrond wordt gecached per (beeld, canvasgrootte),
+        # boxen zijn losse items die los toegevoegd/verwijderd worden
+        self.image_serial = 0    # Telt op bij elk geladen beeld (sleutel voor de achtergrond cache)
+        self.bg_key = None
+        self.bg_item = None
+        self.tk_img = None
+        self.ann_items = []      # Canvas item per annotatie (zelfde volgorde als self.annotations)
+        
         # Teken variabelen (Alleen BBox)
         self.is_drawing = False
         self.start_x = 0 
         self.start_y = 0
         self.temp_item = None    
         self.annotations = []    
+        # Voorspellen zonder de Tk thread te blokkeren: de Future wordt met after() gevolgd (poll_ai)
+        self.ai_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="box-ai")
+        self.ai_future = None
+        self.ai_serial = None        # image_serial waar ai_future bij hoort
+        self.ai_from_prefetch = False
         
         # Logic
         self.model_handler = ModelHandler(config)
-        
+        self.prefetcher = Prefetcher(
+            self.model_handler,
+            depth=config.get('prefetch_count', 3),
+            memory_budget_mb=config.get('prefetch_memory_mb', 1024)
+        )
+
+        # Render scheduler: resize bursts en drags worden één paint per frame
+        self.scheduler = get_scheduler(self)
+        self.key_redraw = (id(self), "redraw")
+        self.key_drag = (id(self), "drag")
+        self.drag_pos = None
+
         # UI
         self.setup_ui()
         
-        # Bindings pas activeren als tab zichtbaar wordt
-        self.bind("<Visibility>", self.enable_shortcuts)
+        # Sneltoetsen worden centraal gebonden (MainWindow.bind_shortcuts); hier alleen de focus
+        self.bind("<Visibility>", lambda e: self.focus_set())
         
         # Start laden
         self.after(100, self.refresh_file_list)
+        self.after(50, self.poll_prefetch)
+        self.after(500, self.watch_folder)
 
     def setup_ui(self):
         self.grid_columnconfigure(1, weight=1)
@@ -55,6 +92,12 @@ class AnnotateTab(ctk.CTkFrame):
         # AI
         self.var_use_ai = ctk.BooleanVar(value=True)
         ctk.CTkSwitch(self.frame_tools, text="Auto Detect (Box)", variable=self.var_use_ai).pack(pady=5, padx=10, anchor="w")
+        self.lbl_model = ctk.CTkLabel(self.frame_tools, text="", text_color="gray", wraplength=180)
+        self.lbl_model.pack(pady=(0, 5), padx=10, anchor="w")
+        self.lbl_progress = ctk.CTkLabel(self.frame_tools, text="", text_color="gray", wraplength=180)
+        self.lbl_progress.pack(pady=(0, 5), padx=10, anchor="w")
+        self.lbl_io = ctk.CTkLabel(self.frame_tools, text="", text_color="orange", wraplength=180)
+        self.lbl_io.pack(pady=(0, 5), padx=10, anchor="w")
         
         # Knoppen
         ctk.CTkLabel(self.frame_tools, text="ACTIES").pack(pady=(20,5))
@@ -82,7 +125,8 @@ class AnnotateTab(ctk.CTkFrame):
         self.canvas.bind("<Button-1>", self.on_click_left)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
-        self.canvas.bind("<Configure>", lambda e: self.redraw_canvas())
+        self.canvas.bind("<Button-3>", self.on_right_click)  # Box onder de cursor verwijderen
+        self.canvas.bind("<Configure>", lambda e: self.request_redraw())
         
         # Focus
         self.canvas.bind("<Enter>", lambda e: self.canvas.focus_set())
@@ -92,84 +136,171 @@ class AnnotateTab(ctk.CTkFrame):
         self.combo_class = ctk.CTkOptionMenu(self.frame_tools, values=[c['name'] for c in self.config['classes']])
         self.combo_class.pack(pady=5, padx=10)
 
-    def enable_shortcuts(self, event=None):
-        """Activeer sneltoetsen ALLEEN als dit tabblad zichtbaar wordt"""
-        try:
-            root = self.winfo_toplevel()
-            keys = self.config.get('keys_annotate', {})
-            
-            def if_active(func):
-                def wrapper(event=None):
-                    if self.winfo_viewable():
-                        func()
-                return wrapper
-
-            k_save = keys.get("save_next", "s")
-            root.bind(f"<{k_save.lower()}>", if_active(self.save_and_next))
-            root.bind(f"<{k_save.upper()}>", if_active(self.save_and_next))
-            
-            k_skip = keys.get("skip", "space")
-            if k_skip.lower() == "space":
-                root.bind("<space>", if_active(self.skip_image))
-            else:
-                root.bind(f"<{k_skip}>", if_active(self.skip_image))
-            
-            k_del = keys.get("delete", "Delete")
-            root.bind(f"<{k_del}>", if_active(self.delete_image))
-            
-            k_undo = keys.get("undo", "z")
-            root.bind(f"<{k_undo.lower()}>", if_active(self.undo_last))
-            root.bind(f"<{k_undo.upper()}>", if_active(self.undo_last))
-            
-            self.focus_set()
-            
-        except Exception as e:
-            print(f"Kon sneltoetsen niet activeren: {e}")
-
     # --- LOGICA ---
     def refresh_file_list(self):
         in_folder = self.config.get('input_folder', '')
         if not os.path.exists(in_folder): return
         
-        self.image_files = [f for f in os.listdir(in_folder) if f.lower().endswith(('.jpg', '.png', '.jpeg'))]
+        # Gedeelde, gesorteerde index (direct gevuld uit het manifest, nieuwe camerabeelden komen er
+        # live bij via watch_folder) en hervatten bij het eerste openstaande beeld
+        self.index = mf.open_tracked_index(self.config, in_folder, self.manifest)
+        self.index_version = self.index.version
+        self.image_files = self.index
+        self.current_index = self.manifest.resume_index(self.index, in_folder)
         if self.image_files:
             self.load_current_image()
         else:
-            self.canvas.delete("all")
+            self.clear_canvas()
             self.canvas.create_text(400, 300, text="Geen afbeeldingen in input map!", fill="white")
 
-    def load_current_image(self):
+    def watch_folder(self):
+        """Wijzigingen in de input map (nieuwe of verdwenen beelden) verwerken"""
+        if self.index is not None:
+            self.index.poll()
+            if self.index.version != self.index_version:
+                self.index_version = self.index.version
+                self.follow_index()
+        self.after(500, self.watch_folder)
+
+    def follow_index(self):
+        i = self.index.index_of(self.current_file) if self.current_file else None
+        if i is not None:
+            # Zelfde beeld, alleen de positie in de lijst is verschoven
+            self.current_index = i
+            self.schedule_prefetch()
+        elif self.image_files:
+            # Huidig beeld is weg (of er was nog niets): wat nu op die plek staat tonen
+            self.current_index = min(self.current_index, len(self.image_files) - 1)
+            self.load_current_image()
+
+    def update_progress(self):
+        """Hoeveel nog te doen (COUNT op het manifest, geen directory scan)"""
+        try:
+            todo = self.manifest.count()
+        except Exception as e:
+            print(f"Manifest fout: {e}")
+            return
+        self.lbl_progress.configure(text=f"{self.current_index + 1}/{len(self.image_files)} | {todo} te gaan")
+
+    def clear_canvas(self):
         self.canvas.delete("all")
+        self.bg_item = None
+        self.bg_key = None
+        self.ann_items = []
+
+    def load_current_image(self):
+        self.clear_canvas()
+        self.image_serial += 1
         self.annotations = []
         
         if self.current_index >= len(self.image_files): self.current_index = 0
         if not self.image_files: return
 
         filename = self.image_files[self.current_index]
+        self.current_file = filename
         path = os.path.join(self.config['input_folder'], filename)
-        
-        self.current_cv_image = cv2.imread(path)
-        if self.current_cv_image is not None:
-            self.current_cv_image = cv2.cvtColor(self.current_cv_image, cv2.COLOR_BGR2RGB)
-        
-        if self.var_use_ai.get():
-            self.run_ai_prediction(path)
-            
+        self.update_progress()
+        use_ai = self.var_use_ai.get()
+
+        # Eerst kijken of de prefetcher dit frame al klaar heeft staan
+        entry = self.prefetcher.take(path, use_ai)
+        if entry is not None:
+            self.current_frame = entry['frame']
+            if use_ai:
+                self.annotations.extend(entry['annotations'])
+        elif use_ai:
+            # Inferentie heeft de volle resolutie nodig; dezelfde decode wordt ook getoond
+            self.current_frame = Frame.load(path)
+            if self.current_frame is not None:
+                in_flight = self.prefetcher.in_flight(path)
+                if in_flight is not None:
+                    # De prefetcher is hier al mee bezig: daarop wachten i.p.v. een tweede inferentie
+                    self.wait_for_ai(in_flight, from_prefetch=True)
+                else:
+                    self.run_ai_prediction(path)
+        else:
+            # Alleen weergave: verkleind decoderen is genoeg (coördinaten blijven in volle resolutie)
+            self.current_frame = Frame.load_display(path, self.canvas.winfo_width(), self.canvas.winfo_height())
+            if self.current_frame is not None:
+                print(f"Decode {filename}: {self.current_frame.decode_info()}")
+
         self.redraw_canvas()
+        self.schedule_prefetch()
+
+    def schedule_prefetch(self):
+        """Laat de workers alvast de volgende N afbeeldingen voorbereiden"""
+        folder = self.config['input_folder']
+        upcoming = self.image_files[self.current_index + 1:self.current_index + 1 + self.prefetcher.depth]
+        current = [os.path.join(folder, self.current_file)] if self.current_file else []
+        self.prefetcher.schedule([os.path.join(folder, f) for f in upcoming], self.var_use_ai.get(), keep=current)
+
+    def poll_prefetch(self):
+        """Haalt resultaten van de workers op in de Tk thread"""
+        self.prefetcher.poll()
+        self.poll_ai()
+        self.update_model_status()
+        io_text = self.io.status_text()
+        if io_text != self.lbl_io.cget("text"):
+            self.lbl_io.configure(text=io_text)
+        self.after(50, self.poll_prefetch)
+
+    def update_model_status(self):
+        """Model laad-indicator bijwerken"""
+        text = self.model_handler.status_text(self.model_handler.path_detect)
+        if self.ai_future is not None:
+            text += "\nAI bezig..."
+        if text != self.lbl_model.cget("text"):
+            self.lbl_model.configure(text=text)
 
     def run_ai_prediction(self, img_path):
+        """
+        Voorspelling starten op de achtergrond; poll_ai() zet het resultaat op het canvas.
+        Ook de pre-annotatie (store) en het wachten op een model dat nog laadt gebeuren daar,
+        niet op de Tk thread.
+        """
+        # Hier gebruiken we ALLEEN de snelle standaard detectie.
+        # Het al gedecodeerde frame meegeven, zodat het bestand niet nog eens gelezen wordt.
+        frame = self.current_frame
+        source = frame if frame is not None and frame.path == img_path else img_path
+        self.wait_for_ai(self.ai_executor.submit(self.model_handler.predict_standard, source))
+
+    def wait_for_ai(self, future, from_prefetch=False):
+        self.ai_future = future
+        self.ai_serial = self.image_serial
+        self.ai_from_prefetch = from_prefetch
+
+    def poll_ai(self):
+        """Klaargekomen voorspelling verwerken, alleen als die nog bij het getoonde beeld hoort"""
+        future = self.ai_future
+        if future is None or not future.done():
+            return
+        self.ai_future = None
+        if self.ai_serial != self.image_serial or not self.current_file:
+            return  # Gebruiker is al verder
         try:
-            # Hier gebruiken we ALLEEN de snelle standaard detectie
-            preds = self.model_handler.predict_standard(img_path)
-            self.annotations.extend(preds)
+            if self.ai_from_prefetch:
+                path = os.path.join(self.config['input_folder'], self.current_file)
+                entry = self.prefetcher.take(path)
+                if entry is None:
+                    # Prefetch leverde geen voorspelling (bv. geannuleerd): alsnog zelf
+                    self.run_ai_prediction(path)
+                    return
+                preds = entry['annotations']
+            else:
+                preds = future.result()
         except Exception as e:
             print(f"AI Fout: {e}")
+            return
+        if preds:
+            self.annotations.extend(preds)
+            self.redraw_annotations()
 
     def redraw_canvas(self):
-        self.canvas.delete("all")
-        if self.current_cv_image is None: return
+        if self.current_frame is None:
+            self.clear_canvas()
+            return
 
-        h, w = self.current_cv_image.shape[:2]
+        h, w = self.current_frame.height, self.current_frame.width
         cw = self.canvas.winfo_width()
         ch = self.canvas.winfo_height()
         
@@ -180,21 +311,45 @@ class AnnotateTab(ctk.CTkFrame):
         self.off_x = (cw - nw) // 2
         self.off_y = (ch - nh) // 2
         
-        img_res = cv2.resize(self.current_cv_image, (nw, nh))
-        self.tk_img = ImageTk.PhotoImage(Image.fromarray(img_res))
-        self.canvas.create_image(self.off_x, self.off_y, image=self.tk_img, anchor="nw")
+        # Achtergrond laag: alleen opnieuw schalen als beeld of canvasgrootte veranderd is
+        key = (self.image_serial, cw, ch)
+        if key != self.bg_key:
+            img_res = self.current_frame.display_rgb(nw, nh)
+            self.tk_img = ImageTk.PhotoImage(Image.fromarray(img_res))
+            self.bg_key = key
         
+        if self.bg_item is None:
+            self.bg_item = self.canvas.create_image(self.off_x, self.off_y, image=self.tk_img, anchor="nw", tags="bg")
+        else:
+            self.canvas.itemconfigure(self.bg_item, image=self.tk_img)
+            self.canvas.coords(self.bg_item, self.off_x, self.off_y)
+        self.canvas.tag_lower(self.bg_item)
+        
+        self.redraw_annotations()
+
+    def redraw_annotations(self):
+        """Annotatie laag opnieuw opbouwen (bij nieuwe schaal of nieuwe AI resultaten)"""
+        self.canvas.delete("ann")
         # Teken bestaande annotaties (Alleen Boxes)
-        for ann in self.annotations:
-            if ann['type'] == 'bbox':
-                color = self.get_color_for_class(ann['class_id'])
-                x1, y1, x2, y2 = ann['coords']
-                cx1 = x1 * self.scale + self.off_x
-                cy1 = y1 * self.scale + self.off_y
-                cx2 = x2 * self.scale + self.off_x
-                cy2 = y2 * self.scale + self.off_x
-                self.canvas.create_rectangle(cx1, cy1, cx2, cy2, outline=color, width=2)
-            # Polygonen negeren we hier
+        self.ann_items = [self.draw_annotation(ann) for ann in self.annotations]
+
+    def remove_annotation(self, index):
+        """Eén annotatie weghalen: alleen het bijbehorende item verdwijnt van het canvas"""
+        self.annotations.pop(index)
+        item = self.ann_items.pop(index) if index < len(self.ann_items) else None
+        if item is not None:
+            self.canvas.delete(item)
+
+    def draw_annotation(self, ann):
+        """Tekent één box als los canvas item (zonder de rest opnieuw te tekenen)"""
+        if ann['type'] != 'bbox': return  # Polygonen negeren we hier
+        color = self.get_color_for_class(ann['class_id'])
+        x1, y1, x2, y2 = ann['coords']
+        cx1 = x1 * self.scale + self.off_x
+        cy1 = y1 * self.scale + self.off_y
+        cx2 = x2 * self.scale + self.off_x
+        cy2 = y2 * self.scale + self.off_y
+        return self.canvas.create_rectangle(cx1, cy1, cx2, cy2, outline=color, width=2, tags="ann")
 
     # --- TEKEN INTERACTIES (Alleen Box) ---
     def on_click_left(self, event):
@@ -206,15 +361,25 @@ class AnnotateTab(ctk.CTkFrame):
         self.start_x, self.start_y = img_x, img_y
         self.temp_item = self.canvas.create_rectangle(event.x, event.y, event.x, event.y, outline="yellow", width=2, dash=(4,4))
 
+    def request_redraw(self):
+        self.scheduler.request(self.key_redraw, self.redraw_canvas, self)
+
     def on_drag(self, event):
         if self.is_drawing:
-            start_cx = self.start_x * self.scale + self.off_x
-            start_cy = self.start_y * self.scale + self.off_y
-            self.canvas.coords(self.temp_item, start_cx, start_cy, event.x, event.y)
+            self.drag_pos = (event.x, event.y)
+            self.scheduler.request(self.key_drag, self.apply_drag, self)
+
+    def apply_drag(self):
+        if not self.is_drawing or self.drag_pos is None: return
+        start_cx = self.start_x * self.scale + self.off_x
+        start_cy = self.start_y * self.scale + self.off_y
+        self.canvas.coords(self.temp_item, start_cx, start_cy, *self.drag_pos)
 
     def on_release(self, event):
         if self.is_drawing:
             self.is_drawing = False
+            self.scheduler.cancel(self.key_drag)
+            self.drag_pos = None
             self.canvas.delete(self.temp_item)
             
             end_x = (event.x - self.off_x) / self.scale
@@ -225,12 +390,26 @@ class AnnotateTab(ctk.CTkFrame):
             
             # Minimaal 2 pixels groot
             if (x2-x1) > 2 and (y2-y1) > 2:
-                self.annotations.append({
+                ann = {
                     "type": "bbox", 
                     "class_id": self.get_current_class_id(), 
                     "coords": [x1, y1, x2, y2]
-                })
-            self.redraw_canvas()
+                }
+                self.annotations.append(ann)
+                # Alleen de nieuwe box toevoegen; achtergrond en andere boxen blijven staan
+                self.ann_items.append(self.draw_annotation(ann))
+
+    def on_right_click(self, event):
+        """Verwijder de box waarvan de rand het dichtst bij de klik ligt (binnen 10px)"""
+        boxes = [(i, ann['coords']) for i, ann in enumerate(self.annotations) if ann['type'] == 'bbox']
+        if not boxes or self.scale <= 0: return
+        
+        img_x = (event.x - self.off_x) / self.scale
+        img_y = (event.y - self.off_y) / self.scale
+        starts, ends = box_edges([c for _, c in boxes])
+        hit = nearest_segment(starts, ends, img_x, img_y, 10 / self.scale)
+        if hit is not None:
+            self.remove_annotation(boxes[hit[0] // 4][0])
 
     # --- ACTIES ---
     def get_current_class_id(self):
@@ -251,51 +430,76 @@ class AnnotateTab(ctk.CTkFrame):
         base_name = os.path.splitext(filename)[0]
         img_src = os.path.join(self.config['input_folder'], filename)
         
-        # Save Img
-        shutil.copy(img_src, os.path.join(self.config['output_img_folder'], filename))
+        # Alle bestandsacties gaan in één batch naar de I/O wachtrij (in volgorde, op de achtergrond).
+        # In delete_mode gaat het origineel daarna naar de delete map; "place" hernoemt/linkt dan i.p.v. kopiëren
+        moved = filename if self.config.get('delete_mode', False) else None
+        move_to = os.path.join(self.config['delete_folder'], filename) if moved else None
+        ops = [("place", img_src, os.path.join(self.config['output_img_folder'], filename), move_to)]
         
         # Save Label (YOLO BBox Format)
         label_path = os.path.join(self.config['output_label_folder'], f"{base_name}.txt")
-        h, w = self.current_cv_image.shape[:2]
-        
-        with open(label_path, 'w') as f:
-            for ann in self.annotations:
-                # We slaan alleen BBoxes op in dit tabblad
-                if ann['type'] == 'bbox':
-                    cid = ann['class_id']
-                    x1, y1, x2, y2 = ann['coords']
-                    cx = ((x1+x2)/2)/w
-                    cy = ((y1+y2)/2)/h
-                    bw = (x2-x1)/w
-                    bh = (y2-y1)/h
-                    f.write(f"{cid} {cx:.6f} {cy:.6f} {bw:.6f} {bh:.6f}\n")
+        if self.current_frame is not None:
+            h, w = self.current_frame.height, self.current_frame.width
+        else:
+            # Alleen de afmetingen nodig: uit de header, zonder decode
+            w, h = image_size(img_src)
         
-        # Delete mode
-        if self.config.get('delete_mode', False):
-            try: shutil.move(img_src, os.path.join(self.config['delete_folder'], filename))
-            except: pass
+        lines = []
+        for ann in self.annotations:
+            # We slaan alleen BBoxes op in dit tabblad
+            if ann['type'] == 'bbox':
+                cid = ann['class_id']
+                x1, y1, x2, y2 = ann['coords']
+                cx = ((x1+x2)/2)/w
+                cy = ((y1+y2)/2)/h
+                bw = (x2-x1)/w
+                bh = (y2-y1)/h
+                lines.append(f"{cid} {cx:.6f} {cy:.6f} {bw:.6f} {bh:.6f}\n")
+        ops.append(("write", label_path, "".join(lines)))
+        self.set_state(filename, mf.ANNOTATED, "".join(lines))
         
-        self.next_img()
+        self.io.submit(ops)
+        self.next_img(moved)
 
     def skip_image(self):
+        moved = None
+        if self.image_files:
+            self.set_state(self.image_files[self.current_index], mf.SKIPPED)
         if self.config.get('move_skip', False):
              if not self.image_files: return
              fname = self.image_files[self.current_index]
-             try: shutil.move(os.path.join(self.config['input_folder'], fname), os.path.join(self.config['delete_folder'], fname))
-             except: pass
-        self.next_img()
+             self.io.submit([("move", os.path.join(self.config['input_folder'], fname),
+                              os.path.join(self.config['delete_folder'], fname))])
+             moved = fname
+        self.next_img(moved)
 
     def delete_image(self):
         if not self.image_files: return
         filename = self.image_files[self.current_index]
+        self.set_state(filename, mf.DELETED)
+        self.io.submit([("move", os.path.join(self.config['input_folder'], filename),
+                         os.path.join(self.config['delete_folder'], filename))])
+        self.next_img(filename)
+
+    def set_state(self, filename, state, label=None):
         try:
-            shutil.move(os.path.join(self.config['input_folder'], filename),
-                        os.path.join(self.config['delete_folder'], filename))
-        except: pass
-        self.next_img()
+            self.manifest.set_state(filename, state, label)
+        except Exception as e:
+            print(f"Manifest fout: {e}")
 
-    def next_img(self):
-        if self.current_index < len(self.image_files) - 1:
+    def next_img(self, moved=None):
+        """Naar het volgende beeld. `moved`: bestand dat net uit de input map is gehaald;
+        de lijst schuift dan op, dus de index blijft staan."""
+        if moved is not None and self.index is not None and self.index.remove(moved):
+            self.index_version = self.index.version
+            if self.current_index < len(self.image_files):
+                self.load_current_image()
+                return
+            self.current_index = max(0, len(self.image_files) - 1)
+            self.current_file = None
+            self.clear_canvas()
+            messagebox.showinfo("Klaar", "Alle afbeeldingen verwerkt!")
+        elif self.current_index < len(self.image_files) - 1:
             self.current_index += 1
             self.load_current_image()
         else:
@@ -303,5 +507,4 @@ class AnnotateTab(ctk.CTkFrame):
 
     def undo_last(self):
         if self.annotations:
-            self.annotations.pop()
-            self.redraw_canvas()
\ No newline at end of file
+            self.remove_annotation(len(self.annotations) - 1)
\ No newline at end of file
@@ -0,0 +1,104 @@
+class PolygonScene:
+    """
+    Retained-mode scene op een tk.Canvas: één image item, één polygon item en één item per punt.
+
+    Items worden hergebruikt en met canvas.coords/move bijgewerkt in plaats van
+    canvas.delete("all") + alles opnieuw aanmaken. Een punt verslepen raakt zo
+    alleen het punt zelf en de polygoon-lijn.
+    """
+
+    TAG = "scene"
+    COLOR_LINE = "#00ff00"
+    COLOR_POINT = "#ffff00"
+    COLOR_SELECTED = "#ff3333"
+    R_POINT = 3
+    R_SELECTED = 5
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.image_item = None
+        self.poly_item = None
+        self.vertex_items = []
+        self.coords = []      # Canvas coördinaten per punt [(cx, cy), ...]
+        self.selected = None
+
+    # --- IMAGE LAAG ---
+    def set_image(self, tk_img, x, y):
+        if self.image_item is None:
+            self.image_item = self.canvas.create_image(x, y, image=tk_img, anchor="nw", tags=(self.TAG, "image"))
+            self.canvas.tag_lower(self.image_item)
+        else:
+            self.canvas.itemconfigure(self.image_item, image=tk_img, state="normal")
+            self.canvas.coords(self.image_item, x, y)
+
+    def hide_image(self):
+        if self.image_item is not None:
+            self.canvas.itemconfigure(self.image_item, state="hidden")
+
+    # --- POLYGOON LAAG ---
+    def _radius(self, i):
+        return self.R_SELECTED if i == self.selected else self.R_POINT
+
+    def _oval(self, i):
+        cx, cy = self.coords[i]
+        r = self._radius(i)
+        return cx - r, cy - r, cx + r, cy + r
+
+    def _flat(self):
+        return [v for pt in self.coords for v in pt]
+
+    def set_polygon(self, canvas_points, selected=None):
+        """Volledige synchronisatie (na laden, zoom of toevoegen/verwijderen van punten)"""
+        self.coords = [(float(x), float(y)) for x, y in canvas_points]
+        self.selected = selected
+
+        # Polygoon lijn
+        if len(self.coords) > 1:
+            if self.poly_item is None:
+                self.poly_item = self.canvas.create_polygon(
+                    self._flat(), outline=self.COLOR_LINE, fill="", width=2, tags=(self.TAG, "poly"))
+            else:
+                self.canvas.coords(self.poly_item, *self._flat())
+        elif self.poly_item is not None:
+            self.canvas.delete(self.poly_item)
+            self.poly_item = None
+
+        # Aantal punt-items gelijk trekken met het aantal punten
+        while len(self.vertex_items) > len(self.coords):
+            self.canvas.delete(self.vertex_items.pop())
+        while len(self.vertex_items) < len(self.coords):
+            self.vertex_items.append(self.canvas.create_oval(
+                0, 0, 0, 0, fill=self.COLOR_POINT, outline="black", tags=(self.TAG, "pt")))
+
+        for i, item in enumerate(self.vertex_items):
+            self.canvas.coords(item, *self._oval(i))
+            self.canvas.itemconfigure(item, fill=self.COLOR_SELECTED if i == selected else self.COLOR_POINT)
+        self.canvas.tag_raise("pt")
+
+    def move_vertex(self, i, cx, cy):
+        """Eén punt verplaatsen: alleen het punt-item en de lijn worden bijgewerkt"""
+        self.coords[i] = (float(cx), float(cy))
+        self.canvas.coords(self.vertex_items[i], *self._oval(i))
+        if self.poly_item is not None:
+            self.canvas.coords(self.poly_item, *self._flat())
+
+    def set_selected(self, idx):
+        old, self.selected = self.selected, idx
+        for i in (old, idx):
+            if i is not None and 0 <= i < len(self.vertex_items):
+                self.canvas.coords(self.vertex_items[i], *self._oval(i))
+                self.canvas.itemconfigure(self.vertex_items[i],
+                                          fill=self.COLOR_SELECTED if i == idx else self.COLOR_POINT)
+
+    def translate(self, dx, dy):
+        """Pannen: alle items in één keer verschuiven"""
+        self.coords = [(x + dx, y + dy) for x, y in self.coords]
+        self.canvas.move(self.TAG, dx, dy)
+
+    def clear(self):
+        self.canvas.delete(self.TAG)
+        self.image_item = None
+        self.poly_item = None
+        self.vertex_items = []
+        self.coords = []
+        self.selected = None
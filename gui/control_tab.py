@@ -1,10 +1,18 @@
 import customtkinter as ctk
 import tkinter as tk
+from tkinter import messagebox
 import cv2
 from PIL import Image, ImageTk
 import os
 import shutil
 import numpy as np
+from utils.image_meta import image_size
+from logic.frame_cache import get_frame_cache
+from utils.label_draw import draw_yolo_labels
+from gui.review_grid import ReviewGrid
+from logic.folder_index import get_folder_index
+from logic.io_queue import get_io_queue
+from logic import manifest as mf
 
 class ControlTab(ctk.CTkFrame):
     def __init__(self, parent, settings, callbacks=None):
@@ -21,7 +29,15 @@ class ControlTab(ctk.CTkFrame):
         # Variabelen voor logica
         self.image_files = []
         self.current_index = 0
+        self.current_file = None   # Naam van het getoonde beeld (positie volgen als de map verandert)
+        self.index = None          # Gedeelde FolderIndex van output_img_folder
+        self.index_version = -1
+        self.manifest = mf.get_manifest(self.settings)
+        self.io = get_io_queue(self.settings)   # Zelfde wachtrij als de annotatie tabs: volgorde blijft kloppen
         self.tk_img = None 
+        self.frame_cache = get_frame_cache(self.settings)
+        self.prefetch_radius = int(self.settings.get('frame_cache_radius', 2))
+        self.grid_mode = False
 
         # Koppel de boolean aan de setting
         self.edit_mode_var = ctk.BooleanVar(value=self.settings.get("delete_mode", False))
@@ -29,12 +45,12 @@ class ControlTab(ctk.CTkFrame):
         # UI Opbouwen
         self._setup_ui()
         
-        # Sneltoetsen instellen
-        self._setup_shortcuts()
-        
+        # Sneltoetsen worden centraal gebonden (MainWindow.bind_shortcuts)
+
         # Starten
         self._update_button_states()
         self.after(200, self.refresh)
+        self.after(500, self.watch_folder)
 
     def _setup_ui(self):
         # --- 1. Titel ---
@@ -51,6 +67,9 @@ class ControlTab(ctk.CTkFrame):
         # Zorg dat canvas focus pakt bij hover (voor sneltoetsen)
         self.canvas.bind("<Enter>", lambda e: self.canvas.focus_set())
 
+        # Raster weergave (thumbnails), wordt pas aangemaakt bij eerste gebruik
+        self.grid_view = None
+
         # --- 3. VEILIGHEIDSSCHAKELAAR ---
         self.switch_edit_mode = ctk.CTkSwitch(
             self, 
@@ -89,6 +108,15 @@ class ControlTab(ctk.CTkFrame):
         )
         self.btn_next.pack(side="right", padx=5, expand=True)
 
+        self.btn_grid = ctk.CTkButton(
+            self.frame_nav,
+            text="Raster (G)",
+            command=self.toggle_grid,
+            width=100,
+            fg_color="#444"
+        )
+        self.btn_grid.pack(side="left", padx=5, expand=True)
+
         # --- 5. Acties (Worden uitgeschakeld door switch) ---
         self.lbl_actions = ctk.CTkLabel(self, text="Acties", font=("Arial", 16, "bold"))
         self.lbl_actions.pack(pady=2)
@@ -157,32 +185,6 @@ class ControlTab(ctk.CTkFrame):
         self.btn_reject.configure(state=state)
         self.btn_delete.configure(state=state)
 
-    def _setup_shortcuts(self):
-        root = self.winfo_toplevel()
-        keys = self.settings.get('keys_control', {
-            "save_next": "s", "prev": "a", "reject": "e", 
-            "delete": "t", "reset_view": "r"
-        })
-
-        def if_active(func):
-            def wrapper(event=None):
-                if self.winfo_viewable():
-                    func()
-            return wrapper
-
-        # Binds
-        for key_name, func in [
-            ("save_next", self.next_img),
-            ("prev", self.prev_img),
-            ("reject", self.reject_img),
-            ("delete", self.delete_img),
-            ("reset_view", self.refresh)
-        ]:
-            k = keys.get(key_name)
-            if k:
-                root.bind(f"<{k.lower()}>", if_active(func))
-                root.bind(f"<{k.upper()}>", if_active(func))
-
     # ================= BEELD LOGICA (Uit je oude code) =================
 
     def refresh(self):
@@ -191,11 +193,19 @@ class ControlTab(ctk.CTkFrame):
             print(f"Map niet gevonden: {folder}")
             return
         
-        self.image_files = [f for f in os.listdir(folder) if f.lower().endswith(('.jpg','.png', '.jpeg'))]
+        # Gedeelde, gesorteerde index: nieuw geannoteerde beelden komen er live bij
+        self.index = get_folder_index(folder, self.settings.get('folder_poll_interval', 2.0))
+        self.index.poll()
+        self.index_version = self.index.version
+        self.image_files = self.index
         self.current_index = 0
-        self.load_image()
+        if self.grid_mode:
+            self._update_grid()
+        else:
+            self.load_image()
 
     def load_image(self):
+        if self.grid_mode: return # Raster toont zichzelf
         self.canvas.delete("all")
         
         # UI Update: titel aanpassen met index
@@ -208,42 +218,17 @@ class ControlTab(ctk.CTkFrame):
             return
 
         fname = self.image_files[self.current_index]
+        self.current_file = fname
         img_path = os.path.join(self.settings['output_img_folder'], fname)
         base_name = os.path.splitext(fname)[0]
         lbl_path = os.path.join(self.settings['output_label_folder'], f"{base_name}.txt")
         
-        # 1. Beeld inlezen met OpenCV
-        img = cv2.imread(img_path)
-        if img is None: return
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        h, w = img.shape[:2]
+        # 1. Afmetingen uit de bestandsheader (geen decode nodig om de labels te plaatsen)
+        size = image_size(img_path)
+        if size is None: return
+        w, h = size
         
-        # 2. Labels tekenen (YOLO formaat)
-        if os.path.exists(lbl_path):
-            with open(lbl_path, 'r') as f:
-                for line in f.readlines():
-                    try:
-                        parts = list(map(float, line.strip().split()))
-                        cls = int(parts[0])
-                        coords = parts[1:]
-                        
-                        if len(coords) == 4: # Bounding Box
-                            cx, cy, bw, bh = coords
-                            x1 = int((cx - bw/2)*w)
-                            y1 = int((cy - bh/2)*h)
-                            x2 = int((cx + bw/2)*w)
-                            y2 = int((cy + bh/2)*h)
-                            cv2.rectangle(img, (x1, y1), (x2, y2), (0,255,0), 2)
-                        elif len(coords) > 4: # Segmentatie/Polygoon
-                            pts = []
-                            for i in range(0, len(coords), 2):
-                                pts.append([int(coords[i]*w), int(coords[i+1]*h)])
-                            pts = np.array(pts, np.int32).reshape((-1,1,2))
-                            cv2.polylines(img, [pts], True, (0,255,0), 2)
-                    except Exception as e:
-                        print(f"Fout bij lezen label: {e}")
-        
-        # 3. Schalen naar Canvas grootte
+        # 2. Schaal naar Canvas grootte bepalen
         cw = self.canvas.winfo_width() or 800
         ch = self.canvas.winfo_height() or 500 # Iets minder hoog ivm knoppen
         
@@ -252,12 +237,84 @@ class ControlTab(ctk.CTkFrame):
         
         if nw <= 0 or nh <= 0: return # Voorkom crash bij minimaliseren
         
-        img_res = cv2.resize(img, (nw, nh))
+        # 3. Gerenderde overlay (beeld + labels) uit de cache, anders opnieuw opbouwen
+        try:
+            lbl_mtime = os.stat(lbl_path).st_mtime_ns
+        except OSError:
+            lbl_mtime = None
+        key = self.frame_cache.overlay_key(img_path, lbl_mtime, nw, nh)
+        img = self.frame_cache.get(key) if key else None
+        if img is None:
+            img = self._render_overlay(img_path, lbl_path, cw, ch, nw, nh)
+            if img is None: return
+            if key: self.frame_cache.put(key, img, img.nbytes)
+
+        # 4. Buren in beide richtingen alvast decoderen
+        self.frame_cache.prefetch_around(self.settings['output_img_folder'], self.image_files,
+                                         self.current_index, self.prefetch_radius, cw, ch)
         
-        # 4. Naar Tkinter converteren en tonen
-        self.tk_img = ImageTk.PhotoImage(Image.fromarray(img_res))
+        # 5. Naar Tkinter converteren en tonen
+        self.tk_img = ImageTk.PhotoImage(Image.fromarray(img))
         self.canvas.create_image(cw//2, ch//2, anchor="center", image=self.tk_img)
 
+    def _render_overlay(self, img_path, lbl_path, cw, ch, nw, nh):
+        """Verkleind RGB beeld met de labels erop getekend"""
+        # Beeld inlezen op de kleinste resolutie die het canvas nog vult (1/2, 1/4 of 1/8),
+        # via de gedeelde frame cache (heen en weer bladeren decodeert niet opnieuw)
+        frame = self.frame_cache.get_frame(img_path, cw, ch)
+        if frame is None: return None
+        img = frame.display_rgb(nw, nh)
+        
+        # Labels tekenen (YOLO formaat) op het verkleinde beeld
+        draw_yolo_labels(img, lbl_path)
+        return img
+
+    def watch_folder(self):
+        """Nieuwe of verdwenen beelden in output_img_folder verwerken"""
+        if self.index is not None:
+            self.index.poll()
+            if self.index.version != self.index_version:
+                self.index_version = self.index.version
+                i = self.index.index_of(self.current_file) if self.current_file else None
+                if self.grid_mode:
+                    self._update_grid()
+                elif i is not None:
+                    # Zelfde beeld, alleen de positie is verschoven: alleen de teller bijwerken
+                    self.current_index = i
+                    self.lbl_title.configure(text=f"Controle ({self.current_index + 1}/{len(self.image_files)})")
+                else:
+                    self.current_index = min(self.current_index, max(0, len(self.image_files) - 1))
+                    self.load_image()
+        self.after(500, self.watch_folder)
+
+    # ================= RASTER WEERGAVE =================
+
+    def toggle_grid(self):
+        """Wisselen tussen één beeld en het thumbnail raster"""
+        self.grid_mode = not self.grid_mode
+        if self.grid_mode:
+            if self.grid_view is None:
+                self.grid_view = ReviewGrid(self.frame_view, self.settings, on_open=self._open_from_grid)
+            self.canvas.pack_forget()
+            self.grid_view.pack(fill="both", expand=True)
+            self.btn_grid.configure(text="Enkel beeld (G)")
+            self._update_grid()
+            self.grid_view.scroll_to(self.current_index)
+        else:
+            self.grid_view.pack_forget()
+            self.canvas.pack(fill="both", expand=True)
+            self.btn_grid.configure(text="Raster (G)")
+            self.load_image()
+
+    def _update_grid(self):
+        self.lbl_title.configure(text=f"Controle raster ({len(self.image_files)} beelden)")
+        self.grid_view.set_files(self.settings['output_img_folder'], self.settings['output_label_folder'],
+                                 self.image_files)
+
+    def _open_from_grid(self, index):
+        self.current_index = index
+        self.toggle_grid()
+
     def next_img(self):
         if self.current_index < len(self.image_files)-1:
             self.current_index += 1
@@ -269,50 +326,71 @@ class ControlTab(ctk.CTkFrame):
             self.load_image()
 
     def reject_img(self):
-        """Verplaatst bestand terug naar input map (Afkeuren)"""
+        """Verplaatst bestand terug naar input map (Afkeuren); in het raster de hele selectie"""
         if not self.edit_mode_var.get(): return # Check switch
         if not self.image_files: return
+        self._apply_to_targets(self._reject_file, "afkeuren (terug naar de input map)")
 
-        fname = self.image_files[self.current_index]
+    def delete_img(self):
+        """Verwijdert bestand permanent; in het raster de hele selectie"""
+        if not self.edit_mode_var.get(): return # Check switch
+        if not self.image_files: return
+        self._apply_to_targets(self._delete_file, "PERMANENT verwijderen")
+
+    def _apply_to_targets(self, action, description):
+        if self.grid_mode:
+            targets = self.grid_view.selection()
+            if not targets: return
+            # Meer dan één beeld (bv. Ctrl+A): eerst bevestigen, de bewerkmodus alleen is niet genoeg
+            if len(targets) > 1 and not messagebox.askyesno(
+                    "Bevestigen", f"{len(targets)} beelden {description}?", icon="warning"):
+                return
+            for fname in targets:
+                action(fname)
+                self.index.remove(fname)
+            self.index_version = self.index.version
+            self.current_index = min(self.current_index, max(0, len(self.image_files) - 1))
+            self.grid_view.remove(targets)
+            self.lbl_title.configure(text=f"Controle raster ({len(self.image_files)} beelden)")
+        else:
+            action(self.image_files[self.current_index])
+            self._remove_from_list_and_refresh()
+
+    def _reject_file(self, fname):
         base = os.path.splitext(fname)[0]
         
         src = os.path.join(self.settings['output_img_folder'], fname)
         dst = os.path.join(self.settings['input_folder'], fname)
         lbl = os.path.join(self.settings['output_label_folder'], f"{base}.txt")
         
-        # Verplaatsen
+        # Verplaatsen (via de I/O wachtrij, na eventuele nog lopende saves van dit beeld);
+        # de annotatie tabs zien het beeld terugkomen via hun map-watcher
         try:
-            if os.path.exists(src): shutil.move(src, dst)
-            if os.path.exists(lbl): os.remove(lbl)
+            self.frame_cache.invalidate(src)
+            self.io.submit([("move", src, dst), ("remove", lbl)])
+            self.manifest.set_state(fname, mf.REJECTED)
             print(f"Afgekeurd: {fname} -> terug naar input.")
         except Exception as e:
             print(f"Fout bij afkeuren: {e}")
 
-        self._remove_from_list_and_refresh()
-
-    def delete_img(self):
-        """Verwijdert bestand permanent"""
-        if not self.edit_mode_var.get(): return # Check switch
-        if not self.image_files: return
-        
-        fname = self.image_files[self.current_index]
+    def _delete_file(self, fname):
         base = os.path.splitext(fname)[0]
         
         src = os.path.join(self.settings['output_img_folder'], fname)
         lbl = os.path.join(self.settings['output_label_folder'], f"{base}.txt")
         
         try:
-            if os.path.exists(src): os.remove(src)
-            if os.path.exists(lbl): os.remove(lbl)
+            self.frame_cache.invalidate(src)
+            self.io.submit([("remove", src), ("remove", lbl)])
+            self.manifest.set_state(fname, mf.DELETED)
             print(f"Verwijderd: {fname}")
         except Exception as e:
             print(f"Fout bij verwijderen: {e}")
 
-        self._remove_from_list_and_refresh()
-
     def _remove_from_list_and_refresh(self):
         """Hulpmiddel om item uit de lijst te halen na actie"""
-        self.image_files.pop(self.current_index)
+        self.index.remove(self.image_files[self.current_index])  # bisect, geen lineaire zoektocht
+        self.index_version = self.index.version
         if self.current_index >= len(self.image_files):
             self.current_index = len(self.image_files) - 1
         
@@ -1,54 +1,132 @@
+import importlib
 import customtkinter as ctk
-# Importeer de nieuwe tabbladen (hernoem de oude annotate_tab in je hoofd naar annotate_box_tab voor duidelijkheid, 
-# maar hier gebruiken we annotate_tab als de 'Box' tab).
-from gui.annotate_tab import AnnotateTab 
-from gui.annotate_seg_tab import AnnotateSegTab # <--- NIEUW
-from gui.control_tab import ControlTab
-from gui.settings_tab import SettingsTab
+from utils.startup_timer import startup_timer
+
+# De tabbladen worden pas gebouwd (en hun modules pas geïmporteerd) als ze voor het eerst getoond worden:
+# cv2, numpy en de modellen hoeven dan niet geladen te zijn voordat het venster verschijnt.
+# (titel, module, klasse, attribuut)
+TABS = [
+    ("Box Annotatie (F1)", "gui.annotate_tab", "AnnotateTab", "tab_box"),  # De originele annotate_tab ('Box' tab)
+    ("Seg Annotatie (F2)", "gui.annotate_seg_tab", "AnnotateSegTab", "tab_seg"),
+    ("Controleren (F3)", "gui.control_tab", "ControlTab", "tab_control"),
+    ("Instellingen (F4)", "gui.settings_tab", "SettingsTab", "tab_settings"),
+]
+
+
+def tab_shortcuts(config):
+    """
+    Sneltoetsen van de tabbladen als (attribuut, sequence, methode, met_event), uit de config.
+    Staat hier en niet in de tabs zelf: ze moeten bij het opstarten al gebonden zijn, voordat de tab gebouwd is.
+    """
+    def letter(attr, key, method):
+        return [(attr, f"<{key.lower()}>", method, False), (attr, f"<{key.upper()}>", method, False)]
+
+    keys = config.get('keys_annotate', {})
+    skip = keys.get("skip", "space")
+    shortcuts = letter("tab_box", keys.get("save_next", "s"), "save_and_next")
+    shortcuts.append(("tab_box", "<space>" if skip.lower() == "space" else f"<{skip}>", "skip_image", False))
+    shortcuts.append(("tab_box", f"<{keys.get('delete', 'Delete')}>", "delete_image", False))
+    shortcuts += letter("tab_box", keys.get("undo", "z"), "undo_last")
+
+    # Seg tab: spatie ingedrukt houden = pannen
+    shortcuts += [("tab_seg", "<space>", "start_pan_mode", True),
+                  ("tab_seg", "<KeyRelease-space>", "stop_pan_mode", True),
+                  ("tab_seg", "<Return>", "save_and_next", False)]
+
+    keys = config.get('keys_control', {
+        "save_next": "s", "prev": "a", "reject": "e",
+        "delete": "t", "reset_view": "r", "grid": "g"
+    })
+    for name, method in [("save_next", "next_img"), ("prev", "prev_img"), ("reject", "reject_img"),
+                         ("delete", "delete_img"), ("reset_view", "refresh"), ("grid", "toggle_grid")]:
+        if keys.get(name):
+            shortcuts += letter("tab_control", keys[name], method)
+    return shortcuts
 
 class MainWindow:
     def __init__(self, root, config):
         self.root = root
         self.config = config
-        
+
         self.root.grid_rowconfigure(0, weight=1)
         self.root.grid_columnconfigure(0, weight=1)
 
         # --- TABBLADEN ---
-        self.tab_view = ctk.CTkTabview(self.root)
+        self.tab_view = ctk.CTkTabview(self.root, command=self.on_tab_change)
         self.tab_view.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # 4 Tabs aanmaken
-        self.tab_view.add("Box Annotatie (F1)")
-        self.tab_view.add("Seg Annotatie (F2)") # <--- NIEUW
-        self.tab_view.add("Controleren (F3)")
-        self.tab_view.add("Instellingen (F4)")
-
-        # --- INHOUD KOPPELEN ---
-        
-        # 1. Box Tab (De originele annotate_tab, kun je later strippen van polygon logica)
-        self.tab_box = AnnotateTab(self.tab_view.tab("Box Annotatie (F1)"), self.config)
-        self.tab_box.pack(fill="both", expand=True)
-
-        # 2. Seg Tab (De nieuwe file)
-        self.tab_seg = AnnotateSegTab(self.tab_view.tab("Seg Annotatie (F2)"), self.config)
-        self.tab_seg.pack(fill="both", expand=True)
-
-        # 3. Control Tab
-        callbacks = {} # (niet meer nodig in jouw nieuwe control tab logica, maar voor compatibiliteit leeg meegeven)
-        self.tab_control = ControlTab(self.tab_view.tab("Controleren (F3)"), self.config, callbacks)
-        self.tab_control.pack(fill="both", expand=True)
-        
-        # 4. Settings Tab
-        self.tab_settings = SettingsTab(self.tab_view.tab("Instellingen (F4)"), self.config)
-        self.tab_settings.pack(fill="both", expand=True)
+        # 4 Tabs aanmaken (nog leeg)
+        for title, _, _, attr in TABS:
+            self.tab_view.add(title)
+            setattr(self, attr, None)
 
         # Sneltoetsen binden
         self.bind_shortcuts()
 
+        # Eerst het lege venster tonen, daarna pas het actieve tabblad bouwen
+        self.root.update()
+        startup_timer.window_shown()
+        self.root.after(0, self.build_first_tab)
+
+    def build_first_tab(self):
+        self.ensure_tab(self.tab_view.get())
+        print(startup_timer.summary())
+
+    def on_tab_change(self):
+        self.ensure_tab(self.tab_view.get())
+
+    def show_tab(self, title):
+        self.tab_view.set(title)  # set() roept de command van de tabview niet aan
+        self.ensure_tab(title)
+
+    def ensure_tab(self, title):
+        """Bouw de inhoud van een tabblad bij de eerste activatie"""
+        for tab_title, module_name, class_name, attr in TABS:
+            if tab_title == title:
+                break
+        else:
+            return
+        if getattr(self, attr) is not None:
+            return
+
+        parent = self.tab_view.tab(title)
+        placeholder = ctk.CTkLabel(parent, text="Laden...")
+        placeholder.pack(expand=True)
+        parent.update_idletasks()
+
+        short = title.split(" (")[0]
+        with startup_timer.measure(f"import {short}"):
+            cls = getattr(importlib.import_module(module_name), class_name)
+        with startup_timer.measure(f"tab {short}"):
+            if attr == "tab_control":
+                # callbacks: niet meer nodig in de control tab logica, maar voor compatibiliteit leeg meegeven
+                tab = cls(parent, self.config, {})
+            else:
+                tab = cls(parent, self.config)
+            placeholder.destroy()
+            tab.pack(fill="both", expand=True)
+        setattr(self, attr, tab)
+
     def bind_shortcuts(self):
-        self.root.bind('<F1>', lambda e: self.tab_view.set("Box Annotatie (F1)"))
-        self.root.bind('<F2>', lambda e: self.tab_view.set("Seg Annotatie (F2)"))
-        self.root.bind('<F3>', lambda e: self.tab_view.set("Controleren (F3)"))
-        self.root.bind('<F4>', lambda e: self.tab_view.set("Instellingen (F4)"))
-        self.root.bind('<Escape>', lambda e: self.root.quit())
\ No newline at end of file
+        for i, (title, _, _, _) in enumerate(TABS):
+            self.root.bind(f'<F{i + 1}>', lambda e, t=title: self.show_tab(t))
+        self.root.bind('<Escape>', lambda e: self.root.quit())
+
+        # Eén binding per toets voor alle tabs: on_shortcut stuurt door naar het zichtbare tabblad
+        self.shortcuts = {}   # sequence -> {attribuut: (methode, met_event)}
+        for attr, sequence, method, with_event in tab_shortcuts(self.config):
+            self.shortcuts.setdefault(sequence, {})[attr] = (method, with_event)
+        for sequence in self.shortcuts:
+            self.root.bind(sequence, lambda e, s=sequence: self.on_shortcut(s, e))
+
+    def on_shortcut(self, sequence, event):
+        title = self.tab_view.get()
+        attr = next(a for t, _, _, a in TABS if t == title)
+        target = self.shortcuts[sequence].get(attr)
+        if target is None:
+            return
+        # Toets vóór de eerste opbouw (bv. direct na het tonen van het venster): tab eerst bouwen
+        self.ensure_tab(title)
+        method, with_event = target
+        func = getattr(getattr(self, attr), method)
+        func(event) if with_event else func()
@@ -0,0 +1,89 @@
+import time
+
+
+class FrameScheduler:
+    """
+    Gedeelde render scheduler: tabs melden zich "dirty" en worden hooguit één keer per frame getekend.
+
+    Een burst van <Configure> of <B1-Motion> events voor hetzelfde doel wordt samengevoegd
+    tot één paint (het laatst aangemelde callback wint). De tellers zijn bedoeld voor profiling.
+    """
+
+    def __init__(self, root, frame_ms=16):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.pending = {}        # key -> (callback, widget)
+        self.scheduled = False
+        self.last_paint = 0.0
+
+        # Tellers
+        self.requests = 0
+        self.merged = 0          # Verzoeken die opgingen in een al geplande paint
+        self.dropped = 0         # Verzoeken zonder eigen paint: samengevoegd, geannuleerd of widget vernietigd
+        self.paints = 0
+        self.flushes = 0
+
+    def request(self, key, callback, widget=None):
+        """Markeer `key` als dirty; `callback` wordt in de volgende frame één keer uitgevoerd."""
+        self.requests += 1
+        if key in self.pending:
+            self.merged += 1
+            self.dropped += 1
+        self.pending[key] = (callback, widget)
+        if not self.scheduled:
+            self.scheduled = True
+            wait_ms = self.frame_ms - (time.perf_counter() - self.last_paint) * 1000
+            if wait_ms <= 0:
+                self.root.after_idle(self._flush)
+            else:
+                self.root.after(int(wait_ms) + 1, self._flush)
+
+    def cancel(self, key):
+        if self.pending.pop(key, None) is not None:
+            self.dropped += 1
+
+    def flush_now(self, key=None):
+        """Direct uitvoeren (bv. voordat een actie de scene helemaal opnieuw opbouwt)"""
+        if key is None:
+            self._flush()
+        elif key in self.pending:
+            callback, _ = self.pending.pop(key)
+            callback()
+            self.paints += 1
+
+    def _flush(self):
+        self.scheduled = False
+        self.flushes += 1
+        self.last_paint = time.perf_counter()
+        work, self.pending = self.pending, {}
+        for callback, widget in work.values():
+            try:
+                if widget is not None and not widget.winfo_exists():
+                    self.dropped += 1
+                    continue
+                callback()
+                self.paints += 1
+            except Exception as e:
+                print(f"Render fout: {e}")
+
+    def stats(self):
+        return {
+            "requests": self.requests, "merged": self.merged, "dropped": self.dropped,
+            "paints": self.paints, "flushes": self.flushes
+        }
+
+    def summary(self):
+        s = self.stats()
+        saved = (s['merged'] / s['requests'] * 100) if s['requests'] else 0
+        return (f"Render: {s['requests']} verzoeken, {s['paints']} paints in {s['flushes']} frames, "
+                f"{s['merged']} samengevoegd ({saved:.0f}%), {s['dropped']} overgeslagen")
+
+
+def get_scheduler(widget, frame_ms=16):
+    """De scheduler van het hoofdvenster van deze widget (wordt bij eerste gebruik aangemaakt)"""
+    root = widget.winfo_toplevel()
+    scheduler = getattr(root, "_frame_scheduler", None)
+    if scheduler is None:
+        scheduler = FrameScheduler(root, frame_ms)
+        root._frame_scheduler = scheduler
+    return scheduler
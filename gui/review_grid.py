@@ -0,0 +1,237 @@
+import math
+import os
+import tkinter as tk
+from collections import OrderedDict
+
+import customtkinter as ctk
+from PIL import Image, ImageTk
+
+from gui.render_scheduler import get_scheduler
+from logic.thumbnails import ThumbnailCache
+
+
+class ReviewGrid(ctk.CTkFrame):
+    """
+    Raster met thumbnails (incl. labels) om een hele map snel te controleren.
+
+    Alleen de zichtbare rijen (plus een rij marge) krijgen canvas items en PhotoImages,
+    dus ook bij duizenden beelden blijft scrollen licht. Thumbnails komen uit de
+    ThumbnailCache op schijf; ontbrekende worden in een process pool gemaakt.
+
+    Selectie: klik = één beeld, Ctrl+klik = toevoegen/weghalen, Shift+klik = reeks.
+    Dubbelklik opent het beeld in de normale weergave (via on_open(index)).
+    """
+
+    PAD = 6
+    LABEL_H = 16
+    COLOR_SELECTED = "#ff3333"
+    COLOR_CELL = "#3a3a3a"
+
+    def __init__(self, parent, settings, on_open=None):
+        super().__init__(parent, fg_color="#2b2b2b")
+        self.settings = settings
+        self.on_open = on_open
+        self.thumbs = ThumbnailCache(settings.get('thumb_cache_dir', 'config/thumbnails'),
+                                     settings.get('thumb_size', 160),
+                                     settings.get('thumb_workers'),
+                                     settings.get('thumb_cache_mb', 200))
+        self.size = self.thumbs.size
+        self.cell_w = self.size + 2 * self.PAD
+        self.cell_h = self.size + 2 * self.PAD + self.LABEL_H
+
+        self.img_folder = ""
+        self.lbl_folder = ""
+        self.files = []
+        self.selected = set()
+        self.anchor = None       # Startpunt voor Shift+klik
+        self.cols = 1
+        self.photos = OrderedDict()   # thumb pad -> PhotoImage (LRU, alleen rond het zichtbare deel)
+        self.visible_thumbs = {}      # thumb pad -> index (wat nu op het scherm staat)
+
+        self.canvas = tk.Canvas(self, bg="#2b2b2b", highlightthickness=0)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+
+        self.canvas.bind("<Configure>", lambda e: self.request_draw(relayout=True))
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(1))
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<Control-Button-1>", lambda e: self.on_click(e, mode="toggle"))
+        self.canvas.bind("<Shift-Button-1>", lambda e: self.on_click(e, mode="range"))
+        self.canvas.bind("<Double-Button-1>", self.on_double_click)
+        self.canvas.bind("<Control-a>", lambda e: self.select_all())
+        self.canvas.bind("<Enter>", lambda e: self.canvas.focus_set())
+
+        self.scheduler = get_scheduler(self)
+        self.key_draw = ("grid", id(self))
+        self.after(100, self.poll_thumbs)
+
+    # --- DATA ---
+    def set_files(self, img_folder, lbl_folder, files):
+        self.img_folder = img_folder
+        self.lbl_folder = lbl_folder
+        # Selectie op naam bewaren: bij nieuwe bestanden verschuiven de posities
+        keep = {self.files[i] for i in self.selected if i < len(self.files)}
+        self.files = list(files)
+        self.selected = {i for i, f in enumerate(self.files) if f in keep} if keep else set()
+        self.anchor = None
+        self.request_draw(relayout=True)
+
+    def selection(self):
+        """Bestandsnamen van de geselecteerde beelden, in lijstvolgorde"""
+        return [self.files[i] for i in sorted(self.selected)]
+
+    def remove(self, fnames):
+        """Beelden uit het raster halen (na afkeuren/verwijderen)"""
+        gone = set(fnames)
+        self.files = [f for f in self.files if f not in gone]
+        self.selected.clear()
+        self.anchor = None
+        self.request_draw(relayout=True)
+
+    def _paths(self, fname):
+        base = os.path.splitext(fname)[0]
+        return os.path.join(self.img_folder, fname), os.path.join(self.lbl_folder, f"{base}.txt")
+
+    # --- LAYOUT & TEKENEN ---
+    def request_draw(self, relayout=False):
+        if relayout:
+            self._layout()
+        self.scheduler.request(self.key_draw, self.draw, self)
+
+    def _layout(self):
+        width = max(1, self.canvas.winfo_width())
+        self.cols = max(1, width // self.cell_w)
+        rows = math.ceil(len(self.files) / self.cols)
+        self.canvas.configure(scrollregion=(0, 0, self.cols * self.cell_w, max(1, rows * self.cell_h)))
+
+    def _visible_range(self):
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        first_row = max(0, int(top // self.cell_h) - 1)
+        last_row = int((top + height) // self.cell_h) + 1
+        return first_row * self.cols, min(len(self.files), (last_row + 1) * self.cols)
+
+    def draw(self):
+        self.canvas.delete("cell")
+        self.visible_thumbs = {}
+        if not self.files:
+            self.canvas.create_text(self.canvas.winfo_width() // 2, 40, text="Geen afbeeldingen",
+                                    fill="white", font=("Arial", 14), tags="cell")
+            return
+
+        # Wat buiten beeld is gescrold hoeft niet meer gemaakt te worden
+        self.thumbs.cancel_pending()
+        start, end = self._visible_range()
+        for i in range(start, end):
+            self._draw_cell(i)
+
+        # PhotoImages ver buiten beeld loslaten
+        keep = max(64, 4 * (end - start))
+        while len(self.photos) > keep:
+            self.photos.popitem(last=False)
+
+    def _cell_origin(self, i):
+        return (i % self.cols) * self.cell_w, (i // self.cols) * self.cell_h
+
+    def _draw_cell(self, i):
+        x, y = self._cell_origin(i)
+        fname = self.files[i]
+        selected = i in self.selected
+        self.canvas.create_rectangle(x + 2, y + 2, x + self.cell_w - 2, y + self.cell_h - 2,
+                                     fill=self.COLOR_CELL,
+                                     outline=self.COLOR_SELECTED if selected else "",
+                                     width=3 if selected else 0, tags="cell")
+        self.canvas.create_text(x + self.cell_w // 2, y + self.cell_h - self.PAD - self.LABEL_H // 2,
+                                text=fname if len(fname) <= 24 else fname[:10] + "..." + fname[-11:],
+                                fill=self.COLOR_SELECTED if selected else "gray", font=("Arial", 9), tags="cell")
+
+        img_path, lbl_path = self._paths(fname)
+        out, ready = self.thumbs.get(img_path, lbl_path)
+        if not ready:
+            self.thumbs.request(img_path, lbl_path)
+            self.visible_thumbs[out] = i
+            return
+        photo = self._photo(out)
+        if photo is not None:
+            self.canvas.create_image(x + self.cell_w // 2, y + self.PAD + self.size // 2,
+                                     image=photo, anchor="center", tags="cell")
+
+    def _photo(self, thumb_path):
+        photo = self.photos.get(thumb_path)
+        if photo is None:
+            try:
+                with Image.open(thumb_path) as im:
+                    photo = ImageTk.PhotoImage(im.convert("RGB"))
+            except Exception as e:
+                print(f"Thumbnail laden mislukt: {e}")
+                return None
+            self.photos[thumb_path] = photo
+        else:
+            self.photos.move_to_end(thumb_path)
+        return photo
+
+    def poll_thumbs(self):
+        """Klaargekomen thumbnails tonen (één paint, ook als er veel tegelijk klaar zijn)"""
+        finished = self.thumbs.poll()
+        if any(out in self.visible_thumbs for out in finished):
+            self.request_draw()
+        self.after(100, self.poll_thumbs)
+
+    # --- SCROLLEN ---
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self.request_draw()
+
+    def scroll(self, units):
+        self.canvas.yview_scroll(units, "units")
+        self.request_draw()
+
+    def on_wheel(self, event):
+        self.scroll(-1 if event.delta > 0 else 1)
+
+    def scroll_to(self, index):
+        rows = max(1, math.ceil(len(self.files) / self.cols))
+        self.canvas.yview_moveto((index // self.cols) / rows)
+        self.request_draw()
+
+    # --- SELECTIE ---
+    def _index_at(self, event):
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        col, row = int(x // self.cell_w), int(y // self.cell_h)
+        if col >= self.cols:
+            return None
+        i = row * self.cols + col
+        return i if 0 <= i < len(self.files) else None
+
+    def on_click(self, event, mode="single"):
+        i = self._index_at(event)
+        if i is None:
+            return "break"
+        if mode == "toggle":
+            self.selected ^= {i}
+            self.anchor = i
+        elif mode == "range" and self.anchor is not None:
+            lo, hi = sorted((self.anchor, i))
+            self.selected |= set(range(lo, hi + 1))
+        else:
+            self.selected = {i}
+            self.anchor = i
+        self.request_draw()
+        return "break"
+
+    def select_all(self):
+        self.selected = set(range(len(self.files)))
+        self.request_draw()
+
+    def on_double_click(self, event):
+        i = self._index_at(event)
+        if i is not None and self.on_open:
+            self.on_open(i)
+
+    def destroy(self):
+        self.thumbs.shutdown()
+        super().destroy()
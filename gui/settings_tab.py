@@ -3,6 +3,9 @@ import tkinter as tk
 from tkinter import filedialog, colorchooser, messagebox
 import json
 import os
+from logic.io_queue import peek_io_queue
+from logic.materialize import STRATEGIES
+from logic.inference_backend import BACKENDS, PRECISIONS
 
 class SettingsTab(ctk.CTkFrame):
     def __init__(self, parent, config):
@@ -44,6 +47,14 @@ class SettingsTab(ctk.CTkFrame):
             self.chk_move_skip.deselect()
         self.chk_move_skip.pack(anchor="w", padx=20, pady=5)
 
+        # 3. Hoe beelden in de output map komen (auto = hernoemen/hardlink/reflink waar het kan, anders kopiëren)
+        row = ctk.CTkFrame(self.scroll, fg_color="transparent")
+        row.pack(fill="x", padx=20, pady=5)
+        ctk.CTkLabel(row, text="Output methode:", width=200, anchor="w").pack(side="left")
+        self.opt_output_strategy = ctk.CTkOptionMenu(row, values=list(STRATEGIES), width=140)
+        self.opt_output_strategy.set(self.config.get("output_strategy", "auto"))
+        self.opt_output_strategy.pack(side="left")
+
         # --- SECTIE 1: MAPPEN ---
         self.add_section_header("📁 Mappen Structuur")
         self.add_path_selector("Input Map (Afbeeldingen):", "input_folder")
@@ -55,6 +66,25 @@ class SettingsTab(ctk.CTkFrame):
         self.add_section_header("🤖 AI Modellen")
         self.add_path_selector("Detectie Model (Box):", "model_path_detect", is_file=True)
         self.add_path_selector("Segmentatie Model (Mask):", "model_path_seg", is_file=True)
+
+        # Backend: torch (PyTorch) of een eenmalige export naar ONNX Runtime / OpenVINO (CPU)
+        row = ctk.CTkFrame(self.scroll, fg_color="transparent")
+        row.pack(fill="x", padx=20, pady=5)
+        ctk.CTkLabel(row, text="Inferentie backend:", width=200, anchor="w").pack(side="left")
+        self.opt_backend = ctk.CTkOptionMenu(row, values=list(BACKENDS), width=140)
+        self.opt_backend.set(self.config.get("inference_backend", "torch"))
+        self.opt_backend.pack(side="left")
+
+        # Per model: fp32, of een int8 variant (eenmalig gekalibreerd op beelden uit de output map)
+        self.precision_menus = {}
+        for slot, label in (("detect", "Precisie Detectie:"), ("seg", "Precisie Segmentatie:")):
+            row = ctk.CTkFrame(self.scroll, fg_color="transparent")
+            row.pack(fill="x", padx=20, pady=5)
+            ctk.CTkLabel(row, text=label, width=200, anchor="w").pack(side="left")
+            menu = ctk.CTkOptionMenu(row, values=list(PRECISIONS), width=140)
+            menu.set(self.config.get(f"model_precision_{slot}", "fp32"))
+            menu.pack(side="left")
+            self.precision_menus[slot] = menu
         
         # --- SECTIE 3: SNELTOETSEN ---
         self.add_section_header("⌨️ Sneltoetsen")
@@ -190,6 +220,13 @@ class SettingsTab(ctk.CTkFrame):
         # 1. Checkboxes
         self.config['delete_mode'] = bool(self.chk_delete_mode.get())
         self.config['move_skip'] = bool(self.chk_move_skip.get()) # NIEUW
+        self.config['output_strategy'] = self.opt_output_strategy.get()
+        io = peek_io_queue()
+        if io is not None:
+            io.output_strategy = self.config['output_strategy']
+        self.config['inference_backend'] = self.opt_backend.get()
+        for slot, menu in self.precision_menus.items():
+            self.config[f'model_precision_{slot}'] = menu.get()
 
         # 2. Paden
         for key, entry in self.entries.items():
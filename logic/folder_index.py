@@ -0,0 +1,193 @@
+import bisect
+import os
+import queue
+import threading
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def scan_images(folder, extensions=IMAGE_EXTENSIONS):
+    """Namen van alle afbeeldingen in een map (os.scandir: geen extra stat per bestand)"""
+    names = set()
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.name.lower().endswith(extensions) and entry.is_file():
+                    names.add(entry.name)
+    except OSError as e:
+        print(f"Map niet leesbaar ({folder}): {e}")
+    return names
+
+
+class FolderIndex:
+    """
+    Gesorteerde, incrementeel bijgehouden lijst van de afbeeldingen in één map.
+
+    Gedraagt zich als een (alleen-lezen) lijst: len(), index[i], slices en iteratie.
+    Opzoeken gaat via bisect (O(log n)); toevoegen/verwijderen zoekt ook zo de plek, maar het
+    schuiven in de lijst zelf is O(n) (een memmove, ook bij honderdduizenden namen nog snel).
+    Er wordt nooit opnieuw gesorteerd.
+
+    Een watcher thread kijkt elke `poll_interval` seconden of de mtime van de map veranderd
+    is en berekent dan het verschil; dat wordt pas toegepast in poll(), vanuit de UI thread,
+    zodat de lijst nooit verandert terwijl een tab er doorheen loopt. rescan() gebruikt dezelfde
+    wachtrij; `_seen` en `_dir_mtime` worden door beide threads alleen onder `_lock` aangepast. `version` telt op bij
+    elke wijziging, zodat tabs kunnen zien dat ze hun positie opnieuw moeten bepalen.
+
+    Met `initial` (bv. de namen uit het manifest) is de index direct bruikbaar zonder scan;
+    de watcher doet dan meteen een eerste scan en corrigeert het verschil via poll().
+    `listeners` krijgen in poll() de toegevoegde en verwijderde namen.
+    """
+
+    def __init__(self, folder, extensions=IMAGE_EXTENSIONS, poll_interval=2.0, watch=True, initial=None):
+        self.folder = folder
+        self.extensions = extensions
+        self.poll_interval = float(poll_interval)
+        self.version = 0
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._scan_gen = 0          # Telt elke vastgelegde scan; een achterhaalde watcher scan vervalt
+
+        if initial is None:
+            self._seen = scan_images(folder, extensions)   # Wat de watcher het laatst zag
+            self._dir_mtime = self._folder_mtime()
+        else:
+            self._seen = {n for n in initial if n.lower().endswith(extensions)}
+            self._dir_mtime = None   # Forceert een echte scan in de eerste watcher ronde
+        self.files = sorted(self._seen)
+        self._changes = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        if watch:
+            self.start()
+
+    # --- LIJST INTERFACE ---
+    def __len__(self):
+        return len(self.files)
+
+    def __getitem__(self, i):
+        return self.files[i]
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __bool__(self):
+        return bool(self.files)
+
+    def __contains__(self, name):
+        return self.index_of(name) is not None
+
+    def index_of(self, name):
+        """Positie van `name`, of None (binair zoeken)"""
+        i = bisect.bisect_left(self.files, name)
+        if i < len(self.files) and self.files[i] == name:
+            return i
+        return None
+
+    # --- WIJZIGINGEN (UI thread) ---
+    def add(self, name):
+        if not name.lower().endswith(self.extensions):
+            return False
+        i = bisect.bisect_left(self.files, name)
+        if i < len(self.files) and self.files[i] == name:
+            return False
+        self.files.insert(i, name)
+        self.version += 1
+        return True
+
+    def remove(self, name):
+        i = self.index_of(name)
+        if i is None:
+            return False
+        del self.files[i]
+        self.version += 1
+        return True
+
+    def poll(self):
+        """Wijzigingen van de watcher toepassen; True als de lijst veranderd is"""
+        before = self.version
+        while True:
+            try:
+                added, removed = self._changes.get_nowait()
+            except queue.Empty:
+                break
+            for name in removed:
+                self.remove(name)
+            for name in added:
+                self.add(name)
+            for callback in self.listeners:
+                try:
+                    callback(added, removed)
+                except Exception as e:
+                    print(f"Index listener fout: {e}")
+        return self.version != before
+
+    def rescan(self):
+        """Volledig opnieuw inlezen (bv. handmatige refresh); alleen vanuit de UI thread"""
+        mtime = self._folder_mtime()
+        names = scan_images(self.folder, self.extensions)
+        self._commit_scan(names, mtime)
+        self.poll()
+        # Ook wat via add()/remove() afweek van de map rechtzetten
+        files = sorted(names)
+        if files != self.files:
+            self.files = files
+            self.version += 1
+
+    # --- WATCHER ---
+    def _folder_mtime(self):
+        try:
+            return os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return None
+
+    def _commit_scan(self, names, mtime, gen=None):
+        """Verschil met de vorige scan in de wachtrij zetten; een scan van vóór een rescan (gen) vervalt"""
+        with self._lock:
+            if gen is not None and gen != self._scan_gen:
+                return
+            self._scan_gen += 1
+            self._dir_mtime = mtime
+            added, removed = names - self._seen, self._seen - names
+            self._seen = names
+            if added or removed:
+                self._changes.put((sorted(added), sorted(removed)))
+
+    def _watch(self):
+        first = self._dir_mtime is None
+        while first or not self._stop.wait(self.poll_interval):
+            first = False
+            mtime = self._folder_mtime()
+            with self._lock:
+                if mtime is None or mtime == self._dir_mtime:
+                    continue  # Niets toegevoegd of verwijderd: geen scan nodig
+                gen = self._scan_gen
+            self._commit_scan(scan_images(self.folder, self.extensions), mtime, gen)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, daemon=True, name=f"index:{self.folder}")
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_folder_index(folder, poll_interval=2.0, initial=None):
+    """Eén gedeelde index per map, zodat alle tabs dezelfde (live) lijst zien"""
+    key = os.path.normcase(os.path.abspath(folder))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = FolderIndex(folder, poll_interval=poll_interval, initial=initial)
+            _indexes[key] = index
+        return index
+
+
+def find_index(folder):
+    """De gedeelde index van deze map als die al bestaat, anders None"""
+    return _indexes.get(os.path.normcase(os.path.abspath(folder)))
@@ -0,0 +1,157 @@
+import os
+import time
+
+import cv2
+
+from utils.image_meta import image_size
+
+# cv2 vlaggen voor decoderen op gereduceerde resolutie (DCT-domein schaling bij JPEG)
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class DecodeStats:
+    """Houdt bij hoe lang een volledige decode per megapixel duurt, om de besparing te schatten"""
+
+    def __init__(self):
+        self.full_ms_per_mp = None
+        self.saved_ms = 0.0
+        self.reduced_decodes = 0
+
+    def record_full(self, ms, megapixels):
+        if megapixels <= 0: return
+        rate = ms / megapixels
+        # Voortschrijdend gemiddelde, zodat één trage (koude) read niet alles bepaalt
+        self.full_ms_per_mp = rate if self.full_ms_per_mp is None else 0.8 * self.full_ms_per_mp + 0.2 * rate
+
+    def estimate_full_ms(self, megapixels):
+        if self.full_ms_per_mp is None:
+            return None
+        return self.full_ms_per_mp * megapixels
+
+    def summary(self):
+        return (f"Decode: {self.reduced_decodes} verkleinde decodes, "
+                f"~{self.saved_ms / 1000:.1f} s decodetijd bespaard")
+
+
+decode_stats = DecodeStats()
+
+
+class Frame:
+    """
+    Eén keer gedecodeerd beeld, gedeeld tussen GUI en ModelHandler.
+
+    Houdt de BGR buffer van cv2.imread vast (dat is ook wat YOLO verwacht), plus pad en
+    afmetingen. `rgb` is een view zonder kopie; voor weergave eerst verkleinen met
+    display_rgb(), zodat alleen het kleine beeld van kleurvolgorde wisselt.
+
+    Een Frame kan op gereduceerde resolutie gedecodeerd zijn (`reduction` 2, 4 of 8) voor
+    weergave. `width`/`height` zijn altijd de volledige afmetingen, zodat annotatie-
+    coördinaten niet veranderen; full() geeft dan een nieuw Frame op volle resolutie.
+    Een Frame wordt na het laden niet meer veranderd, zodat GUI en worker threads het
+    zonder lock kunnen delen.
+    """
+
+    __slots__ = ("path", "bgr", "width", "height", "reduction", "decode_ms", "saved_ms")
+
+    def __init__(self, bgr, path=None, full_size=None, reduction=1):
+        self.bgr = bgr
+        self.path = path
+        self.reduction = reduction
+        if full_size is None:
+            self.height, self.width = bgr.shape[:2]
+        else:
+            self.width, self.height = full_size
+        self.decode_ms = 0.0
+        self.saved_ms = None
+
+    @classmethod
+    def load(cls, path):
+        """Decodeer een bestand op volle resolutie; geeft None als het niet gelezen kan worden"""
+        t0 = time.perf_counter()
+        bgr = cv2.imread(path)
+        if bgr is None:
+            return None
+        frame = cls(bgr, path)
+        frame.decode_ms = (time.perf_counter() - t0) * 1000
+        decode_stats.record_full(frame.decode_ms, frame.width * frame.height / 1e6)
+        return frame
+
+    @classmethod
+    def load_display(cls, path, canvas_w, canvas_h, fill=0.95):
+        """
+        Decodeer op de kleinste resolutie die het canvas nog vult (1/2, 1/4 of 1/8 via de
+        JPEG DCT). Voor inferentie of diep inzoomen daarna full() gebruiken.
+        """
+        size = image_size(path)
+        reduction = cls.display_reduction(size, canvas_w, canvas_h, fill)
+        if reduction == 1:
+            return cls.load(path)
+        w, h = size
+
+        t0 = time.perf_counter()
+        bgr = cv2.imread(path, _REDUCED_FLAGS[reduction])
+        if bgr is None:
+            return None
+        frame = cls(bgr, path, full_size=size, reduction=reduction)
+        frame.decode_ms = (time.perf_counter() - t0) * 1000
+        full_ms = decode_stats.estimate_full_ms(w * h / 1e6)
+        if full_ms is not None:
+            frame.saved_ms = max(0.0, full_ms - frame.decode_ms)
+            decode_stats.saved_ms += frame.saved_ms
+        decode_stats.reduced_decodes += 1
+        return frame
+
+    @staticmethod
+    def display_reduction(size, canvas_w, canvas_h, fill=0.95):
+        """Grootste reductiefactor (1, 2, 4 of 8) waarbij het beeld het canvas nog vult"""
+        if size is None or canvas_w < 10 or canvas_h < 10:
+            return 1
+        w, h = size
+        scale = min(canvas_w / w, canvas_h / h) * fill
+        for f in (8, 4, 2):
+            if f * scale <= 1.0:
+                return f
+        return 1
+
+    def full(self):
+        """Dit frame als het al op volle resolutie is, anders een nieuw (opnieuw gedecodeerd) Frame"""
+        if self.reduction > 1 and self.path:
+            frame = Frame.load(self.path)
+            if frame is not None:
+                return frame
+        return self
+
+    def decode_info(self):
+        """Korte tekst voor in de GUI, bv. '1/4 res, 12 ms (~40 ms bespaard)'"""
+        res = "volle res" if self.reduction == 1 else f"1/{self.reduction} res"
+        text = f"{res}, {self.decode_ms:.0f} ms"
+        if self.saved_ms is not None:
+            text += f" (~{self.saved_ms:.0f} ms bespaard)"
+        return text
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @property
+    def nbytes(self):
+        return self.bgr.nbytes
+
+    @property
+    def name(self):
+        return os.path.basename(self.path) if self.path else ""
+
+    @property
+    def rgb(self):
+        """RGB view op de BGR buffer (geen kopie, negatieve stride)"""
+        return self.bgr[..., ::-1]
+
+    def display_rgb(self, width, height, interpolation=cv2.INTER_AREA):
+        """Verkleind RGB beeld voor op het canvas: eerst schalen, dan pas kleurconversie"""
+        small = cv2.resize(self.bgr, (max(1, width), max(1, height)), interpolation=interpolation)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
@@ -0,0 +1,206 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from logic.frame import Frame
+from utils.image_meta import image_size
+
+
+class FrameCache:
+    """
+    LRU cache van gedecodeerde frames en gerenderde overlays, begrensd in bytes (niet in aantal).
+
+    Bedoeld voor heen-en-weer bladeren: een frame dat net bekeken is hoeft niet opnieuw van
+    schijf gelezen en gedecodeerd te worden. Sleutels bevatten de mtime van het bestand, dus
+    een gewijzigd bestand geeft vanzelf een miss. Waarden worden gedeeld: niet in-place aanpassen.
+
+    Workers kunnen frames rond de huidige index vooruit laden (prefetch_around). Een get_frame
+    voor een frame dat een worker al aan het decoderen is wacht daar hooguit INFLIGHT_WAIT s op;
+    staat het nog in de wachtrij, dan wordt het geannuleerd en direct zelf gedecodeerd.
+    """
+
+    INFLIGHT_WAIT = 0.25   # s; de GUI thread wacht nooit langer op een prefetch worker
+
+    def __init__(self, max_mb=512, workers=2):
+        self.max_bytes = int(float(max_mb) * 1024 * 1024)
+        self.entries = OrderedDict()   # key -> (value, nbytes)
+        self.total_bytes = 0
+        self.inflight = {}             # key -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="framecache")
+
+        # Tellers
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- ALGEMEEN ---
+    def _lookup(self, keys):
+        """Eerste sleutel die in de cache staat (telt als één hit of één miss)"""
+        with self._lock:
+            for key in keys:
+                item = self.entries.get(key)
+                if item is not None:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return item[0]
+            self.misses += 1
+            return None
+
+    def get(self, key):
+        return self._lookup((key,))
+
+    def put(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return  # Past nooit: niet de hele cache leeggooien voor één item
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self.entries[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes and self.entries:
+                _, (_, size) = self.entries.popitem(last=False)
+                self.total_bytes -= size
+                self.evictions += 1
+
+    def invalidate(self, path):
+        """Alles van dit bestand weggooien (bv. na verplaatsen of verwijderen)"""
+        with self._lock:
+            for key in [k for k in self.entries if k[1] == path]:
+                self.total_bytes -= self.entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    # --- FRAMES ---
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def frame_key(self, path, canvas_w=None, canvas_h=None):
+        """Sleutel voor een frame; zonder canvas maat is het een decode op volle resolutie"""
+        mtime = self._mtime(path)
+        if mtime is None:
+            return None
+        reduction = 1
+        if canvas_w and canvas_h:
+            reduction = Frame.display_reduction(image_size(path), canvas_w, canvas_h)
+        return ("frame", path, mtime, reduction)
+
+    @staticmethod
+    def _load(path, canvas_w, canvas_h):
+        if canvas_w and canvas_h:
+            return Frame.load_display(path, canvas_w, canvas_h)
+        return Frame.load(path)
+
+    def get_frame(self, path, canvas_w=None, canvas_h=None):
+        """Frame uit de cache, van een lopende prefetch, of vers gedecodeerd"""
+        key = self.frame_key(path, canvas_w, canvas_h)
+        if key is None:
+            return None
+        # Een frame op volle resolutie is ook goed voor weergave
+        keys = (key,) if key[3] == 1 else (key, key[:3] + (1,))
+        frame = self._lookup(keys)
+        if frame is not None:
+            return frame
+
+        with self._lock:
+            future = self.inflight.get(key)
+        if future is not None:
+            if future.cancel():
+                # Nog niet gestart (achter andere prefetches): zelf decoderen is sneller
+                with self._lock:
+                    self.inflight.pop(key, None)
+            else:
+                try:
+                    frame = future.result(timeout=self.INFLIGHT_WAIT)
+                except Exception:
+                    frame = None   # Ook TimeoutError: dan zelf decoderen
+                if frame is not None:
+                    return frame
+
+        frame = self._load(path, canvas_w, canvas_h)
+        if frame is not None:
+            self.put(key, frame, frame.nbytes)
+        return frame
+
+    def _prefetch_work(self, key, path, canvas_w, canvas_h):
+        try:
+            frame = self._load(path, canvas_w, canvas_h)
+            if frame is not None:
+                self.put(key, frame, frame.nbytes)
+            return frame
+        finally:
+            with self._lock:
+                self.inflight.pop(key, None)
+
+    def prefetch(self, paths, canvas_w=None, canvas_h=None):
+        for path in paths:
+            key = self.frame_key(path, canvas_w, canvas_h)
+            if key is None:
+                continue
+            with self._lock:
+                if key in self.entries or key in self.inflight:
+                    continue
+                self.inflight[key] = self._executor.submit(self._prefetch_work, key, path, canvas_w, canvas_h)
+
+    def prefetch_around(self, folder, files, index, radius=2, canvas_w=None, canvas_h=None):
+        """Frames in beide richtingen rond `index` laden, dichtstbijzijnde eerst (i+1, i-1, i+2, ...)"""
+        order = []
+        for d in range(1, radius + 1):
+            for i in (index + d, index - d):
+                if 0 <= i < len(files):
+                    order.append(os.path.join(folder, files[i]))
+        self.prefetch(order, canvas_w, canvas_h)
+
+    # --- OVERLAYS ---
+    def overlay_key(self, path, *parts):
+        """Sleutel voor een gerenderde overlay; `parts` bevat alles waar de render van afhangt"""
+        mtime = self._mtime(path)
+        if mtime is None:
+            return None
+        return ("overlay", path, mtime) + tuple(parts)
+
+    # --- STATISTIEK ---
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "items": len(self.entries), "bytes": self.total_bytes
+            }
+
+    def summary(self):
+        s = self.stats()
+        lookups = s['hits'] + s['misses']
+        rate = (s['hits'] / lookups * 100) if lookups else 0
+        return (f"Frame cache: {s['hits']} hits / {s['misses']} misses ({rate:.0f}%), "
+                f"{s['evictions']} verwijderd, {s['items']} items, {s['bytes'] / 1024 / 1024:.0f} MB")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_frame_cache(config=None):
+    """Eén cache voor alle tabs in dit proces"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            config = config or {}
+            _shared = FrameCache(config.get('frame_cache_mb', 512))
+        return _shared
+
+
+def peek_frame_cache():
+    """De gedeelde cache als die al bestaat (voor statistiek bij afsluiten), anders None"""
+    return _shared
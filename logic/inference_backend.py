@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+# torch: PyTorch eager (.pt zoals het is); onnx: ONNX Runtime; openvino: OpenVINO (beide CPU)
+BACKENDS = ("torch", "onnx", "openvino")
+# fp32: gewone gewichten/export; int8: statisch gekwantiseerde ONNX (QDQ) via ONNX Runtime (logic/quantize.py)
+PRECISIONS = ("fp32", "int8")
+
+
+class ExportCache:
+    """
+    Eenmalige export van .pt gewichten naar ONNX of OpenVINO, bewaard in `cache_dir`.
+
+    De naam van een export bevat een vingerafdruk van het gewichtenbestand (grootte + mtime)
+    en de imgsz, dus nieuwe gewichten leveren vanzelf een nieuwe export op. Het laden en
+    draaien gaat daarna via Ultralytics (AutoBackend), zodat de Results objecten - en dus
+    de annotaties uit ModelHandler - precies hetzelfde formaat hebben als bij PyTorch.
+    """
+
+    def __init__(self, cache_dir="config/exports", imgsz=640):
+        self.cache_dir = cache_dir
+        self.imgsz = int(imgsz)
+        self._lock = threading.Lock()   # Niet twee exports tegelijk (geheugen en CPU)
+
+    @staticmethod
+    def fingerprint(weights):
+        st = os.stat(weights)
+        return hashlib.blake2b(f"{st.st_size}:{st.st_mtime_ns}".encode(), digest_size=6).hexdigest()
+
+    def target(self, weights, backend, precision="fp32"):
+        stem = os.path.splitext(os.path.basename(weights))[0]
+        name = f"{stem}-{self.fingerprint(weights)}-{self.imgsz}"
+        if precision == "int8":
+            return os.path.join(self.cache_dir, name + "-int8.onnx")
+        if backend == "onnx":
+            return os.path.join(self.cache_dir, name + ".onnx")
+        return os.path.join(self.cache_dir, name + "_openvino_model")
+
+    @staticmethod
+    def exportable(weights, backend):
+        return backend in ("onnx", "openvino") and weights.lower().endswith(".pt")
+
+    def resolve(self, weights, backend, precision="fp32", calibration=None):
+        """
+        Pad dat geladen moet worden voor `backend`; exporteert zo nodig eerst.
+        Geeft (pad, nieuw_geëxporteerd) terug. Andere formaten (.onnx, .engine, ...) gaan ongewijzigd door.
+
+        precision="int8" levert (ongeacht de backend) een statisch gekwantiseerde ONNX op;
+        `calibration` is dan een functie die de kalibratiebeelden geeft (alleen aangeroepen als
+        het int8 model nog gebouwd moet worden).
+        """
+        if precision == "int8":
+            return self._resolve_int8(weights, calibration)
+        if not self.exportable(weights, backend):
+            return weights, False
+        target = self.target(weights, backend)
+        if os.path.exists(target):
+            return target, False
+        with self._lock:
+            if os.path.exists(target):
+                return target, False
+            self._export(weights, backend, target)
+        return target, True
+
+    def _resolve_int8(self, weights, calibration):
+        if weights.lower().endswith(".onnx"):
+            fp32 = weights
+        elif weights.lower().endswith(".pt"):
+            fp32, _ = self.resolve(weights, "onnx")
+        else:
+            raise RuntimeError(f"int8 kan alleen vanuit .pt of .onnx gebouwd worden, niet {weights}")
+        target = self.target(weights, "onnx", "int8")
+        if os.path.exists(target):
+            return target, False
+        with self._lock:
+            if os.path.exists(target):
+                return target, False
+            from logic.quantize import quantize_int8
+            os.makedirs(self.cache_dir, exist_ok=True)
+            quantize_int8(fp32, target, calibration() if calibration else [], self.imgsz)
+        return target, True
+
+    def _export(self, weights, backend, target):
+        from ultralytics import YOLO
+        print(f"Exporteren naar {backend}: {weights} (eenmalig)...")
+        # dynamic: batches (crops, pre-annotatie) en andere beeldgroottes blijven mogelijk
+        out = YOLO(weights).export(format=backend, imgsz=self.imgsz, dynamic=True, half=False)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = target + ".tmp"
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp)
+        elif os.path.exists(tmp):
+            os.remove(tmp)
+        shutil.move(str(out), tmp)
+        os.replace(tmp, target)
+        print(f"Export klaar: {target}")
+
+    @staticmethod
+    def report_path(target):
+        return target.rstrip("/\\") + ".parity.json"
+
+    def write_report(self, target, report):
+        with open(self.report_path(target), 'w') as f:
+            json.dump(report.to_dict(), f, indent=2)
+
+    def read_report(self, target):
+        try:
+            with open(self.report_path(target), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def check_parity(weights, exported, images, name, conf=0.25):
+    """PyTorch gewichten en een export op dezelfde beelden vergelijken (boxen en polygonen)"""
+    from ultralytics import YOLO
+    from logic.parity import run_parity
+    return run_parity(YOLO(weights), YOLO(exported), images, name, conf=conf)
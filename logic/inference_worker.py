@@ -0,0 +1,352 @@
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, TimeoutError
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Zelfde waarden als ModelRegistry (niet importeren: die module hoort bij het worker proces)
+LOADING = "loading"
+READY = "ready"
+FINAL_STATES = ("ready", "missing", "error")
+
+
+def _attach(name):
+    """Bestaand shared memory blok openen zonder dat de resource tracker het bij exit opruimt"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+# ================= WORKER PROCES =================
+
+def worker_main(conn, config):
+    """
+    Hoofdlus van het inferentie proces. Laadt de modellen via een eigen ModelRegistry
+    (zelfde backend/precisie instellingen) en beantwoordt verzoeken in volgorde van aankomst.
+
+    Berichten in:  ("predict", id, mode, shm_naam, shape, dtype, params) | ("cancel", id) | ("stop",)
+    Berichten uit: ("state", pad, state, tekst, (backend, precisie)) | ("started", id) | ("result", id, annotaties)
+                   | ("error", id, tekst) | ("cancelled", id)
+    """
+    from logic.model_registry import get_registry
+    from logic.model_handler import infer_dual, infer_seg_polygon, infer_standard
+    from logic.tiling import infer_tiled
+
+    registry = get_registry(config)
+    paths = {"detect": config.get('model_path_detect', 'cowcatcherV15.pt'),
+             "seg": config.get('model_path_seg', 'yolo11x-seg.pt')}
+    send_lock = threading.Lock()
+
+    def send(msg):
+        with send_lock:
+            conn.send(msg)
+
+    def report_states():
+        """Laadstatus doorgeven aan het GUI proces tot alle modellen klaar (of mislukt) zijn"""
+        last = {}
+        while True:
+            for path in paths.values():
+                state = registry.request(path)
+                if last.get(path) != state:
+                    last[path] = state
+                    send(("state", path, state, registry.status_text(path), registry.variant(path)))
+            if all(s in FINAL_STATES for s in last.values()):
+                return
+            time.sleep(0.2)
+
+    threading.Thread(target=report_states, daemon=True, name="worker-states").start()
+
+    pending, cancelled, unclosed = [], set(), []
+    while True:
+        # Alles wat klaarstaat inlezen, zodat een cancel een nog niet gestart verzoek overslaat
+        try:
+            block = not pending
+            while block or conn.poll():
+                msg = conn.recv()
+                block = False
+                if msg[0] == "stop":
+                    return
+                if msg[0] == "cancel":
+                    cancelled.add(msg[1])
+                elif msg[0] == "predict":
+                    pending.append(msg)
+        except (EOFError, OSError):
+            return  # GUI proces is weg
+
+        _, req_id, mode, shm_name, shape, dtype, params = pending.pop(0)
+        if req_id in cancelled:
+            cancelled.discard(req_id)
+            send(("cancelled", req_id))
+            continue
+        send(("started", req_id))   # Voor de watchdog: vanaf nu telt de tijd voor dit beeld
+
+        shm = None
+        try:
+            shm = _attach(shm_name)
+            img = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)   # Geen kopie
+            if mode == "standard":
+                model = registry.get(paths["detect"], wait=True)
+                anns = infer_standard(model, img, registry.lock_for(paths["detect"]), **params) if model else []
+            elif mode == "tiled":
+                model = registry.get(paths["detect"], wait=True)
+                # (annotaties, timings): de timings worden in het GUI proces bijgehouden
+                anns = infer_tiled(model, img, registry.lock_for(paths["detect"]), **params) if model else ([], {})
+            elif mode == "seg_polygon":
+                model = registry.get(paths["seg"], wait=True)
+                anns = infer_seg_polygon(model, img, registry.lock_for(paths["seg"]), **params) if model else []
+            elif mode == "dual":
+                model_detect = registry.get(paths["detect"], wait=True)
+                model_seg = registry.get(paths["seg"], wait=True)
+                anns = (infer_dual(model_detect, model_seg, img, registry.lock_for(paths["detect"]),
+                                   registry.lock_for(paths["seg"]), **params)
+                        if model_detect and model_seg else [])
+            else:
+                raise ValueError(f"Onbekende modus: {mode}")
+            del img
+            send(("result", req_id, anns))
+        except Exception as e:
+            send(("error", req_id, str(e)))
+        finally:
+            if shm is not None:
+                unclosed.append(shm)
+        # Ultralytics houdt de laatste batch vast; een blok pas sluiten als niemand het meer gebruikt
+        still_open = []
+        for old in unclosed:
+            try:
+                old.close()
+            except BufferError:
+                still_open.append(old)
+        unclosed = still_open
+        cancelled.intersection_update(p[1] for p in pending)
+
+
+# ================= GUI PROCES =================
+
+class InferenceWorker:
+    """
+    Eigenaar van het inferentie proces (aan de kant van de GUI).
+
+    Pixels gaan via multiprocessing.shared_memory (één memcpy, geen pickle); alleen de
+    annotaties komen terug over de pipe. Elk verzoek heeft een id en een `tag` (het beeldpad),
+    zodat verzoeken voor beelden waar de gebruiker al voorbij is geannuleerd kunnen worden.
+    Een watchdog herstart het proces als het crasht of langer dan `timeout` s over één
+    verzoek doet (gemeten vanaf het laatste bericht van het proces, bv. "started", dus zonder de
+    tijd in de wachtrij); openstaande verzoeken krijgen dan een fout.
+    """
+
+    RESULT_MARGIN = 10.0   # s bovenop `timeout` voordat predict() zelf opgeeft (als de watchdog niet ingrijpt)
+
+    def __init__(self, config, timeout=120.0):
+        self.config = dict(config)
+        self.timeout = float(timeout)
+        self.states = {}            # pad -> (state, statustekst, (backend, precisie)), gemeld door het worker proces
+        self.restarts = 0
+        self.cancelled = 0
+        self.completed = 0
+        self._ctx = mp.get_context("spawn")   # Geen fork: Tk en threads niet meenemen
+        self._lock = threading.Lock()
+        self._requests = {}         # id -> {"future", "shm", "tag", "sent"}
+        self._next_id = 0
+        self._stopping = False
+        self._last_progress = time.monotonic()   # Laatste bericht van het worker proces
+        self._start()
+        threading.Thread(target=self._watchdog, daemon=True, name="inference-watchdog").start()
+
+    def _start(self):
+        """Proces starten zonder self._lock: een spawn (nieuwe interpreter, imports) duurt seconden"""
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=worker_main, args=(child, self.config), daemon=True, name="inference-worker")
+        proc.start()
+        child.close()
+        with self._lock:
+            self._conn, self._proc = parent, proc
+            self._last_progress = time.monotonic()
+        threading.Thread(target=self._reader, args=(parent,), daemon=True, name="inference-reader").start()
+
+    # --- VERZOEKEN ---
+    def submit(self, img, mode, tag=None, **params):
+        """Verzoek versturen; geeft (id, Future) terug. De Future levert de annotaties"""
+        img = np.ascontiguousarray(img)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, img.nbytes))
+        np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[...] = img
+        future = Future()
+        with self._lock:
+            self._next_id += 1
+            req_id = self._next_id
+            self._requests[req_id] = {"future": future, "shm": shm, "tag": tag, "sent": time.monotonic()}
+            try:
+                self._conn.send(("predict", req_id, mode, shm.name, img.shape, img.dtype.str, params))
+            except (OSError, ValueError) as e:
+                self._finish(req_id, error=RuntimeError(f"Inference worker niet bereikbaar: {e}"))
+        return req_id, future
+
+    def predict(self, img, mode, tag=None, **params):
+        """
+        Blokkerend: annotaties, of None als het verzoek intussen geannuleerd is.
+        Geeft TimeoutError als het proces `timeout` + RESULT_MARGIN s niets meer van zich laat horen.
+        """
+        sent = time.monotonic()
+        req_id, future = self.submit(img, mode, tag, **params)
+        while True:
+            try:
+                return future.result(timeout=1.0)
+            except CancelledError:
+                return None
+            except TimeoutError:
+                if self._stalled(sent, self.timeout + self.RESULT_MARGIN):
+                    self.cancel(req_id)
+                    raise TimeoutError(f"Inference worker reageert niet (verzoek {req_id})")
+
+    def cancel(self, req_id):
+        with self._lock:
+            if req_id not in self._requests:
+                return
+            self._finish(req_id, cancel=True)
+            try:
+                self._conn.send(("cancel", req_id))
+            except (OSError, ValueError):
+                pass
+
+    def cancel_except(self, keep_tags, scope=None):
+        """
+        Alle verzoeken annuleren waarvan de tag (het beeldpad) niet meer nodig is.
+        Met `scope` alleen tags (scope, pad) van die eigenaar, zodat tabs elkaars verzoeken laten staan.
+        """
+        keep = set(keep_tags)
+        with self._lock:
+            stale = [rid for rid, req in self._requests.items()
+                     if req["tag"] not in keep
+                     and (scope is None or (isinstance(req["tag"], tuple) and req["tag"][0] == scope))]
+        for req_id in stale:
+            self.cancel(req_id)
+
+    def _finish(self, req_id, result=None, error=None, cancel=False):
+        """Verzoek afronden en het shared memory blok vrijgeven (aanroepen met self._lock)"""
+        req = self._requests.pop(req_id, None)
+        if req is None:
+            return
+        shm = req["shm"]
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+        future = req["future"]
+        if cancel:
+            self.cancelled += 1
+            future.cancel()
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            self.completed += 1
+            future.set_result(result)
+
+    # --- BERICHTEN VAN HET WORKER PROCES ---
+    def _reader(self, conn):
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                return  # Proces gestopt of pipe weg; de watchdog pakt het op
+            self._last_progress = time.monotonic()
+            kind = msg[0]
+            if kind == "state":
+                self.states[msg[1]] = (msg[2], msg[3], msg[4])
+                continue
+            if kind == "started":
+                continue
+            with self._lock:
+                if kind == "result":
+                    self._finish(msg[1], result=msg[2])
+                elif kind == "error":
+                    self._finish(msg[1], error=RuntimeError(msg[2]))
+                elif kind == "cancelled":
+                    self._finish(msg[1], cancel=True)
+
+    def _stalled(self, since, limit):
+        """
+        True als het proces al `limit` s niets gemeld heeft terwijl er sinds `since` op gewacht wordt.
+        Elk verzoek begint met "started", dus wachten in de rij telt niet zolang er voortgang is.
+        """
+        # Zolang een model nog laadt (of geëxporteerd/gekalibreerd wordt) is wachten normaal
+        loaded = bool(self.states) and all(s[0] in FINAL_STATES for s in self.states.values())
+        return loaded and time.monotonic() - max(since, self._last_progress) > limit
+
+    def _watchdog(self):
+        while not self._stopping:
+            time.sleep(1.0)
+            if self._stopping:
+                return
+            with self._lock:
+                oldest = min((r["sent"] for r in self._requests.values()), default=None)
+            if oldest is not None and self._stalled(oldest, self.timeout) and self._proc.is_alive():
+                print(f"Inference worker reageert al {self.timeout:.0f} s niet; wordt herstart")
+                self._proc.terminate()
+                self._proc.join(5)
+            if self._proc.is_alive():
+                continue
+            print(f"Inference worker gestopt (exitcode {self._proc.exitcode}); wordt herstart")
+            with self._lock:
+                for req_id in list(self._requests):
+                    self._finish(req_id, error=RuntimeError("Inference worker herstart"))
+                self.states.clear()
+                self.restarts += 1
+                try:
+                    self._conn.close()   # submit() faalt nu direct i.p.v. op de herstart te wachten
+                except OSError:
+                    pass
+            self._start()
+
+    # --- STATUS ---
+    def state(self, path):
+        return self.states.get(path, (LOADING, "", None))[0]
+
+    def variant(self, path):
+        """(backend, precisie) waarmee het worker proces dit model echt draait, of None zolang onbekend"""
+        return self.states.get(path, (LOADING, "", None))[2]
+
+    def status_text(self, path):
+        state, text, _ = self.states.get(path, (LOADING, "", None))
+        return text or f"{os.path.basename(path) if path else '-'}: worker start..."
+
+    def summary(self):
+        return (f"Inference worker: {self.completed} voorspellingen, {self.cancelled} geannuleerd, "
+                f"{self.restarts} herstarts")
+
+    def shutdown(self):
+        self._stopping = True
+        try:
+            self._conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self._proc.join(2)
+        if self._proc.is_alive():
+            self._proc.terminate()
+        with self._lock:
+            for req_id in list(self._requests):
+                self._finish(req_id, cancel=True)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_inference_worker(config):
+    """Eén inferentie proces per GUI, gedeeld door alle ModelHandlers"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = InferenceWorker(config, config.get('inference_timeout', 120.0))
+        return _shared
+
+
+def peek_inference_worker():
+    return _shared
@@ -0,0 +1,193 @@
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+from logic.materialize import place_file
+
+
+def write_text_atomic(path, text):
+    """Schrijf naar een tijdelijk bestand ernaast en hernoem: een label is altijd heel of afwezig"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class IOQueue:
+    """
+    Write-behind wachtrij voor bestandsacties (kopiëren, verplaatsen, labels schrijven, verwijderen).
+
+    Eén worker thread voert de acties uit in de volgorde waarin ze zijn aangeboden, zodat de
+    GUI direct door kan naar het volgende beeld. Elke batch komt eerst in een journal (JSONL);
+    de worker doet de fsync vlak voor het uitvoeren, zodat de Tk thread nooit op de schijf wacht.
+    Na een crash worden onafgemaakte batches bij de volgende start opnieuw uitgevoerd. De acties
+    zijn daarvoor idempotent: ze kijken naar wat er al op de plaats van bestemming staat
+    (zie place_file), niet alleen of de bron nog bestaat. Zodra er geen batches meer openstaan
+    wordt het journal leeggemaakt, zodat het tijdens een sessie niet blijft groeien.
+    """
+
+    def __init__(self, journal_path="config/io_journal.jsonl", output_strategy="auto"):
+        self.journal_path = journal_path
+        self.output_strategy = output_strategy   # Hoe "place" beelden in de output zet (zie logic/materialize.py)
+        self.pending = 0            # Nog uit te voeren acties (voor de teller in de GUI)
+        self.done = 0
+        self.errors = []
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._next_id = int(time.time() * 1000)
+        self._open = set()          # Batches in het journal die nog niet klaar zijn
+
+        folder = os.path.dirname(journal_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        leftovers = self._read_unfinished()
+        self._journal = open(journal_path, 'w')   # Oud journal is ingelezen; opnieuw beginnen
+        for ops in leftovers:
+            print(f"I/O: {len(ops)} onafgemaakte bestandsacties van vorige sessie worden hersteld")
+            self.submit(ops)
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name="io-queue")
+        self._thread.start()
+
+    # --- JOURNAL ---
+    def _read_unfinished(self):
+        if not os.path.exists(self.journal_path):
+            return []
+        batches, finished = {}, set()
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # Half geschreven laatste regel
+                if "done" in rec:
+                    finished.add(rec["done"])
+                else:
+                    batches[rec["id"]] = rec["ops"]
+        return [ops for bid, ops in batches.items() if bid not in finished]
+
+    def _log(self, rec):
+        """Regel naar het journal (aanroepen met self._lock); alleen naar het OS, de fsync doet de worker"""
+        self._journal.write(json.dumps(rec) + "\n")
+        self._journal.flush()
+
+    def _sync(self):
+        """Journal naar de schijf, vóór de acties van een batch uitgevoerd worden (worker thread)"""
+        with self._lock:
+            fd = self._journal.fileno()
+        os.fsync(fd)
+
+    def _commit(self, batch_id):
+        """Batch klaar: journal leegmaken als niets meer openstaat, anders een 'done' regel (met self._lock)"""
+        self._open.discard(batch_id)
+        if self._open:
+            self._log({"done": batch_id})
+        else:
+            # Een niet-gesyncte truncate kan na stroomuitval hooguit klare batches herhalen (idempotent)
+            self._journal.seek(0)
+            self._journal.truncate()
+
+    # --- UI KANT ---
+    def submit(self, ops):
+        """
+        Plan een reeks acties in die samen horen (bv. alles van één 'Save & Next').
+        ops: lijst van tuples ("copy", src, dst) | ("move", src, dst) | ("write", pad, tekst) | ("remove", pad)
+             | ("place", src, dst, move_to): beeld in de output zetten zonder te kopiëren waar dat kan;
+               met move_to (delete_mode) gaat het origineel daarna naar die map
+        """
+        ops = [list(op) for op in ops]
+        if not ops:
+            return
+        with self._lock:
+            self._next_id += 1
+            batch_id = self._next_id
+            self._open.add(batch_id)
+            self._log({"id": batch_id, "ops": ops})
+            self.pending += len(ops)
+        self._queue.put((batch_id, ops))
+
+    def flush(self, timeout=None):
+        """Wachten tot alle acties uitgevoerd zijn (bv. bij afsluiten); True als de wachtrij leeg is"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self.pending > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def status_text(self):
+        if self.pending:
+            return f"I/O: {self.pending} acties in wachtrij"
+        if self.errors:
+            return f"I/O: {len(self.errors)} fouten (zie console)"
+        return ""
+
+    # --- WORKER KANT ---
+    def _execute(self, op):
+        kind = op[0]
+        if kind == "place":
+            # place_file maakt zelf een half uitgevoerde plaatsing af (bron al hernoemd, link nog niet)
+            place_file(op[1], op[2], self.output_strategy, op[3])
+        elif kind == "copy":
+            src, dst = op[1], op[2]
+            if os.path.exists(src):
+                shutil.copy(src, dst)
+        elif kind == "move":
+            src, dst = op[1], op[2]
+            if os.path.exists(src):
+                shutil.move(src, dst)
+        elif kind == "write":
+            write_text_atomic(op[1], op[2])
+        elif kind == "remove":
+            if os.path.exists(op[1]):
+                os.remove(op[1])
+        else:
+            raise ValueError(f"Onbekende I/O actie: {kind}")
+
+    def _run(self):
+        while True:
+            batch_id, ops = self._queue.get()
+            try:
+                self._sync()
+            except OSError as e:
+                print(f"I/O journal fout: {e}")
+            for op in ops:
+                try:
+                    self._execute(op)
+                except Exception as e:
+                    print(f"I/O fout bij {op[0]} {op[1]}: {e}")
+                    with self._lock:
+                        self.errors.append((op, str(e)))
+            # Pas na het vastleggen telt de batch als klaar (flush wacht daar dus ook op)
+            with self._idle:
+                self._commit(batch_id)
+                self.pending -= len(ops)
+                self.done += len(ops)
+                self._idle.notify_all()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_io_queue(config=None):
+    """Eén wachtrij per proces, zodat alle tabs dezelfde volgorde delen"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            config = config or {}
+            _shared = IOQueue(config.get('io_journal', 'config/io_journal.jsonl'),
+                              config.get('output_strategy', 'auto'))
+        return _shared
+
+
+def peek_io_queue():
+    return _shared
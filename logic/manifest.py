@@ -0,0 +1,199 @@
+import os
+import sqlite3
+import threading
+import time
+
+from logic.folder_index import get_folder_index
+
+PENDING = "pending"
+PREANNOTATED = "preannotated"
+ANNOTATED = "annotated"
+SKIPPED = "skipped"
+REJECTED = "rejected"
+DELETED = "deleted"
+
+STATES = (PENDING, PREANNOTATED, ANNOTATED, SKIPPED, REJECTED, DELETED)
+# Nog te doen: nieuw, alleen door de AI voorspeld, of afgekeurd bij controle
+TODO_STATES = (PENDING, PREANNOTATED, REJECTED)
+
+
+class Manifest:
+    """
+    Werkstatus per afbeelding (SQLite), sleutel = (map, bestandsnaam), zodat twee input mappen
+    met dezelfde bestandsnamen elkaars status niet overschrijven. Een Manifest object hoort bij
+    één map (`folder`, normaal de input map); de database kan meerdere mappen bevatten.
+
+    Legt per beeld de status, het geschreven label en tijdstempels vast, zodat een sessie
+    hervat bij het eerste openstaande beeld en "hoeveel nog" een COUNT is in plaats van
+    een directory scan. De bestanden zelf worden nog steeds naar de output/delete mappen
+    verplaatst (daar verwacht de YOLO training ze); het manifest is de bron voor de status.
+    """
+
+    def __init__(self, db_path, folder=""):
+        self.db_path = db_path
+        self.folder = os.path.normcase(os.path.abspath(folder)) if folder else ""
+        self._lock = threading.Lock()
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            folder = os.path.dirname(self.db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(images)")]
+            if columns and "folder" not in columns:
+                # Oud schema (sleutel = alleen de naam): regels overnemen voor deze map
+                conn.execute("ALTER TABLE images RENAME TO images_old")
+                conn.execute("DROP INDEX IF EXISTS idx_state")
+            conn.execute("""CREATE TABLE IF NOT EXISTS images (
+                folder TEXT NOT NULL, name TEXT NOT NULL, state TEXT NOT NULL, label TEXT,
+                created REAL, updated REAL, PRIMARY KEY (folder, name))""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_state ON images(folder, state, name)")
+            if columns and "folder" not in columns:
+                conn.execute("""INSERT OR IGNORE INTO images SELECT ?, name, state, label, created, updated
+                                FROM images_old""", (self.folder,))
+                conn.execute("DROP TABLE images_old")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # --- SYNCHRONISATIE MET DE MAP ---
+    def sync(self, added, removed=()):
+        """Nieuwe bestanden als 'pending' registreren (bestaande regels blijven ongemoeid)"""
+        if not added:
+            return
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO images (folder, name, state, created, updated) VALUES (?, ?, ?, ?, ?)",
+                [(self.folder, name, PENDING, now, now) for name in added])
+            self.conn.commit()
+
+    def track(self, index, sync_existing=True):
+        """Manifest bijhouden voor een FolderIndex (nu én bij elke wijziging die de watcher ziet)"""
+        if self.sync in index.listeners:
+            return
+        if sync_existing:
+            self.sync(index.files)
+        index.listeners.append(self.sync)
+
+    # --- STATUS ---
+    def set_state(self, name, state, label=None):
+        if state not in STATES:
+            raise ValueError(f"Onbekende status: {state}")
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                """INSERT INTO images (folder, name, state, label, created, updated) VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(folder, name) DO UPDATE SET state=excluded.state,
+                   label=COALESCE(excluded.label, images.label), updated=excluded.updated""",
+                (self.folder, name, state, label, now, now))
+            self.conn.commit()
+
+    def mark_many(self, names, state, only_from=None):
+        """Status van veel beelden tegelijk zetten; `only_from` beperkt tot beelden in die status"""
+        now = time.time()
+        sql = "UPDATE images SET state=?, updated=? WHERE folder=? AND name=?"
+        if only_from:
+            sql += f" AND state IN ({','.join('?' * len(only_from))})"
+        with self._lock:
+            self.conn.executemany(sql, [(state, now, self.folder, name, *(only_from or ())) for name in names])
+            self.conn.commit()
+
+    def state(self, name):
+        with self._lock:
+            row = self.conn.execute("SELECT state FROM images WHERE folder=? AND name=?", (self.folder, name)).fetchone()
+        return row[0] if row else None
+
+    def label(self, name):
+        with self._lock:
+            row = self.conn.execute("SELECT label FROM images WHERE folder=? AND name=?", (self.folder, name)).fetchone()
+        return row[0] if row else None
+
+    # --- QUERIES ---
+    def first_todo(self, after=None):
+        """Eerste openstaande beeld (alfabetisch, gelijk aan de volgorde van de FolderIndex)"""
+        marks = ",".join("?" * len(TODO_STATES))
+        sql = f"SELECT name FROM images WHERE folder=? AND state IN ({marks})"
+        args = [self.folder, *TODO_STATES]
+        if after is not None:
+            sql += " AND name > ?"
+            args.append(after)
+        with self._lock:
+            row = self.conn.execute(sql + " ORDER BY name LIMIT 1", args).fetchone()
+        return row[0] if row else None
+
+    def resume_index(self, index, folder, max_tries=100):
+        """Positie in `index` van het eerste openstaande beeld dat ook echt nog in de map staat"""
+        name = self.first_todo()
+        for _ in range(max_tries):
+            if name is None:
+                break
+            i = index.index_of(name)
+            if i is not None and os.path.exists(os.path.join(folder, name)):
+                return i
+            name = self.first_todo(after=name)
+        return 0
+
+    def names(self, states=TODO_STATES):
+        """
+        Namen in `states` (om een map-index direct te vullen). Standaard alleen de openstaande:
+        geannoteerde, overgeslagen en verwijderde beelden staan niet meer in de input map.
+        """
+        marks = ",".join("?" * len(states))
+        with self._lock:
+            rows = self.conn.execute(f"SELECT name FROM images WHERE folder=? AND state IN ({marks})",
+                                     (self.folder, *states)).fetchall()
+        return [r[0] for r in rows]
+
+    def count(self, states=TODO_STATES):
+        marks = ",".join("?" * len(states))
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM images WHERE folder=? AND state IN ({marks})",
+                                     (self.folder, *states)).fetchone()[0]
+
+    def counts(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT state, COUNT(*) FROM images WHERE folder=? GROUP BY state",
+                                     (self.folder,)).fetchall()
+        result = {s: 0 for s in STATES}
+        result.update(dict(rows))
+        return result
+
+    def summary(self):
+        c = self.counts()
+        todo = sum(c[s] for s in TODO_STATES)
+        return (f"{todo} te gaan | {c[ANNOTATED]} geannoteerd, {c[SKIPPED]} overgeslagen, "
+                f"{c[REJECTED]} afgekeurd, {c[DELETED]} verwijderd")
+
+
+def open_tracked_index(config, folder, manifest):
+    """
+    Gedeelde FolderIndex van `folder`, meteen gevuld met de openstaande namen uit het manifest
+    (geen directory scan bij het opstarten); de watcher corrigeert daarna het verschil.
+    """
+    known = manifest.names()
+    index = get_folder_index(folder, config.get('folder_poll_interval', 2.0), initial=known or None)
+    manifest.track(index, sync_existing=not known)
+    index.poll()
+    return index
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(config, folder=None):
+    """Eén gedeeld manifest per database bestand en map (standaard de input map)"""
+    path = config.get('manifest', 'config/manifest.sqlite')
+    if folder is None:
+        folder = config.get('input_folder', '')
+    key = (path, os.path.normcase(os.path.abspath(folder)) if folder else "")
+    with _manifests_lock:
+        if key not in _manifests:
+            _manifests[key] = Manifest(path, folder)
+        return _manifests[key]
@@ -0,0 +1,113 @@
+import errno
+import os
+import shutil
+import threading
+
+STRATEGIES = ("auto", "rename", "hardlink", "reflink", "copy")
+
+FICLONE = 0x40049409   # Linux ioctl: bestand delen op blokniveau (btrfs, xfs, ...)
+
+
+class MaterializeStats:
+    """Telt per methode hoeveel bestanden en bytes er zonder (en met) kopiëren geplaatst zijn"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = {}
+        self.bytes_saved = 0
+        self.bytes_copied = 0
+
+    def record(self, method, nbytes):
+        with self.lock:
+            self.files[method] = self.files.get(method, 0) + 1
+            if method == "copy":
+                self.bytes_copied += nbytes
+            else:
+                self.bytes_saved += nbytes
+
+    def summary(self):
+        per_method = ", ".join(f"{n}x {m}" for m, n in sorted(self.files.items()))
+        return (f"Output: {per_method or 'niets'} | {self.bytes_saved / 1024 / 1024:.1f} MB niet gekopieerd, "
+                f"{self.bytes_copied / 1024 / 1024:.1f} MB gekopieerd")
+
+
+stats = MaterializeStats()
+
+
+def _reflink(src, dst):
+    import fcntl  # Alleen op Linux/Unix; elders valt de aanroeper terug op kopiëren
+    with open(src, 'rb') as fs, open(dst, 'wb') as fd:
+        try:
+            fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+        except OSError:
+            fd.close()
+            os.remove(dst)
+            raise
+
+
+def link_or_copy(src, dst, strategy="auto"):
+    """
+    Zet een kopie van `src` op `dst` zonder `src` aan te raken: hardlink (zelfde bestandssysteem),
+    reflink (FICLONE) of, als niets anders kan, een echte kopie. Geeft de gebruikte methode terug.
+
+    Er wordt eerst naar een tijdelijk bestand ernaast geschreven en dan hernoemd, zodat `dst`
+    na een crash nooit half bestaat (de I/O wachtrij leidt bij herstel af wat nog moet uit wat er staat).
+    """
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)  # os.link en FICLONE willen een nieuw doel
+    method = "copy"
+    if strategy in ("auto", "rename", "hardlink"):
+        try:
+            os.link(src, tmp)
+            method = "hardlink"
+        except OSError:
+            pass
+    if method == "copy" and strategy in ("auto", "rename", "reflink"):
+        try:
+            _reflink(src, tmp)
+            method = "reflink"
+        except (OSError, ImportError):
+            pass
+    if method == "copy":
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+    return method
+
+
+def place_file(src, dst, strategy="auto", move_to=None):
+    """
+    Zet het bronbeeld in de output map. Met `move_to` gaat het origineel daarna naar die map
+    (delete_mode); dan wordt het bestand waar mogelijk gewoon hernoemd in plaats van gekopieerd.
+    Beide mappen hebben na afloop het beeld, net als met copy + move.
+
+    Als `src` al weg is maar het hernoemen naar `dst` gelukt is (crash vóór de link naar
+    `move_to`), wordt alleen die laatste stap nog gedaan; zo is opnieuw uitvoeren altijd veilig.
+    """
+    if strategy not in STRATEGIES:
+        strategy = "auto"
+    if not os.path.exists(src):
+        if move_to is not None and os.path.exists(dst) and not os.path.exists(move_to):
+            link_or_copy(dst, move_to, strategy)
+            return "resumed"
+        return None
+    nbytes = os.path.getsize(src)
+
+    if move_to is not None and strategy in ("auto", "rename"):
+        try:
+            os.replace(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Ander bestandssysteem: hernoemen kan niet, dan gewoon de normale route
+        else:
+            # Origineel staat nu in de output; de delete map krijgt een link (of kopie) daarvan
+            method = link_or_copy(dst, move_to, strategy)
+            stats.record("rename" if method != "copy" else "copy", nbytes)
+            return "rename"
+
+    method = link_or_copy(src, dst, strategy)
+    stats.record(method, nbytes)
+    if move_to is not None:
+        shutil.move(src, move_to)
+    return method
@@ -1,120 +1,422 @@
 import cv2
 import numpy as np
 import os
+import threading
+from logic.model_registry import get_registry, ModelRegistry
+from logic.prediction_store import PredictionStore
+from logic.prediction_cache import get_prediction_cache
+from logic.frame import Frame
+from logic.tiling import infer_tiled, tile_stats, format_timings
+
+READY = ModelRegistry.READY
+
+def results_to_annotations(results):
+    """Ultralytics Results (PyTorch of ONNX/OpenVINO export) naar de annotatie dicts van de tabs"""
+    anns = []
+    for r in results:
+        if r.masks is not None:
+            for i, seg_points in enumerate(r.masks.xy):
+                cls = int(r.boxes.cls[i])
+                anns.append({"type": "polygon", "class_id": cls, "points": seg_points.tolist()})
+        elif r.boxes is not None:
+            for box in r.boxes:
+                cls = int(box.cls[0])
+                x1, y1, x2, y2 = box.xyxy[0].tolist()
+                anns.append({"type": "bbox", "class_id": cls, "coords": [x1, y1, x2, y2]})
+    return anns
+
+
+def infer_standard(model, img, lock, conf=0.25):
+    """Eén detectie pass op een BGR beeld"""
+    with lock:
+        results = model(img, conf=conf)
+    return results_to_annotations(results)
+
+
+def infer_seg_polygon(model, img, lock, max_points=50):
+    """Segmentatie van het hele beeld; eerste masker als polygoon (uitgedund tot ~max_points punten)"""
+    with lock:
+        results = model(img, verbose=False)
+    if not results or not results[0].masks:
+        return []
+    masks = results[0].masks.xy
+    if len(masks) == 0:
+        return []
+    poly = masks[0]
+    if len(poly) > max_points + 10:
+        poly = poly[np.linspace(0, len(poly) - 1, max_points, dtype=int)]
+    return poly.tolist()
+
+
+def infer_dual(model_detect, model_seg, img_cv, detect_lock, seg_lock, expand_ratio=0.2, size=640):
+    """Detectie -> crops -> segmentatie op een BGR beeld (in dit proces of in het inference worker proces)"""
+    h_orig, w_orig = img_cv.shape[:2]
+    with detect_lock:
+        det_results = model_detect(img_cv, conf=0.25)
+
+    # 1. Alle boxen + klassen van dit frame
+    xyxy = np.concatenate([r.boxes.xyxy.cpu().numpy() for r in det_results] or [np.zeros((0, 4))])
+    classes = np.concatenate([r.boxes.cls.cpu().numpy() for r in det_results] or [np.zeros(0)]).astype(int)
+    if len(xyxy) == 0:
+        return []
+
+    # 2. Boxen vergroten (gevectoriseerd) en afronden naar crop-pixels
+    wh = xyxy[:, 2:] - xyxy[:, :2]
+    grown = np.concatenate([xyxy[:, :2] - wh * expand_ratio, xyxy[:, 2:] + wh * expand_ratio], axis=1)
+    grown = np.clip(grown, 0, [w_orig, h_orig, w_orig, h_orig]).astype(int)
+
+    # 3. Crops letterboxen naar één vaste grootte zodat ze als één batch door het seg model kunnen
+    batch, transforms, valid = [], [], []
+    for i, (nx1, ny1, nx2, ny2) in enumerate(grown):
+        crop = img_cv[ny1:ny2, nx1:nx2]
+        if crop.size == 0: continue
+        boxed, ratio, pad = letterbox(crop, size)
+        batch.append(boxed)
+        # (schaal, pad_x, pad_y, crop_x, crop_y) om terug te rekenen
+        transforms.append((ratio, pad[0], pad[1], nx1, ny1))
+        valid.append(i)
+
+    seg_results = []
+    if batch:
+        with seg_lock:
+            seg_results = model_seg(batch, conf=0.20, imgsz=size, verbose=False)
+
+    # 4. Alle polygonen verzamelen en in één stap naar originele coördinaten rekenen
+    polys, owners = [], []
+    for crop_idx, sr in enumerate(seg_results):
+        if sr.masks is None: continue
+        for seg_points in sr.masks.xy:
+            if len(seg_points) > 0:
+                polys.append(np.asarray(seg_points, dtype=np.float32))
+                owners.append(crop_idx)
+
+    mapped = []
+    if polys:
+        lengths = [len(p) for p in polys]
+        t = np.asarray(transforms, dtype=np.float32)[np.repeat(owners, lengths)]
+        pts = np.concatenate(polys)
+        pts = (pts - t[:, 1:3]) / t[:, :1] + t[:, 3:5]
+        mapped = np.split(pts, np.cumsum(lengths)[:-1])
+
+    final_annotations = []
+    has_mask = set()
+    for crop_idx, pts in zip(owners, mapped):
+        det_idx = valid[crop_idx]
+        has_mask.add(det_idx)
+        final_annotations.append({
+            "type": "polygon",
+            "class_id": int(classes[det_idx]),
+            "points": pts.tolist()
+        })
+
+    # Fallback: als seg faalt, gebruik bbox
+    for det_idx in range(len(xyxy)):
+        if det_idx not in has_mask:
+            final_annotations.append({
+                "type": "bbox",
+                "class_id": int(classes[det_idx]),
+                "coords": xyxy[det_idx].tolist()
+            })
+
+    return final_annotations
+
+
+def letterbox(img, size, color=(114, 114, 114)):
+    """Schaal naar size x size met behoud van verhouding; geeft (beeld, schaal, (pad_x, pad_y))"""
+    h, w = img.shape[:2]
+    ratio = min(size / w, size / h)
+    nw, nh = max(1, int(round(w * ratio))), max(1, int(round(h * ratio)))
+    resized = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - nw) // 2, (size - nh) // 2
+    out = np.full((size, size, 3), color, dtype=img.dtype)
+    out[pad_y:pad_y + nh, pad_x:pad_x + nw] = resized
+    return out, ratio, (pad_x, pad_y)
+
 
 class ModelHandler:
-    def __init__(self, config):
+    def __init__(self, config, registry=None, use_worker=None):
         self.config = config
-        self.model_detect = None
-        self.model_seg = None
+        # Modellen komen uit de gedeelde registry: pas geladen bij eerste gebruik
+        # (in een achtergrond thread) en nooit dubbel in het geheugen.
+        # De backend (torch / onnx / openvino) komt uit de setting 'inference_backend'
+        self.registry = registry or get_registry(config)
         
         # Paden ophalen uit config
-        path_detect = self.config.get('model_path_detect', 'cowcatcherV15.pt')
-        path_seg = self.config.get('model_path_seg', 'yolo11x-seg.pt')
-        
-        # Probeer modellen te laden
+        self.path_detect = self.config.get('model_path_detect', 'cowcatcherV15.pt')
+        self.path_seg = self.config.get('model_path_seg', 'yolo11x-seg.pt')
+
+        # Resultaten van de headless pre-annotatie (python -m logic.preannotate)
+        self.store = PredictionStore(self.config.get('prediction_store', 'config/preannotations.jsonl'))
+
+        # Persistente cache (beeld-hash + model-hash + parameters); gewichten hashen op de achtergrond
+        self.cache = get_prediction_cache(self.config)
+        threading.Thread(target=self._bind_cache_slots, daemon=True, name="cache-bind").start()
+
+        # Inferentie in een apart proces (setting 'inference_worker'), zodat torch de GIL van de GUI
+        # niet vasthoudt; de modellen worden dan alleen in dat proces geladen
+        if use_worker is None:
+            use_worker = self.config.get('inference_worker', True)
+        self.worker = None
+        if use_worker:
+            from logic.inference_worker import get_inference_worker
+            self.worker = get_inference_worker(self.config)
+
+    def _bind_cache_slots(self):
+        """
+        Oude voorspellingen opruimen als de gewichten in de instellingen veranderd zijn.
+        Leest ook de pre-annotatie store alvast in, zodat de eerste stored() daar niet op wacht.
+        """
         try:
-            from ultralytics import YOLO
-            
-            if os.path.exists(path_detect):
-                self.model_detect = YOLO(path_detect)
-                print(f"Detectie model geladen: {path_detect}")
-            else:
-                print(f"Let op: Detectie model bestand niet gevonden: {path_detect}")
+            len(self.store)
+        except Exception as e:
+            print(f"Prediction store fout: {e}")
+        try:
+            self.cache.bind_slot('detect', self.path_detect)
+            self.cache.bind_slot('seg', self.path_seg)
+        except Exception as e:
+            print(f"Prediction cache fout: {e}")
 
-            if os.path.exists(path_seg):
-                self.model_seg = YOLO(path_seg)
-                print(f"Segmentatie model geladen: {path_seg}")
-            else:
-                print(f"Let op: Segmentatie model bestand niet gevonden: {path_seg}")
-                
-        except ImportError:
-            print("Ultralytics niet geïnstalleerd. Installeer met 'pip install ultralytics'")
+    def _cache_get(self, image, model_path, mode, **params):
+        image_path = self._source_path(image)
+        if image_path is None:
+            return None
+        try:
+            return self.cache.get(image_path, model_path, mode, **params, **self._variant_params(model_path))
         except Exception as e:
-            print(f"Error loading models: {e}")
+            print(f"Prediction cache fout: {e}")
+            return None
 
-    def predict_standard(self, image_path, conf=0.25):
-        """Standaard voorspelling (Single Model)"""
-        if not self.model_detect:
-            return []
-        
-        # Lezen en voorspellen
-        img = cv2.imread(image_path)
+    def _cache_put(self, image, model_path, mode, annotations, **params):
+        image_path = self._source_path(image)
+        if image_path is None:
+            return
+        try:
+            self.cache.put(image_path, model_path, mode, annotations, **params, **self._variant_params(model_path))
+        except Exception as e:
+            print(f"Prediction cache fout: {e}")
+
+    def _variant_params(self, model_path):
+        """Backend/precisie waarmee de modellen echt draaien (in het worker proces of hier) als extra cache sleutel"""
+        paths = model_path if isinstance(model_path, tuple) else (model_path,)
+        if self.worker is not None:
+            return ModelRegistry.variant_params([self.worker.variant(p) or self.registry.variant(p) for p in paths])
+        return self.registry.cache_params(*paths)
+
+    def model_key(self, model_path):
+        """Hash van de gewichten + backend/precisie: sleutel waarmee de pre-annotatie gemaakt is"""
+        paths = model_path if isinstance(model_path, tuple) else (model_path,)
+        try:
+            model_h = "+".join(self.cache.model_hash(p) for p in paths)
+        except OSError:
+            return None
+        variant = self._variant_params(model_path)
+        return ":".join([model_h] + [f"{k}={variant[k]}" for k in sorted(variant)])
+
+    def stored(self, image, conf=0.25):
+        """Pre-annotatie uit de store, alleen als die met deze gewichten op dit bestand gemaakt is"""
+        image_path = self._source_path(image)
+        # De pre-annotatie draait zonder tiles; met tiles aan dus niet gebruiken
+        if image_path is None or self.tiling_params():
+            return None
+        try:
+            return self.store.lookup(image_path, "standard", conf, self.model_key(self.path_detect))
+        except Exception as e:
+            print(f"Prediction store fout: {e}")
+            return None
+
+    @property
+    def model_detect(self):
+        """Detectie model, of None als het nog laadt of ontbreekt"""
+        return self.registry.get(self.path_detect)
+
+    @property
+    def model_seg(self):
+        """Segmentatie model, of None als het nog laadt of ontbreekt"""
+        return self.registry.get(self.path_seg)
+
+    def detect_state(self):
+        if self.worker is not None:
+            return self.worker.state(self.path_detect)
+        return self.registry.request(self.path_detect)
+
+    def seg_state(self):
+        if self.worker is not None:
+            return self.worker.state(self.path_seg)
+        return self.registry.request(self.path_seg)
+
+    def status_text(self, path):
+        """Laadstatus van een model (uit het worker proces als dat gebruikt wordt)"""
+        if self.worker is not None:
+            return self.worker.status_text(path)
+        return self.registry.status_text(path)
+
+    def _tag(self, image):
+        """Tag van een worker verzoek: (deze handler, beeldpad), zodat annuleren per eigenaar gaat"""
+        return (id(self), self._source_path(image))
+
+    def cancel_stale(self, keep_paths):
+        """Openstaande voorspellingen van deze handler annuleren voor beelden die niet meer in `keep_paths` staan"""
+        if self.worker is not None:
+            self.worker.cancel_except([(id(self), p) for p in keep_paths], scope=id(self))
+
+    @property
+    def backend(self):
+        return self.registry.backend
+
+    def parity_reports(self):
+        """Laatste parity check (export vs PyTorch) per model, voor zover beschikbaar"""
+        return {"detect": self.registry.parity(self.path_detect), "seg": self.registry.parity(self.path_seg)}
+
+    @staticmethod
+    def _read(image):
+        """Accepteert een pad, een Frame of een al gedecodeerd BGR beeld; geeft de BGR buffer (geen kopie)"""
+        if isinstance(image, Frame):
+            return image.full().bgr
+        if isinstance(image, np.ndarray):
+            return image
+        return cv2.imread(image)
+
+    @staticmethod
+    def _source_path(image):
+        """Bestandspad achter de invoer (voor cache/store), of None voor losse arrays"""
+        if isinstance(image, Frame):
+            return image.path
+        if isinstance(image, str):
+            return image
+        return None
+
+    def tiling_params(self):
+        """Instellingen voor sliced inferentie (setting 'tiled_inference'), of {} als die uit staat"""
+        if not self.config.get('tiled_inference', False):
+            return {}
+        return {
+            "tile_size": int(self.config.get('tile_size', 640)),
+            "tile_overlap": float(self.config.get('tile_overlap', 0.2)),
+            "tile_full_frame": bool(self.config.get('tile_full_frame', True)),
+            "tile_merge": self.config.get('tile_merge', 'nms'),
+            "tile_iou": float(self.config.get('tile_iou', 0.5)),
+            "tile_metric": self.config.get('tile_metric', 'ios'),
+            "tile_batch": int(self.config.get('tile_batch', 0)),
+        }
+
+    def predict_standard(self, image, conf=0.25, wait=True):
+        """
+        Standaard voorspelling (Single Model). `image`: pad, Frame of BGR array.
+        Met 'tiled_inference' aan: sliced over overlappende tiles (zie logic/tiling.py).
+        Geeft None als het verzoek in de inference worker geannuleerd is (zie cancel_stale).
+        """
+        image_path = self._source_path(image)
+        tiling = self.tiling_params()
+        stored = self.stored(image, conf)
+        if stored is not None:
+            return stored
+        cached = self._cache_get(image, self.path_detect, "standard", conf=conf, **tiling)
+        if cached is not None:
+            return cached
+
+        timings = None
+        if self.worker is not None:
+            if not wait and self.detect_state() != READY:
+                return []
+            # Lezen (alleen als er nog geen gedecodeerd beeld is); pixels via shared memory naar de worker
+            img = self._read(image)
+            if img is None: return []
+            anns = self.worker.predict(img, "tiled" if tiling else "standard", tag=self._tag(image), conf=conf, **tiling)
+            if anns is None:
+                return None  # Geannuleerd: gebruiker is al verder
+            if tiling:
+                anns, timings = anns
+        else:
+            model_detect = self.registry.get(self.path_detect, wait=wait)
+            if not model_detect:
+                return []
+
+            # Lezen (alleen als er nog geen gedecodeerd beeld is) en voorspellen
+            img = self._read(image)
+            if img is None: return []
+            if tiling:
+                anns, timings = infer_tiled(model_detect, img, self.registry.lock_for(self.path_detect), conf, **tiling)
+            else:
+                anns = infer_standard(model_detect, img, self.registry.lock_for(self.path_detect), conf)
+        if tiling and timings:
+            tile_stats.record(timings)
+            print(f"Tiled {os.path.basename(image_path) if image_path else 'frame'}: {format_timings(timings)}")
+        self._cache_put(image, self.path_detect, "standard", anns, conf=conf, **tiling)
+        return anns
+
+    def predict_seg_polygon(self, image):
+        """
+        Segmentatie van het hele beeld (Seg tab): één polygoon als lijst [x, y] punten, [] als er
+        niets gevonden is, of None als het verzoek in de inference worker geannuleerd is.
+        """
+        cached = self._cache_get(image, self.path_seg, "seg_full")
+        if cached is not None:
+            return cached
+        img = self._read(image)
         if img is None: return []
-        
-        results = self.model_detect(img, conf=conf)
-        return self._process_results(results)
+        if self.worker is not None:
+            poly = self.worker.predict(img, "seg_polygon", tag=self._tag(image))
+            if poly is None:
+                return None
+        else:
+            model_seg = self.registry.get(self.path_seg, wait=True)
+            if not model_seg:
+                return []
+            poly = infer_seg_polygon(model_seg, img, self.registry.lock_for(self.path_seg))
+        self._cache_put(image, self.path_seg, "seg_full", poly)
+        return poly
 
-    def predict_advanced_dual(self, image_path, expand_ratio=0.2):
-        """Advanced: Detectie -> Crop -> Segmentatie"""
-        if not self.model_detect or not self.model_seg:
-            return []
+    def predict_standard_batch(self, images, conf=0.25, wait=True):
+        """Standaard voorspelling voor een lijst beelden (Frames of BGR arrays) in één forward pass"""
+        model_detect = self.registry.get(self.path_detect, wait=wait)
+        if not model_detect or not images:
+            return [[] for _ in images]
 
-        img_cv = cv2.imread(image_path)
-        if img_cv is None: return []
-        
-        h_orig, w_orig = img_cv.shape[:2]
-        det_results = self.model_detect(img_cv, conf=0.25)
-        final_annotations = []
-
-        for r in det_results:
-            boxes = r.boxes.cpu().numpy()
-            for box in boxes:
-                # 1. BBox coords
-                x1, y1, x2, y2 = box.xyxy[0]
-                cls = int(box.cls[0])
-                
-                # 2. Box vergroten
-                bw, bh = x2 - x1, y2 - y1
-                nx1 = max(0, x1 - (bw * expand_ratio))
-                ny1 = max(0, y1 - (bh * expand_ratio))
-                nx2 = min(w_orig, x2 + (bw * expand_ratio))
-                ny2 = min(h_orig, y2 + (bh * expand_ratio))
-                
-                # 3. Crop & Segment
-                crop = img_cv[int(ny1):int(ny2), int(nx1):int(nx2)]
-                if crop.size == 0: continue
-
-                seg_results = self.model_seg(crop, conf=0.20, verbose=False)
-                
-                # 4. Resultaat verwerken
-                found_mask = False
-                for sr in seg_results:
-                    if sr.masks is not None:
-                        for seg_points in sr.masks.xy:
-                            if len(seg_points) > 0:
-                                # Terugrekenen naar originele plaatje
-                                corrected_points = []
-                                for px, py in seg_points:
-                                    corrected_points.append([px + nx1, py + ny1])
-                                
-                                final_annotations.append({
-                                    "type": "polygon",
-                                    "class_id": cls,
-                                    "points": corrected_points
-                                })
-                                found_mask = True
-                
-                # Fallback: als seg faalt, gebruik bbox
-                if not found_mask:
-                    final_annotations.append({
-                        "type": "bbox",
-                        "class_id": cls,
-                        "coords": [x1, y1, x2, y2]
-                    })
-
-        return final_annotations
+        # Beelden die niet te lezen zijn overslaan (en [] teruggeven op hun plek)
+        decoded = [self._read(img) for img in images]
+        valid = [i for i, img in enumerate(decoded) if img is not None]
+        out = [[] for _ in images]
+        if not valid:
+            return out
+        with self.registry.lock_for(self.path_detect):
+            results = model_detect([decoded[i] for i in valid], conf=conf, verbose=False)
+        for i, r in zip(valid, results):
+            out[i] = self._process_results([r])
+        return out
+
+    def predict_advanced_dual(self, image, expand_ratio=0.2, wait=True):
+        """Advanced: Detectie -> Crop -> Segmentatie (alle crops van één frame in één batch)"""
+        size = int(self.config.get('seg_crop_size', 640))
+        paths = (self.path_detect, self.path_seg)
+        cached = self._cache_get(image, paths, "dual", expand_ratio=expand_ratio, size=size)
+        if cached is not None:
+            return cached
+
+        if self.worker is not None:
+            if not wait and (self.detect_state() != READY or self.seg_state() != READY):
+                return []
+            img_cv = self._read(image)
+            if img_cv is None: return []
+            anns = self.worker.predict(img_cv, "dual", tag=self._tag(image),
+                                       expand_ratio=expand_ratio, size=size)
+            if anns is None:
+                return None  # Geannuleerd
+        else:
+            model_detect = self.registry.get(self.path_detect, wait=wait)
+            model_seg = self.registry.get(self.path_seg, wait=wait)
+            if not model_detect or not model_seg:
+                return []
+            img_cv = self._read(image)
+            if img_cv is None: return []
+            anns = infer_dual(model_detect, model_seg, img_cv, self.registry.lock_for(self.path_detect),
+                              self.registry.lock_for(self.path_seg), expand_ratio, size)
+
+        self._cache_put(image, paths, "dual", anns, expand_ratio=expand_ratio, size=size)
+        return anns
+
+    @staticmethod
+    def _letterbox(img, size, color=(114, 114, 114)):
+        return letterbox(img, size, color)
 
     def _process_results(self, results):
-        anns = []
-        for r in results:
-            if r.masks is not None:
-                for i, seg_points in enumerate(r.masks.xy):
-                    cls = int(r.boxes.cls[i])
-                    anns.append({"type": "polygon", "class_id": cls, "points": seg_points.tolist()})
-            elif r.boxes is not None:
-                for box in r.boxes:
-                    cls = int(box.cls[0])
-                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                    anns.append({"type": "bbox", "class_id": cls, "coords": [x1, y1, x2, y2]})
-        return anns
\ No newline at end of file
+        return results_to_annotations(results)
\ No newline at end of file
@@ -0,0 +1,303 @@
+import os
+import threading
+
+from logic.inference_backend import BACKENDS, PRECISIONS, ExportCache, check_parity
+
+
+class ModelRegistry:
+    """
+    Eén gedeelde plek voor alle YOLO modellen in het proces.
+
+    Elk gewichtenbestand wordt hooguit één keer geladen, pas bij het eerste gebruik,
+    en altijd in een achtergrond thread. Tabs kunnen via state() een
+    "model laden..." indicator tonen.
+
+    Met `backend` = "onnx" of "openvino" (setting `inference_backend`) worden .pt gewichten
+    eenmalig geëxporteerd (zie ExportCache) en via ONNX Runtime / OpenVINO op de CPU gedraaid.
+    Na een nieuwe export vergelijkt een parity check de uitvoer met het PyTorch model.
+
+    Per model kan ook een int8 variant gekozen worden (`model_precision_detect/seg`): die wordt
+    eenmalig gekalibreerd op beelden uit de output map en draait via ONNX Runtime; de parity
+    check is dan het nauwkeurigheidsrapport van int8 tegenover fp32.
+    """
+
+    # Mogelijke states per model
+    IDLE = "idle"
+    LOADING = "loading"
+    READY = "ready"
+    MISSING = "missing"
+    ERROR = "error"
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        # YOLO modellen zijn niet thread-safe: één slot per model (zie lock_for), zodat
+        # detectie en segmentatie elkaar niet ophouden
+        self._inference_locks = {}
+        self.load_timeout = 900.0    # s; get(wait=True) wacht niet eeuwig op een vastgelopen export
+
+        self.backend = "torch"
+        self.exports = ExportCache()
+        self.sample_folders = ()     # Beelden voor de parity check
+        self.parity_samples = 8
+        self.calibration_folder = None
+        self.calibration_samples = 64
+        self.precision = {}          # genormaliseerd pad -> "fp32" | "int8"
+
+    def configure(self, config):
+        """Backend en export instellingen uit de config overnemen"""
+        backend = config.get('inference_backend', 'torch')
+        self.backend = backend if backend in BACKENDS else "torch"
+        self.exports.cache_dir = config.get('export_cache_dir', 'config/exports')
+        self.exports.imgsz = int(config.get('export_imgsz', 640))
+        self.sample_folders = (config.get('output_img_folder'), config.get('input_folder'))
+        self.parity_samples = int(config.get('parity_samples', 8))
+        self.calibration_folder = config.get('output_img_folder')
+        self.calibration_samples = int(config.get('calibration_samples', 64))
+        self.load_timeout = float(config.get('model_load_timeout', 900.0))
+        for slot in ("detect", "seg"):
+            path = config.get(f'model_path_{slot}')
+            precision = config.get(f'model_precision_{slot}', 'fp32')
+            if path:
+                self.precision[self._norm(path)] = precision if precision in PRECISIONS else "fp32"
+
+    @staticmethod
+    def _norm(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def lock_for(self, path):
+        """Inferentie slot van dit gewichtenbestand (hetzelfde voor elke backend/precisie)"""
+        key = self._norm(path) if path else None
+        with self._lock:
+            return self._inference_locks.setdefault(key, threading.Lock())
+
+    def precision_for(self, path):
+        return self.precision.get(self._norm(path), "fp32")
+
+    def _key(self, path):
+        # Zelfde gewichten met een andere backend of precisie is een ander model
+        return (self._norm(path), self.backend, self.precision_for(path))
+
+    def variant(self, path):
+        """
+        (backend, precisie) waarmee dit model echt draait: na het laden die van het entry (een
+        mislukte export valt terug op torch/fp32), daarvoor de instellingen. Int8 draait altijd via ONNX Runtime.
+        """
+        entry = self._entries.get(self._key(path)) if path else None
+        if entry is not None and entry["state"] == self.READY:
+            return entry["backend"], entry["precision"]
+        precision = self.precision_for(path) if path else "fp32"
+        return ("onnx" if precision == "int8" else self.backend), precision
+
+    @staticmethod
+    def variant_params(variants):
+        """Extra sleutel voor de prediction cache uit (backend, precisie) paren: uitvoer van een export of int8 model kan licht afwijken"""
+        backends = [b for b, _ in variants]
+        precisions = [p for _, p in variants]
+        params = {}
+        if any(b != "torch" for b in backends):
+            params["backend"] = ",".join(dict.fromkeys(backends))
+        if "int8" in precisions:
+            params["precision"] = ",".join(precisions)
+        return params
+
+    def cache_params(self, *paths):
+        """Cache sleutel voor de modellen zoals ze in dit proces (gaan) draaien"""
+        return self.variant_params([self.variant(p) for p in paths])
+
+    def request(self, path):
+        """Start het laden (als dat nog niet gebeurd is) en geef de huidige state terug."""
+        if not path:
+            return self.MISSING
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {
+                    "path": path, "backend": self.backend, "precision": self.precision_for(path),
+                    "source": path, "state": self.IDLE, "note": None,
+                    "model": None, "error": None, "bytes": 0, "parity": None, "event": threading.Event()
+                }
+                self._entries[key] = entry
+            if entry["state"] != self.IDLE:
+                return entry["state"]
+            entry["state"] = self.LOADING
+
+        threading.Thread(target=self._load, args=(entry,), daemon=True, name="model-load").start()
+        return self.LOADING
+
+    def _load(self, entry):
+        path = entry["path"]
+        try:
+            if not os.path.exists(path):
+                print(f"Let op: Model bestand niet gevonden: {path}")
+                entry["state"] = self.MISSING
+                return
+
+            from ultralytics import YOLO
+            source, exported = self._resolve(entry)
+            model = YOLO(source)
+            entry["source"] = source
+            entry["bytes"] = self._model_bytes(model, source)
+            entry["model"] = model
+            entry["state"] = self.READY
+            self._alias(entry)
+            print(f"Model geladen: {source} ({self._variant(entry)}, {entry['bytes'] / 1e6:.0f} MB)")
+            if source != path:
+                entry["parity"] = self.exports.read_report(source)
+                if exported or entry["parity"] is None:
+                    threading.Thread(target=self._parity, args=(entry,), daemon=True, name="parity").start()
+        except ImportError:
+            entry["error"] = "Ultralytics niet geïnstalleerd. Installeer met 'pip install ultralytics'"
+            entry["state"] = self.ERROR
+            print(entry["error"])
+        except Exception as e:
+            entry["error"] = str(e)
+            entry["state"] = self.ERROR
+            print(f"Error loading model {path}: {e}")
+        finally:
+            entry["event"].set()
+
+    def _alias(self, entry):
+        """
+        Na een terugval (export of int8 mislukt) het entry ook onder de sleutel van de echt
+        gebruikte backend/precisie zetten, zodat die combinatie het geladen model hergebruikt.
+        """
+        key = (self._norm(entry["path"]), entry["backend"], entry["precision"])
+        with self._lock:
+            self._entries.setdefault(key, entry)
+
+    @staticmethod
+    def _variant(entry):
+        text = f"{entry['backend']} int8" if entry["precision"] == "int8" else entry["backend"]
+        return f"{text}, {entry['note']}" if entry["note"] else text
+
+    def _calibration_paths(self):
+        """Kalibratiebeelden: al geannoteerde beelden uit de output map"""
+        from logic.parity import sample_paths
+        return sample_paths((self.calibration_folder,), self.calibration_samples)
+
+    def _calibration_images(self, paths):
+        """Kalibratiebeelden lazy en verkleind tot imgsz gedecodeerd (niet alle 4K frames tegelijk in geheugen)"""
+        from logic.parity import load_images
+        return load_images(paths, self.exports.imgsz)
+
+    def _resolve(self, entry):
+        """Pad voor de gekozen backend; bij een mislukte export terug naar fp32 / de PyTorch gewichten"""
+        if entry["precision"] == "int8":
+            try:
+                # Onthouden welke beelden de kalibratie gebruikt, zodat de parity check ze overslaat
+                entry["calibration"] = self._calibration_paths()
+                resolved = self.exports.resolve(entry["path"], entry["backend"], "int8",
+                                                lambda: self._calibration_images(entry["calibration"]))
+                entry["backend"] = "onnx"   # Int8 draait altijd via ONNX Runtime, ongeacht de backend instelling
+                return resolved
+            except Exception as e:
+                print(f"Int8 model bouwen mislukt ({e}); fp32 wordt gebruikt")
+                entry["precision"] = "fp32"
+                entry["note"] = "int8 mislukt"
+        try:
+            return self.exports.resolve(entry["path"], entry["backend"])
+        except Exception as e:
+            print(f"Export naar {entry['backend']} mislukt ({e}); PyTorch wordt gebruikt")
+            entry["backend"] = "torch"
+            entry["note"] = "export mislukt"
+            return entry["path"], False
+
+    def _parity(self, entry):
+        """Export vergelijken met de .pt gewichten op een paar bestaande beelden"""
+        try:
+            from logic.parity import load_images, sample_paths
+            # Bij int8 de kalibratiebeelden uitsluiten (anders is het rapport te rooskleurig)
+            exclude = (entry.get("calibration") or ()) if entry["precision"] == "int8" else ()
+            paths = sample_paths(self.sample_folders, self.parity_samples, exclude)
+            if not paths:
+                print("Parity check overgeslagen: geen beelden gevonden")
+                return
+            images = load_images(paths)
+            ref = "fp32" if entry["precision"] == "int8" else "torch"
+            name = f"{os.path.basename(entry['path'])} {ref} vs {self._variant(entry)}"
+            report = check_parity(entry["path"], entry["source"], images, name)
+            self.exports.write_report(entry["source"], report)
+            entry["parity"] = report.to_dict()
+            print(report.summary())
+        except Exception as e:
+            print(f"Parity check mislukt: {e}")
+
+    @staticmethod
+    def _model_bytes(model, path):
+        """Geheugengebruik van de gewichten; valt terug op de bestandsgrootte."""
+        try:
+            return sum(p.numel() * p.element_size() for p in model.model.parameters())
+        except Exception:
+            try:
+                if os.path.isdir(path):  # OpenVINO export is een map
+                    return sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+                return os.path.getsize(path)
+            except OSError:
+                return 0
+
+    def get(self, path, wait=False, timeout=None):
+        """
+        Geeft het model terug, of None als het (nog) niet beschikbaar is.
+        Met `wait` wordt hooguit `timeout` s (standaard `load_timeout`) op het laden gewacht.
+        """
+        if not path:
+            return None
+        self.request(path)
+        entry = self._entries[self._key(path)]
+        timeout = self.load_timeout if timeout is None else timeout
+        if wait and not entry["event"].wait(timeout):
+            print(f"Model {os.path.basename(path)} na {timeout:.0f} s nog niet geladen")
+        return entry["model"]
+
+    def state(self, path):
+        if not path:
+            return self.MISSING
+        entry = self._entries.get(self._key(path))
+        return entry["state"] if entry else self.IDLE
+
+    def memory_bytes(self, path=None):
+        """Geheugen van één model, of van alle geladen modellen samen."""
+        if path is not None:
+            entry = self._entries.get(self._key(path))
+            return entry["bytes"] if entry else 0
+        unique = {id(e): e for e in self._entries.values()}   # Entries kunnen onder twee sleutels staan
+        return sum(e["bytes"] for e in unique.values())
+
+    def parity(self, path):
+        """Resultaat van de laatste parity check van de export (dict), of None"""
+        entry = self._entries.get(self._key(path)) if path else None
+        return entry["parity"] if entry else None
+
+    def status_text(self, path):
+        """Korte tekst voor een statuslabel in de GUI."""
+        state = self.state(path)
+        name = os.path.basename(path) if path else "-"
+        entry = self._entries.get(self._key(path)) if path else None
+        if entry is not None and (entry["backend"] != "torch" or entry["precision"] == "int8" or entry["note"]):
+            name += f" [{self._variant(entry)}]"
+        if state == self.READY:
+            return f"{name}: gereed ({self.memory_bytes(path) / 1e6:.0f} MB)"
+        if state == self.LOADING:
+            return f"{name}: laden..."
+        if state == self.MISSING:
+            return f"{name}: niet gevonden"
+        if state == self.ERROR:
+            return f"{name}: fout bij laden"
+        return f"{name}: nog niet geladen"
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(config=None):
+    """De process-brede ModelRegistry (wordt bij eerste aanroep aangemaakt); `config` zet de backend."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        if config is not None:
+            _registry.configure(config)
+        return _registry
@@ -0,0 +1,172 @@
+import numpy as np
+
+
+def _as_box(ann):
+    """xyxy van een annotatie (bij een polygoon: de omsluitende box)"""
+    if ann["type"] == "bbox":
+        return ann["coords"]
+    pts = np.asarray(ann["points"], dtype=np.float32).reshape(-1, 2)
+    if len(pts) == 0:
+        return [0.0, 0.0, 0.0, 0.0]
+    return [*pts.min(axis=0).tolist(), *pts.max(axis=0).tolist()]
+
+
+def box_iou_matrix(a, b):
+    """IoU van elke box in `a` (N x 4, xyxy) met elke box in `b` (M x 4), in één numpy bewerking"""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).clip(0).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).clip(0).prod(axis=1)
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def mask_iou(points_a, points_b, shape):
+    """IoU van twee polygonen, gerasterd op beeldgrootte `shape` (h, w)"""
+    import cv2
+    h, w = shape[:2]
+    ma = np.zeros((h, w), np.uint8)
+    mb = np.zeros((h, w), np.uint8)
+    cv2.fillPoly(ma, [np.asarray(points_a, dtype=np.int32).reshape(-1, 1, 2)], 1)
+    cv2.fillPoly(mb, [np.asarray(points_b, dtype=np.int32).reshape(-1, 1, 2)], 1)
+    union = np.count_nonzero(ma | mb)
+    return np.count_nonzero(ma & mb) / union if union else 1.0
+
+
+def compare_annotations(ref, test, shape, iou_thr=0.5):
+    """
+    Vergelijk twee lijsten annotaties (zelfde formaat als ModelHandler) van hetzelfde beeld.
+    Greedy koppeling op box IoU; geeft tellingen en de IoU's van de gekoppelde paren.
+    """
+    result = {"ref": len(ref), "test": len(test), "matched": 0, "class_mismatch": 0,
+              "box_iou": [], "mask_iou": []}
+    if not ref or not test:
+        return result
+    iou = box_iou_matrix([_as_box(a) for a in ref], [_as_box(a) for a in test])
+    used_ref, used_test = set(), set()
+    for flat in np.argsort(-iou, axis=None):
+        i, j = np.unravel_index(flat, iou.shape)
+        if iou[i, j] < iou_thr:
+            break
+        if i in used_ref or j in used_test:
+            continue
+        used_ref.add(i)
+        used_test.add(j)
+        result["matched"] += 1
+        result["box_iou"].append(float(iou[i, j]))
+        if ref[i]["class_id"] != test[j]["class_id"]:
+            result["class_mismatch"] += 1
+        if ref[i]["type"] == "polygon" and test[j]["type"] == "polygon":
+            result["mask_iou"].append(mask_iou(ref[i]["points"], test[j]["points"], shape))
+    return result
+
+
+class ParityReport:
+    """Telt vergelijkingen over meerdere beelden op tot één overzicht"""
+
+    def __init__(self, name):
+        self.name = name
+        self.images = 0
+        self.ref = self.test = self.matched = self.class_mismatch = 0
+        self.box_iou = []
+        self.mask_iou = []
+        self.ref_ms = 0.0
+        self.test_ms = 0.0
+
+    def add(self, comparison):
+        self.images += 1
+        self.ref += comparison["ref"]
+        self.test += comparison["test"]
+        self.matched += comparison["matched"]
+        self.class_mismatch += comparison["class_mismatch"]
+        self.box_iou += comparison["box_iou"]
+        self.mask_iou += comparison["mask_iou"]
+
+    def recall(self):
+        """Deel van de referentie-objecten dat ook in de test-uitvoer gevonden is"""
+        return self.matched / self.ref if self.ref else 1.0
+
+    def to_dict(self):
+        return {
+            "name": self.name, "images": self.images,
+            "ref_objects": self.ref, "test_objects": self.test, "matched": self.matched,
+            "recall": round(self.recall(), 4), "class_mismatch": self.class_mismatch,
+            "mean_box_iou": round(float(np.mean(self.box_iou)), 4) if self.box_iou else None,
+            "mean_mask_iou": round(float(np.mean(self.mask_iou)), 4) if self.mask_iou else None,
+            "ref_ms_per_image": round(self.ref_ms / self.images, 1) if self.images else None,
+            "test_ms_per_image": round(self.test_ms / self.images, 1) if self.images else None,
+        }
+
+    def summary(self):
+        d = self.to_dict()
+        parts = [f"{d['matched']}/{d['ref_objects']} objecten gelijk ({d['recall']:.0%})"]
+        if d["mean_box_iou"] is not None:
+            parts.append(f"box IoU {d['mean_box_iou']:.3f}")
+        if d["mean_mask_iou"] is not None:
+            parts.append(f"mask IoU {d['mean_mask_iou']:.3f}")
+        if d["class_mismatch"]:
+            parts.append(f"{d['class_mismatch']} andere klasse")
+        if d["ref_ms_per_image"] is not None:
+            parts.append(f"{d['ref_ms_per_image']:.0f} -> {d['test_ms_per_image']:.0f} ms/beeld")
+        return f"Parity {self.name} ({self.images} beelden): " + ", ".join(parts)
+
+
+def run_parity(ref_model, test_model, images, name, conf=0.25):
+    """Beide modellen op dezelfde beelden (BGR arrays) draaien en de uitvoer vergelijken"""
+    import time
+    from logic.model_handler import results_to_annotations
+
+    report = ParityReport(name)
+    for img in images:
+        t0 = time.perf_counter()
+        ref = results_to_annotations(ref_model(img, conf=conf, verbose=False))
+        t1 = time.perf_counter()
+        test = results_to_annotations(test_model(img, conf=conf, verbose=False))
+        t2 = time.perf_counter()
+        report.ref_ms += (t1 - t0) * 1000
+        report.test_ms += (t2 - t1) * 1000
+        report.add(compare_annotations(ref, test, img.shape))
+    return report
+
+
+def sample_paths(folders, count=8, exclude=()):
+    """
+    Paden van tot `count` beelden, gelijk verdeeld over de eerste map die afbeeldingen bevat.
+    Paden in `exclude` (bv. de kalibratiebeelden) worden niet gekozen.
+    """
+    import os
+    from logic.folder_index import scan_images
+
+    excluded = {os.path.normcase(os.path.abspath(p)) for p in exclude}
+    for folder in folders:
+        if not folder or not os.path.isdir(folder):
+            continue
+        paths = [os.path.join(folder, n) for n in sorted(scan_images(folder))]
+        paths = [p for p in paths if os.path.normcase(os.path.abspath(p)) not in excluded]
+        if not paths:
+            continue
+        step = max(1, len(paths) // count)
+        return paths[::step][:count]
+    return []
+
+
+def load_images(paths, max_side=None):
+    """
+    Beelden één voor één decoderen (generator), zodat er nooit meer dan één tegelijk in het
+    geheugen staat. Met `max_side` wordt via de JPEG DCT verkleind gedecodeerd, met de langste zijde
+    nooit kleiner dan `max_side` (bv. de imgsz van het model, dat toch naar die grootte schaalt).
+    """
+    import cv2
+    from logic.frame import Frame
+
+    for path in paths:
+        if max_side:
+            frame = Frame.load_display(path, max_side, max_side, fill=1.0)
+            img = frame.bgr if frame is not None else None
+        else:
+            img = cv2.imread(path)
+        if img is not None:
+            yield img
@@ -0,0 +1,138 @@
+"""
+Headless pre-annotatie over de hele input map (zonder Tk).
+
+Gebruik (vanuit de projectmap):
+    python -m logic.preannotate --batch-size 8 --workers 4
+
+Resultaten (standaard detectie, zoals de Box tab die opzoekt) worden per batch naar de
+prediction store geschreven; bij een volgende run worden afbeeldingen die er al in staan overgeslagen.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from logic.folder_index import scan_images
+from logic import manifest as mf
+from logic.model_handler import ModelHandler
+from logic.prediction_store import PredictionStore
+
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg')
+
+
+def load_settings(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def decoded_images(paths, workers, lookahead):
+    """Decodeert afbeeldingen op een thread pool, maximaal `lookahead` vooruit"""
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="decode") as pool:
+        pending = deque()
+        it = iter(paths)
+        for path in it:
+            pending.append((path, pool.submit(cv2.imread, path)))
+            if len(pending) >= lookahead:
+                break
+        while pending:
+            path, fut = pending.popleft()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(cv2.imread, nxt)))
+            yield path, fut.result()
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run(settings, batch_size=8, workers=4, conf=0.25, store_path=None, limit=None):
+    in_folder = settings.get('input_folder', '')
+    if not os.path.isdir(in_folder):
+        print(f"Input map niet gevonden: {in_folder}")
+        return 1
+
+    store = PredictionStore(store_path or settings.get('prediction_store', 'config/preannotations.jsonl'))
+    handler = ModelHandler(settings, use_worker=False)  # Headless: geen GUI om vrij te houden
+
+    files = sorted(scan_images(in_folder, IMAGE_EXTENSIONS))
+    manifest = mf.get_manifest(settings)
+    manifest.sync(files)
+
+    # Modellen eerst laden (blokkerend): pas dan staat vast met welke backend/precisie ze draaien
+    # (een mislukte export valt terug op torch/fp32), en dat zit in de sleutel die de GUI opzoekt
+    if not handler.registry.get(handler.path_detect, wait=True):
+        print("Model kon niet geladen worden, gestopt.")
+        return 1
+
+    # Alleen overslaan wat met deze gewichten op precies dit bestand voorspeld is
+    model_key = handler.model_key(handler.path_detect)
+    todo = [f for f in files
+            if store.lookup(os.path.join(in_folder, f), "standard", conf, model_key) is None]
+    if limit:
+        todo = todo[:limit]
+    print(f"{len(files)} afbeeldingen, {len(files) - len(todo)} al voorspeld, {len(todo)} te doen")
+    if not todo:
+        return 0
+
+    paths = [os.path.join(in_folder, f) for f in todo]
+    done = 0
+    t_start = time.perf_counter()
+    t_report = t_start
+
+    try:
+        for batch in batched(decoded_images(paths, workers, batch_size * 2), batch_size):
+            batch = [(p, img) for p, img in batch if img is not None]
+            if not batch: continue
+
+            anns = handler.predict_standard_batch([img for _, img in batch], conf=conf)
+            records = [PredictionStore.record(p, "standard", conf, model_key, a) for (p, _), a in zip(batch, anns)]
+            store.append([r for r in records if r is not None])
+            # Alleen nog onaangeroerde beelden worden 'preannotated'
+            manifest.mark_many([os.path.basename(p) for p, _ in batch], mf.PREANNOTATED, only_from=(mf.PENDING,))
+            done += len(batch)
+
+            now = time.perf_counter()
+            if now - t_report >= 5 or done == len(todo):
+                rate = done / (now - t_start)
+                eta = (len(todo) - done) / rate if rate > 0 else 0
+                print(f"{done}/{len(todo)} | {rate:.2f} img/s | nog ~{eta / 60:.1f} min")
+                t_report = now
+    except KeyboardInterrupt:
+        print("Onderbroken; opnieuw starten hervat vanaf hier.")
+
+    elapsed = time.perf_counter() - t_start
+    print(f"Klaar: {done} afbeeldingen in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.2f} img/s)")
+    print(manifest.summary())
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-annoteer de input map zonder GUI")
+    parser.add_argument("--settings", default="config/settings.json")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4, help="Aantal decode threads")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--store", default=None, help="Pad naar de prediction store (JSONL)")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    settings = load_settings(args.settings)
+    return run(settings, batch_size=max(1, args.batch_size), workers=args.workers,
+               conf=args.conf, store_path=args.store, limit=args.limit)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class PredictionCache:
+    """
+    Persistente cache (SQLite) met AI voorspellingen.
+
+    Sleutel = hash van de beeldinhoud + hash van het modelbestand + modus/parameters,
+    dus een teruggezette (afgekeurde) of hernoemde afbeelding wordt herkend, en nieuwe
+    gewichten geven automatisch nieuwe sleutels. De database blijft onder `max_mb`
+    door de minst recent gebruikte regels te verwijderen.
+
+    Om niet bij elke get() het hele beeld te hoeven lezen, wordt de inhoudshash onthouden
+    per (naam, grootte, mtime_ns) - ook over sessies heen, en een verplaatst bestand houdt
+    die drie. Alleen een onbekend bestand wordt nog gehasht. Het bijwerken van last_used
+    en het totaal voor de LRU gebeuren in het geheugen en gaan mee met de volgende put().
+    """
+
+    FLUSH_TOUCHES = 100   # Na zoveel cache hits de last_used tijden alsnog wegschrijven
+
+    def __init__(self, db_path, max_mb=256):
+        self.db_path = db_path
+        self.max_bytes = int(float(max_mb) * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._file_hashes = {}   # (naam, grootte, mtime) -> hash
+        self._new_stamps = {}    # Nog niet weggeschreven (naam, grootte, mtime) -> hash
+        self._model_hashes = {}  # (pad, grootte, mtime) -> hash
+        self._touched = {}       # key -> last_used, nog niet weggeschreven
+        self._total = 0          # Som van `size` (bijgehouden, niet steeds opnieuw geteld)
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            folder = os.path.dirname(self.db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS predictions (
+                key TEXT PRIMARY KEY, model_hash TEXT, payload BLOB,
+                size INTEGER, last_used REAL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON predictions(last_used)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_model ON predictions(model_hash)")
+            # Model hashes onthouden (per pad, grootte en mtime) zodat grote gewichten maar één keer gehasht worden
+            conn.execute("""CREATE TABLE IF NOT EXISTS model_files (
+                path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, hash TEXT)""")
+            # Welk model hoort bij welke instelling ('detect', 'seg', ...)
+            conn.execute("""CREATE TABLE IF NOT EXISTS model_slots (
+                slot TEXT PRIMARY KEY, model_hash TEXT)""")
+            # Inhoudshash per (naam, grootte, mtime): dan hoeft een bekend beeld niet opnieuw gelezen te worden
+            conn.execute("""CREATE TABLE IF NOT EXISTS image_stamps (
+                name TEXT, size INTEGER, mtime INTEGER, hash TEXT, PRIMARY KEY (name, size, mtime))""")
+            conn.commit()
+            self._total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM predictions").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    # --- HASHING ---
+    @staticmethod
+    def _hash_file(path):
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def image_hash(self, path):
+        """Inhoudshash van een beeld; via (naam, grootte, mtime) zonder het bestand te lezen als het bekend is"""
+        st = os.stat(path)
+        stamp = (os.path.basename(path), st.st_size, st.st_mtime_ns)
+        digest = self._file_hashes.get(stamp)
+        if digest is not None:
+            return digest
+        with self._lock:
+            row = self.conn.execute("SELECT hash FROM image_stamps WHERE name=? AND size=? AND mtime=?",
+                                    stamp).fetchone()
+        if row is not None:
+            digest = row[0]
+        else:
+            digest = self._hash_file(path)
+            with self._lock:
+                self._new_stamps[stamp] = digest   # Weggeschreven bij de volgende put()
+        self._file_hashes[stamp] = digest
+        return digest
+
+    def model_hash(self, path):
+        st = os.stat(path)
+        abspath = os.path.abspath(path)
+        memo_key = (abspath, st.st_size, st.st_mtime_ns)
+        digest = self._model_hashes.get(memo_key)
+        if digest is not None:
+            return digest
+        with self._lock:
+            row = self.conn.execute("SELECT size, mtime, hash FROM model_files WHERE path=?", (abspath,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            digest = row[2]
+        else:
+            digest = self._hash_file(path)
+            with self._lock:
+                self.conn.execute("INSERT OR REPLACE INTO model_files VALUES (?, ?, ?, ?)",
+                                  (abspath, st.st_size, st.st_mtime_ns, digest))
+                self.conn.commit()
+        self._model_hashes[memo_key] = digest
+        return digest
+
+    def make_key(self, image_path, model_path, mode, **params):
+        """Sleutel voor deze combinatie, of None als een van de bestanden ontbreekt.
+        `model_path` mag ook een tuple zijn (bv. detectie + segmentatie in dual mode)."""
+        model_paths = model_path if isinstance(model_path, (list, tuple)) else [model_path]
+        try:
+            img_h = self.image_hash(image_path)
+            model_h = "+".join(self.model_hash(p) for p in model_paths)
+        except OSError:
+            return None, None
+        param_str = ",".join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{img_h}:{model_h}:{mode}:{param_str}", model_h
+
+    # --- LEZEN / SCHRIJVEN ---
+    def get(self, image_path, model_path, mode, **params):
+        key, _ = self.make_key(image_path, model_path, mode, **params)
+        if key is None:
+            return None
+        with self._lock:
+            row = self.conn.execute("SELECT payload FROM predictions WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            # Geen UPDATE + commit per hit: gaat mee met de volgende put() (of na FLUSH_TOUCHES hits)
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.FLUSH_TOUCHES:
+                self._write_pending()
+                self.conn.commit()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, image_path, model_path, mode, annotations, **params):
+        key, model_h = self.make_key(image_path, model_path, mode, **params)
+        if key is None:
+            return
+        payload = zlib.compress(json.dumps(annotations, default=float).encode('utf-8'))
+        with self._lock:
+            old = self.conn.execute("SELECT size FROM predictions WHERE key=?", (key,)).fetchone()
+            self.conn.execute("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                              (key, model_h, payload, len(payload), time.time()))
+            self._total += len(payload) - (old[0] if old else 0)
+            self._touched.pop(key, None)
+            self._write_pending()
+            self._evict()
+            self.conn.commit()
+
+    def _write_pending(self):
+        """Uitgestelde last_used tijden en nieuwe beeld-hashes wegschrijven (aanroepen met self._lock)"""
+        if self._touched:
+            self.conn.executemany("UPDATE predictions SET last_used=? WHERE key=?",
+                                  [(t, k) for k, t in self._touched.items()])
+            self._touched.clear()
+        if self._new_stamps:
+            self.conn.executemany("INSERT OR REPLACE INTO image_stamps VALUES (?, ?, ?, ?)",
+                                  [(*stamp, digest) for stamp, digest in self._new_stamps.items()])
+            self._new_stamps.clear()
+
+    def flush(self):
+        """Uitgestelde schrijfacties nu doen (bv. bij afsluiten)"""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._write_pending()
+            self.conn.commit()
+
+    def _evict(self):
+        """LRU: oudste regels weg tot we onder 90% van het budget zitten (aanroepen met self._lock)"""
+        if self._total <= self.max_bytes:
+            return
+        target = self._total - int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM predictions ORDER BY last_used"):
+            doomed.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self.conn.executemany("DELETE FROM predictions WHERE key=?", doomed)
+        self._total -= freed
+
+    # --- INVALIDATIE ---
+    def bind_slot(self, slot, model_path):
+        """
+        Koppel een instelling (bv. 'detect') aan het huidige modelbestand.
+        Zijn de gewichten voor die instelling veranderd, dan worden de oude voorspellingen verwijderd.
+        """
+        try:
+            new_hash = self.model_hash(model_path)
+        except OSError:
+            return
+        with self._lock:
+            row = self.conn.execute("SELECT model_hash FROM model_slots WHERE slot=?", (slot,)).fetchone()
+            if row and row[0] != new_hash:
+                # Alleen weggooien als geen andere instelling dit model nog gebruikt
+                in_use = self.conn.execute("SELECT 1 FROM model_slots WHERE model_hash=? AND slot!=?",
+                                           (row[0], slot)).fetchone()
+                if not in_use:
+                    self.conn.execute("DELETE FROM predictions WHERE instr(model_hash, ?) > 0", (row[0],))
+                    self._total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM predictions").fetchone()[0]
+            self.conn.execute("INSERT OR REPLACE INTO model_slots VALUES (?, ?)", (slot, new_hash))
+            self.conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM predictions").fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_prediction_cache(config):
+    """Eén gedeelde cache per database bestand"""
+    path = config.get('prediction_cache', 'config/prediction_cache.sqlite')
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = PredictionCache(path, config.get('prediction_cache_mb', 256))
+        return _caches[path]
+
+
+def peek_prediction_caches():
+    """Caches die deze sessie aangemaakt zijn (zonder er een te openen)"""
+    with _caches_lock:
+        return list(_caches.values())
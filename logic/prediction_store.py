@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+
+
+class PredictionStore:
+    """
+    Append-only JSONL bestand met voorspellingen per afbeelding.
+
+    Wordt gevuld door de headless pre-annotatie (python -m logic.preannotate) en
+    uitgelezen door de GUI, zodat annotators niet op inferentie hoeven te wachten.
+    Eén regel per afbeelding: {"file", "mode", "conf", "model", "size", "mtime_ns", "annotations"}.
+
+    Een regel geldt alleen zolang het model (hash van de gewichten + backend/precisie) en het
+    bestand (grootte + mtime) gelijk zijn; anders wordt opnieuw voorspeld.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        entries = {}
+        if self.path and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line: continue
+                    try:
+                        rec = json.loads(line)
+                        entries[rec['file']] = rec
+                    except (ValueError, KeyError):
+                        # Half geschreven laatste regel na een crash: overslaan
+                        continue
+        return entries
+
+    @property
+    def entries(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            return self._entries
+
+    def __contains__(self, filename):
+        return filename in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def stamp(image_path):
+        """(grootte, mtime_ns) van het bestand, of None als het niet (meer) bestaat"""
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    @classmethod
+    def record(cls, image_path, mode, conf, model, annotations):
+        """Regel voor append(); None als het bestand intussen weg is"""
+        stamp = cls.stamp(image_path)
+        if stamp is None:
+            return None
+        return {"file": os.path.basename(image_path), "mode": mode, "conf": conf, "model": model,
+                "size": stamp[0], "mtime_ns": stamp[1], "annotations": annotations}
+
+    def lookup(self, image_path, mode="standard", conf=None, model=None):
+        """Opgeslagen annotaties voor deze afbeelding, of None (ook als model of bestand veranderd is)"""
+        if not self.path or model is None:
+            return None
+        rec = self.entries.get(os.path.basename(image_path))
+        if rec is None or rec.get('mode') != mode or rec.get('model') != model:
+            return None
+        if conf is not None and rec.get('conf') is not None and abs(rec['conf'] - conf) > 1e-6:
+            return None
+        # Zelfde naam maar een ander (of gewijzigd) bestand: niet gebruiken
+        if self.stamp(image_path) != (rec.get('size'), rec.get('mtime_ns')):
+            return None
+        return rec['annotations']
+
+    def append(self, records):
+        """Schrijf een batch resultaten weg (en flush direct, zodat hervatten altijd werkt)"""
+        if not records: return
+        entries = self.entries
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._lock:
+            # Na een crash kan de laatste regel half zijn: eerst afsluiten met een newline
+            needs_newline = False
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b"\n"
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if needs_newline:
+                    f.write("\n")
+                for rec in records:
+                    # numpy floats als gewone floats opslaan
+                    f.write(json.dumps(rec, default=float) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            for rec in records:
+                entries[rec['file']] = rec
@@ -0,0 +1,132 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from logic.frame import Frame
+
+
+class Prefetcher:
+    """
+    Decodeert en pre-annoteert de volgende N afbeeldingen op worker threads.
+
+    Workers zetten hun resultaat in een queue; de GUI haalt die leeg via poll()
+    (aangeroepen met after()), zodat Tk zelf nooit door een worker wordt aangeraakt.
+    """
+
+    def __init__(self, model_handler, depth=3, memory_budget_mb=1024, workers=2):
+        self.model_handler = model_handler
+        self.depth = max(0, int(depth))
+        self.memory_budget = int(memory_budget_mb) * 1024 * 1024
+
+        self.results = queue.Queue()
+        self.ready = {}          # path -> entry (alleen aangeraakt door de UI thread)
+        self.ready_bytes = 0
+        self.pending = set()     # paden die nu door een worker verwerkt worden
+        self.futures = {}        # path -> Future van die worker (alleen UI thread)
+        self.last_frame_bytes = 0
+
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch")
+
+    # --- WORKER KANT ---
+    def _work(self, path, use_ai):
+        entry = {"path": path, "frame": None, "annotations": None, "nbytes": 0}
+        try:
+            # Eén decode, gedeeld door GUI en model
+            frame = Frame.load(path)
+            if frame is not None:
+                entry["frame"] = frame
+                entry["nbytes"] = frame.nbytes
+                if use_ai:
+                    entry["annotations"] = self.model_handler.predict_standard(frame)
+        except Exception as e:
+            print(f"Prefetch fout ({os.path.basename(path)}): {e}")
+        self.results.put(entry)
+
+    # --- UI KANT ---
+    def schedule(self, paths, use_ai=True, keep=()):
+        """
+        Plan de eerstvolgende `depth` paden in en vergeet alles daarbuiten.
+        `keep`: paden die niet vergeten of geannuleerd mogen worden (het getoonde beeld, waarvan de
+        GUI de lopende prefetch volgt).
+        """
+        wanted = list(paths)[:self.depth]
+
+        for path in list(self.ready):
+            if path not in wanted and path not in keep:
+                self._drop(path)
+        # Voorspellingen in de inference worker voor beelden die niet meer nodig zijn: annuleren
+        self.model_handler.cancel_stale(wanted + list(keep))
+
+        for path in wanted:
+            if path in self.ready or path in self.pending:
+                continue
+            # Geheugenbudget: niet starten als het volgende frame er niet meer bij past
+            with self._lock:
+                in_flight = len(self.pending) * self.last_frame_bytes
+            if self.ready_bytes + in_flight + self.last_frame_bytes > self.memory_budget:
+                break
+            with self._lock:
+                self.pending.add(path)
+            self.futures[path] = self._executor.submit(self._work, path, use_ai)
+
+    def poll(self):
+        """Haal klaargezette resultaten uit de queue. Alleen vanuit de UI thread aanroepen."""
+        while True:
+            try:
+                entry = self.results.get_nowait()
+            except queue.Empty:
+                break
+            path = entry["path"]
+            self.futures.pop(path, None)
+            with self._lock:
+                self.pending.discard(path)
+                if entry["nbytes"]:
+                    self.last_frame_bytes = entry["nbytes"]
+            if entry["frame"] is None:
+                continue
+            if self.ready_bytes + entry["nbytes"] > self.memory_budget:
+                continue
+            self.ready[path] = entry
+            self.ready_bytes += entry["nbytes"]
+
+    def in_flight(self, path):
+        """Future van de worker die nu met dit pad bezig is, of None"""
+        return self.futures.get(path)
+
+    def take(self, path, use_ai=True, timeout=0.0):
+        """
+        Geeft het voorbereide frame terug (en haalt het uit de buffer), of None.
+        Met `timeout` > 0 wordt zo lang gewacht als een worker nog met dit pad bezig is; de GUI
+        wacht liever niet maar volgt de worker via in_flight() (zie AnnotateTab.poll_ai).
+        """
+        self.poll()
+        future = self.futures.get(path)
+        if timeout > 0 and path not in self.ready and future is not None:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass  # Timeout of fout: de aanroeper doet het dan zelf
+            self.poll()
+        entry = self.ready.get(path)
+        if entry is None:
+            return None
+        if use_ai and entry["annotations"] is None:
+            # Voorspelling ontbreekt (AI stond uit tijdens prefetch): opnieuw laten doen
+            return None
+        self._drop(path)
+        return entry
+
+    def clear(self):
+        for path in list(self.ready):
+            self._drop(path)
+
+    def _drop(self, path):
+        entry = self.ready.pop(path, None)
+        if entry is not None:
+            self.ready_bytes -= entry["nbytes"]
+
+    def shutdown(self):
+        self.futures.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
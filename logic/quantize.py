@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+
+
+def preprocess(img, imgsz):
+    """BGR beeld naar de invoer van een Ultralytics ONNX export: letterbox, RGB, 0..1, NCHW"""
+    from logic.model_handler import ModelHandler
+    boxed, _, _ = ModelHandler._letterbox(img, imgsz)
+    x = boxed[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return np.ascontiguousarray(x[None])
+
+
+def quantize_int8(fp32_onnx, target, images, imgsz):
+    """
+    Statische int8 kwantisatie van een ONNX model, gekalibreerd op `images` (BGR arrays).
+    `images` mag een generator zijn: elk beeld wordt pas in get_next() voorbewerkt, zodat er
+    steeds maar één kalibratiebeeld in het geheugen staat.
+
+    Alleen Conv en MatMul worden gekwantiseerd (per kanaal); de rest van de graaf, waaronder
+    de decode van de detectiekop, blijft fp32. De Ultralytics metadata (klassen, taak, imgsz)
+    wordt overgenomen, zodat YOLO(target) het model net zo laadt als de fp32 export.
+    """
+    import onnx
+    import onnxruntime as ort
+    from onnxruntime.quantization import (CalibrationDataReader, CalibrationMethod, QuantFormat,
+                                          QuantType, quantize_static)
+
+    images = iter(images)
+    first = next(images, None)
+    if first is None:
+        raise RuntimeError("geen kalibratiebeelden")
+
+    input_name = ort.InferenceSession(fp32_onnx, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self.pending = first
+            self.count = 0
+
+        def get_next(self):
+            img, self.pending = self.pending, None
+            if img is None:
+                img = next(images, None)
+            if img is None:
+                return None
+            self.count += 1
+            return {input_name: preprocess(img, imgsz)}
+
+    print(f"Int8 kalibratie: {os.path.basename(fp32_onnx)}...")
+    tmp = target + ".tmp"
+    reader = Reader()
+    quantize_static(
+        fp32_onnx, tmp, reader,
+        quant_format=QuantFormat.QDQ,
+        op_types_to_quantize=["Conv", "MatMul"],
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+
+    # Metadata van de fp32 export overnemen (quantize_static schrijft een nieuw model)
+    src = onnx.load(fp32_onnx, load_external_data=False)
+    model = onnx.load(tmp)
+    del model.metadata_props[:]
+    for prop in src.metadata_props:
+        model.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(model, tmp)
+    os.replace(tmp, target)
+    print(f"Int8 model klaar ({reader.count} kalibratiebeelden): {target}")
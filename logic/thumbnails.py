@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from logic.frame import Frame
+from utils.label_draw import draw_yolo_labels
+
+
+def render_thumbnail(img_path, lbl_path, size):
+    """BGR thumbnail (max `size` px) met de labels erop; None als het beeld niet leesbaar is"""
+    # Verkleind decoderen (1/2 .. 1/8) scheelt bij grote foto's het meeste werk
+    frame = Frame.load_display(img_path, size, size, fill=1.0)
+    if frame is None:
+        return None
+    scale = min(size / frame.width, size / frame.height)
+    tw, th = max(1, int(frame.width * scale)), max(1, int(frame.height * scale))
+    thumb = cv2.resize(frame.bgr, (tw, th), interpolation=cv2.INTER_AREA)
+    return draw_yolo_labels(thumb, lbl_path, thickness=1)
+
+
+def _build(img_path, lbl_path, out_path, size):
+    """Worker (apart proces): thumbnail renderen en atomair wegschrijven"""
+    thumb = render_thumbnail(img_path, lbl_path, size)
+    if thumb is None:
+        return None
+    tmp = out_path + ".tmp.jpg"
+    cv2.imwrite(tmp, thumb, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    os.replace(tmp, out_path)
+    return out_path
+
+
+class ThumbnailCache:
+    """
+    Persistente thumbnails (JPEG) op schijf, sleutel = pad + mtime van beeld en label + grootte.
+
+    Een aangepast label of vervangen beeld geeft vanzelf een nieuwe sleutel. Ontbrekende
+    thumbnails worden in een process pool gemaakt (decoderen en tekenen is CPU werk dat
+    anders aan de GIL blijft hangen); de GUI vraagt met poll() op welke klaar zijn.
+
+    Thumbnails van oude sleutels (bv. na een labelwijziging) blijven liggen; bij het starten
+    ruimt prune() op de achtergrond de oudste op zodra de map groter is dan `max_mb`.
+    """
+
+    def __init__(self, cache_dir, size=160, workers=None, max_mb=200):
+        self.cache_dir = cache_dir
+        self.size = int(size)
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_bytes = int(float(max_mb) * 1024 * 1024)
+        self.pending = {}        # thumb pad -> Future
+        self._executor = None
+        os.makedirs(cache_dir, exist_ok=True)
+        threading.Thread(target=self.prune, daemon=True, name="thumb-prune").start()
+
+    def prune(self):
+        """Oudste thumbnails verwijderen tot de map onder 90% van `max_bytes` zit; geeft het aantal terug"""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        total = sum(f[1] for f in files)
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        print(f"Thumbnails: {removed} oude bestanden opgeruimd ({total / 1024 / 1024:.0f} MB over)")
+        return removed
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def thumb_path(self, img_path, lbl_path):
+        key = f"{os.path.abspath(img_path)}|{self._mtime(img_path)}|{self._mtime(lbl_path)}|{self.size}"
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + ".jpg")
+
+    def get(self, img_path, lbl_path):
+        """(thumb_pad, klaar) — klaar is False als de thumbnail nog gemaakt moet worden"""
+        out = self.thumb_path(img_path, lbl_path)
+        return out, os.path.exists(out)
+
+    def request(self, img_path, lbl_path):
+        """Thumbnail laten maken als die nog niet bestaat; geeft het thumb pad terug"""
+        out, ready = self.get(img_path, lbl_path)
+        if ready or out in self.pending:
+            return out
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        self.pending[out] = self._executor.submit(_build, img_path, lbl_path, out, self.size)
+        return out
+
+    def poll(self):
+        """Thumb paden die sinds de vorige poll klaar zijn (alleen vanuit de UI thread)"""
+        done = [out for out, fut in self.pending.items() if fut.done()]
+        finished = []
+        for out in done:
+            fut = self.pending.pop(out)
+            try:
+                if fut.result() is not None:
+                    finished.append(out)
+            except Exception as e:
+                print(f"Thumbnail fout: {e}")
+        return finished
+
+    def cancel_pending(self):
+        """Openstaande (nog niet gestarte) opdrachten laten vallen, bv. bij wegscrollen"""
+        for out, fut in list(self.pending.items()):
+            if fut.cancel():
+                del self.pending[out]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
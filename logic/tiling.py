@@ -0,0 +1,194 @@
+import threading
+import time
+
+import numpy as np
+
+MERGES = ("nms", "wbf")
+METRICS = ("iou", "ios")   # ios: intersectie / kleinste box (vangt door een tilerand afgesneden boxen)
+
+
+def tile_origins(length, tile, step):
+    """Startposities langs één as; de laatste tile sluit precies aan op de rand"""
+    if length <= tile:
+        return [0]
+    origins = list(range(0, length - tile, step))
+    origins.append(length - tile)
+    return origins
+
+
+def make_tiles(img, tile_size, overlap):
+    """Overlappende tiles (views, geen kopieën) en hun linkerbovenhoek in het frame"""
+    h, w = img.shape[:2]
+    step = max(1, int(round(tile_size * (1.0 - overlap))))
+    origins = [(x, y) for y in tile_origins(h, tile_size, step) for x in tile_origins(w, tile_size, step)]
+    tiles = [img[y:y + tile_size, x:x + tile_size] for x, y in origins]
+    return tiles, np.asarray(origins, dtype=np.float32)
+
+
+def overlap_matrix(boxes, metric="ios"):
+    """Paarsgewijze overlap (N x N) van xyxy boxen: IoU of intersectie over de kleinste box"""
+    lt = np.maximum(boxes[:, None, :2], boxes[None, :, :2])
+    rb = np.minimum(boxes[:, None, 2:], boxes[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area = (boxes[:, 2:] - boxes[:, :2]).clip(0).prod(axis=1)
+    if metric == "iou":
+        denom = area[:, None] + area[None, :] - inter
+    else:
+        denom = np.minimum(area[:, None], area[None, :])
+    return inter / np.maximum(denom, 1e-9)
+
+
+def fast_nms(boxes, scores, classes, thr=0.5, metric="ios"):
+    """
+    Greedy NMS per klasse: een box vervalt als een *behouden* box met een hogere score van dezelfde
+    klasse er meer dan `thr` mee overlapt. De overlap wordt in één keer als matrix berekend; alleen
+    de lus over de rijen is Python. Geeft (indices van de koppen, volgorde, matrix).
+    """
+    order = np.argsort(-scores, kind="stable")
+    b, c = boxes[order], classes[order]
+    m = overlap_matrix(b, metric) * (c[:, None] == c[None, :])
+    suppressed = np.zeros(len(order), dtype=bool)
+    for i in range(len(order)):
+        if not suppressed[i]:
+            # Een weggedrukte box drukt zelf niets weg (anders verdwijnen dieren naast elkaar in een kudde)
+            suppressed[i + 1:] |= m[i, i + 1:] > thr
+    return order[~suppressed], order, m
+
+
+def weighted_fusion(boxes, scores, classes, thr=0.55, metric="ios"):
+    """
+    Weighted boxes fusion: elke box hoort bij de hoogst scorende NMS kop waar hij genoeg mee
+    overlapt; de kop krijgt het score-gewogen gemiddelde van zijn cluster. Geeft (koppen, boxen, scores).
+    """
+    heads, order, m = fast_nms(boxes, scores, classes, thr, metric)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    head_rank = rank[heads]                              # Positie van de koppen in de gesorteerde matrix
+    member = m[:, head_rank] > thr                       # (gesorteerde boxen x koppen)
+    member[head_rank, np.arange(len(heads))] = True      # Een kop hoort altijd bij zichzelf
+    has_head = member.any(axis=1)
+    cluster = member.argmax(axis=1)                      # Koppen staan op score: eerste True = beste kop
+
+    b, s = boxes[order][has_head], scores[order][has_head]
+    cl = cluster[has_head]
+    weights = np.zeros(len(heads), dtype=np.float64)
+    fused = np.zeros((len(heads), 4), dtype=np.float64)
+    np.add.at(weights, cl, s)
+    np.add.at(fused, cl, b * s[:, None])
+    counts = np.bincount(cl, minlength=len(heads))
+    fused /= np.maximum(weights, 1e-9)[:, None]
+    return heads, fused.astype(np.float32), (weights / np.maximum(counts, 1)).astype(np.float32)
+
+
+def _collect(results, origins=None):
+    """Boxen, scores, klassen en polygonen uit Results, verschoven naar framecoördinaten"""
+    boxes, scores, classes, polys = [], [], [], []
+    for i, r in enumerate(results):
+        if r.boxes is None or len(r.boxes) == 0:
+            continue
+        xyxy = r.boxes.xyxy.cpu().numpy().astype(np.float32)
+        shift = origins[i] if origins is not None else np.zeros(2, dtype=np.float32)
+        xyxy += np.tile(shift, 2)
+        boxes.append(xyxy)
+        scores.append(r.boxes.conf.cpu().numpy().astype(np.float32))
+        classes.append(r.boxes.cls.cpu().numpy().astype(int))
+        if r.masks is not None:
+            polys.extend(np.asarray(p, dtype=np.float32) + shift for p in r.masks.xy)
+        else:
+            polys.extend([None] * len(xyxy))
+    if not boxes:
+        return np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, int), []
+    return np.concatenate(boxes), np.concatenate(scores), np.concatenate(classes), polys
+
+
+def infer_tiled(model, img, lock, conf=0.25, tile_size=640, tile_overlap=0.2, tile_full_frame=True,
+                tile_merge="nms", tile_iou=0.5, tile_metric="ios", tile_batch=0):
+    """
+    Sliced inferentie: overlappende tiles als één batch (of in stukken van `tile_batch`), optioneel
+    plus een pass over het hele frame, terug naar framecoördinaten en samengevoegd met NMS of WBF.
+    Geeft (annotaties, timings in ms).
+    """
+    t = {"start": time.perf_counter()}
+    tiles, origins = make_tiles(img, int(tile_size), float(tile_overlap))
+    t["slice"] = time.perf_counter()
+
+    results = []
+    chunk = int(tile_batch) or len(tiles)
+    with lock:
+        for i in range(0, len(tiles), chunk):
+            results.extend(model(tiles[i:i + chunk], conf=conf, imgsz=int(tile_size), verbose=False))
+    t["tiles"] = time.perf_counter()
+
+    full = []
+    if tile_full_frame:
+        with lock:
+            full = model(img, conf=conf, verbose=False)
+    t["full"] = time.perf_counter()
+
+    boxes, scores, classes, polys = _collect(results, origins)
+    fb, fs, fc, fp = _collect(full)
+    boxes = np.concatenate([boxes, fb])
+    scores = np.concatenate([scores, fs])
+    classes = np.concatenate([classes, fc])
+    polys = polys + fp
+    t["map"] = time.perf_counter()
+
+    anns = []
+    if len(boxes):
+        metric = tile_metric if tile_metric in METRICS else "ios"
+        if tile_merge == "wbf":
+            keep, merged, _ = weighted_fusion(boxes, scores, classes, tile_iou, metric)
+        else:
+            keep, _, _ = fast_nms(boxes, scores, classes, tile_iou, metric)
+            merged = boxes[keep]
+        for idx, box in zip(keep, merged):
+            if polys[idx] is not None and len(polys[idx]):
+                anns.append({"type": "polygon", "class_id": int(classes[idx]), "points": polys[idx].tolist()})
+            else:
+                anns.append({"type": "bbox", "class_id": int(classes[idx]), "coords": box.tolist()})
+    t["merge"] = time.perf_counter()
+
+    timings = {
+        "tiles_n": len(tiles), "raw": int(len(boxes)), "kept": len(anns),
+        "slice_ms": (t["slice"] - t["start"]) * 1000,
+        "tiles_ms": (t["tiles"] - t["slice"]) * 1000,
+        "full_ms": (t["full"] - t["tiles"]) * 1000,
+        "map_ms": (t["map"] - t["full"]) * 1000,
+        "merge_ms": (t["merge"] - t["map"]) * 1000,
+        "total_ms": (t["merge"] - t["start"]) * 1000,
+    }
+    return anns, timings
+
+
+def format_timings(timings):
+    return (f"{timings['tiles_n']} tiles | slice {timings['slice_ms']:.0f}, tiles {timings['tiles_ms']:.0f}, "
+            f"full {timings['full_ms']:.0f}, map {timings['map_ms']:.0f}, merge {timings['merge_ms']:.0f} "
+            f"= {timings['total_ms']:.0f} ms | {timings['raw']} -> {timings['kept']} boxen")
+
+
+class TileStats:
+    """Telt de timings per fase op over alle tiled voorspellingen (voor het overzicht bij afsluiten)"""
+
+    KEYS = ("tiles_n", "raw", "kept", "slice_ms", "tiles_ms", "full_ms", "map_ms", "merge_ms", "total_ms")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.totals = {k: 0.0 for k in self.KEYS}
+
+    def record(self, timings):
+        with self.lock:
+            self.frames += 1
+            for k in self.KEYS:
+                self.totals[k] += timings.get(k, 0)
+
+    def summary(self):
+        if not self.frames:
+            return "Tiled: geen voorspellingen"
+        avg = {k: v / self.frames for k, v in self.totals.items()}
+        avg["tiles_n"] = round(avg["tiles_n"])
+        avg["raw"], avg["kept"] = round(avg["raw"]), round(avg["kept"])
+        return f"Tiled ({self.frames} frames, gemiddeld): {format_timings(avg)}"
+
+
+tile_stats = TileStats()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests draaien vanuit de repo root: `python -m pytest`; zo werkt ook een kale `pytest`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,69 @@
+import os
+import time
+
+from logic.folder_index import FolderIndex, scan_images
+
+
+def touch(folder, *names):
+    for name in names:
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(b"x")
+
+
+def wait_for(index, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if index.poll():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_scan_filters_extensions(tmp_path):
+    touch(tmp_path, "a.jpg", "b.PNG", "c.txt")
+    (tmp_path / "d.jpg").mkdir()
+    assert scan_images(str(tmp_path)) == {"a.jpg", "b.PNG"}
+
+
+def test_sorted_list_interface(tmp_path):
+    touch(tmp_path, "c.jpg", "a.jpg", "b.jpg")
+    index = FolderIndex(str(tmp_path), watch=False)
+    assert list(index) == ["a.jpg", "b.jpg", "c.jpg"]
+    assert index[1:] == ["b.jpg", "c.jpg"]
+    assert index.index_of("b.jpg") == 1 and index.index_of("x.jpg") is None
+    assert index.add("bb.jpg") and not index.add("bb.jpg") and not index.add("notes.txt")
+    assert index.index_of("bb.jpg") == 2
+    assert index.remove("a.jpg") and "a.jpg" not in index
+    assert index.version == 2
+
+
+def test_initial_names_are_corrected_by_the_watcher(tmp_path):
+    touch(tmp_path, "a.jpg", "b.jpg")
+    seen = []
+    index = FolderIndex(str(tmp_path), poll_interval=0.05, initial=["a.jpg", "gone.jpg"])
+    index.listeners.append(lambda added, removed: seen.append((added, removed)))
+    try:
+        assert list(index) == ["a.jpg", "gone.jpg"]   # Direct bruikbaar, zonder scan
+        assert wait_for(index)
+        assert list(index) == ["a.jpg", "b.jpg"]
+        assert seen == [(["b.jpg"], ["gone.jpg"])]
+
+        touch(tmp_path, "c.jpg")
+        assert wait_for(index)
+        assert "c.jpg" in index
+    finally:
+        index.stop()
+
+
+def test_rescan_goes_through_listeners_and_fixes_drift(tmp_path):
+    touch(tmp_path, "a.jpg")
+    seen = []
+    index = FolderIndex(str(tmp_path), watch=False)
+    index.listeners.append(lambda added, removed: seen.append((added, removed)))
+    index.add("ghost.jpg")                 # Afwijking van de map via add()
+    touch(tmp_path, "b.jpg")
+    index.rescan()
+    assert list(index) == ["a.jpg", "b.jpg"]
+    assert seen == [(["b.jpg"], [])]
+    index._commit_scan({"a.jpg"}, None, gen=0)   # Watcher scan van vóór de rescan: vervalt
+    assert not index.poll()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from utils.hit_test import PolygonHitTester, box_edges, nearest_point, nearest_segment
+
+
+def test_nearest_point_and_segment():
+    pts = np.array([[0, 0], [10, 0], [10, 10]], dtype=np.float64)
+    assert nearest_point(pts, 9, 1, 3) == 1
+    assert nearest_point(pts, 5, 5, 3) is None
+    starts, ends = pts, np.roll(pts, -1, axis=0)
+    i, dist = nearest_segment(starts, ends, 5, 1, 3)
+    assert i == 0 and dist == pytest.approx(1.0)
+    # Lijnstuk met lengte 0 doet niet mee
+    assert nearest_segment(np.array([[0.0, 0.0]]), np.array([[0.0, 0.0]]), 0, 0, 3) is None
+
+
+def test_box_edges_belong_to_their_box():
+    starts, ends = box_edges([[0, 0, 10, 10], [20, 20, 30, 30]])
+    i, _ = nearest_segment(starts, ends, 25, 31, 3)
+    assert i // 4 == 1
+
+
+@pytest.mark.parametrize("grid_threshold", [10**9, 0])   # Zonder en met grid index
+def test_polygon_queries(grid_threshold):
+    hit = PolygonHitTester([[0, 0], [100, 0], [100, 100], [0, 100]], grid_threshold=grid_threshold, cell_size=16)
+    assert hit.nearest_vertex(98, 3, 5) == 1
+    assert hit.nearest_vertex(50, 50, 5) is None
+    assert hit.nearest_edge(50, 2, 5) == 0
+    assert hit.nearest_edge(2, 50, 5) == 3   # Sluitende rand: punt 3 -> punt 0
+
+
+@pytest.mark.parametrize("grid_threshold", [10**9, 0])
+def test_incremental_edits_match_a_rebuild(grid_threshold):
+    points = [[0, 0], [100, 0], [100, 100], [0, 100]]
+    hit = PolygonHitTester(points, grid_threshold=grid_threshold, cell_size=16)
+    hit.nearest_edge(50, 0, 5)            # Grid (indien gebruikt) opbouwen vóór de wijzigingen
+    hit.insert(1, 50, -20)
+    hit.move(3, 120, 120)
+    hit.remove(4)
+    points.insert(1, [50, -20])
+    points[3] = [120, 120]
+    del points[4]
+    fresh = PolygonHitTester(points, grid_threshold=grid_threshold, cell_size=16)
+    np.testing.assert_array_equal(hit.points, fresh.points)
+    for x, y in [(50, -18), (118, 118), (25, -10), (60, 60), (0, 50)]:
+        assert hit.nearest_vertex(x, y, 6) == fresh.nearest_vertex(x, y, 6)
+        assert hit.nearest_edge(x, y, 6) == fresh.nearest_edge(x, y, 6)
+    assert len(hit) == 4
@@ -0,0 +1,70 @@
+import struct
+
+import cv2
+import numpy as np
+
+from utils import image_meta
+from utils.image_meta import image_size, read_image_size
+
+
+def app1(data):
+    return b"\xff\xe1" + struct.pack(">H", len(data) + 2) + data
+
+
+def exif(orientation):
+    """Minimaal EXIF blok (little endian TIFF) met alleen de Orientation tag"""
+    ifd = struct.pack("<H", 1) + struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0) + b"\0\0\0\0"
+    return b"Exif\0\0" + b"II*\x00" + struct.pack("<I", 8) + ifd
+
+
+def write_jpeg(path, w, h, *segments, progressive=False):
+    params = [cv2.IMWRITE_JPEG_PROGRESSIVE, 1] if progressive else []
+    ok, buf = cv2.imencode(".jpg", np.zeros((h, w, 3), np.uint8), params)
+    data = buf.tobytes()
+    with open(path, 'wb') as f:
+        f.write(data[:2] + b"".join(segments) + data[2:])   # Na SOI
+    return str(path)
+
+
+def test_png_size(tmp_path):
+    path = str(tmp_path / "a.png")
+    cv2.imwrite(path, np.zeros((30, 50, 3), np.uint8))
+    assert read_image_size(path) == (50, 30)
+
+
+def test_jpeg_size(tmp_path):
+    assert read_image_size(write_jpeg(tmp_path / "a.jpg", 50, 30)) == (50, 30)
+    assert read_image_size(write_jpeg(tmp_path / "p.jpg", 50, 30, progressive=True)) == (50, 30)
+
+
+def test_jpeg_exif_rotation_swaps_size(tmp_path):
+    assert read_image_size(write_jpeg(tmp_path / "r.jpg", 50, 30, app1(exif(6)))) == (30, 50)
+    assert read_image_size(write_jpeg(tmp_path / "n.jpg", 50, 30, app1(exif(3)))) == (50, 30)
+
+
+def test_xmp_after_exif_keeps_orientation(tmp_path):
+    xmp = app1(b"http://ns.adobe.com/xap/1.0/\0<x:xmpmeta/>")
+    path = write_jpeg(tmp_path / "x.jpg", 50, 30, app1(exif(6)), xmp)
+    assert read_image_size(path) == (30, 50)
+    # Zelfde maat als na het decoderen (cv2 draait volgens EXIF)
+    img = cv2.imread(path)
+    assert read_image_size(path) == (img.shape[1], img.shape[0])
+
+
+def test_unknown_format_falls_back_to_decode(tmp_path):
+    path = str(tmp_path / "a.bmp")
+    cv2.imwrite(path, np.zeros((7, 9, 3), np.uint8))
+    assert read_image_size(path) == (9, 7)
+
+
+def test_size_cache_is_lru(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_meta, "_size_cache", type(image_meta._size_cache)())
+    monkeypatch.setattr(image_meta, "SIZE_CACHE_MAX", 2)
+    paths = [write_jpeg(tmp_path / f"{i}.jpg", 10 + i, 10) for i in range(3)]
+    image_size(paths[0])
+    image_size(paths[1])
+    image_size(paths[0])            # 0 is nu het recentst gebruikt
+    image_size(paths[2])            # 1 valt eruit
+    cached = {key[0] for key in image_meta._size_cache}
+    assert cached == {paths[0], paths[2]}
+    assert image_size(str(tmp_path / "missing.jpg")) is None
@@ -0,0 +1,84 @@
+import json
+import os
+
+from logic.io_queue import IOQueue
+
+
+def write_journal(path, *records, tail=""):
+    with open(path, 'w') as f:
+        for rec in records:
+            f.write(json.dumps(rec) + "\n")
+        f.write(tail)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_replays_partial_place_batch(tmp_path):
+    """Crash na het hernoemen naar de output, vóór de link naar de delete map en het label"""
+    inp, out, trash = tmp_path / "in", tmp_path / "out", tmp_path / "trash"
+    for d in (inp, out, trash):
+        d.mkdir()
+    src, dst, move_to = str(inp / "a.jpg"), str(out / "a.jpg"), str(trash / "a.jpg")
+    label = str(out / "a.txt")
+    with open(dst, 'wb') as f:
+        f.write(b"pixels")   # os.replace(src, dst) was al gebeurd
+
+    journal = str(tmp_path / "journal.jsonl")
+    write_journal(journal, {"id": 1, "ops": [["place", src, dst, move_to], ["write", label, "0 0.5 0.5 1 1\n"]]})
+
+    q = IOQueue(journal)
+    assert q.flush(timeout=5)
+    assert read(dst) == "pixels"
+    assert read(move_to) == "pixels"
+    assert read(label) == "0 0.5 0.5 1 1\n"
+    assert not os.path.exists(src)
+    assert q.errors == []
+    assert read(journal) == ""   # Niets meer open: journal leeg
+
+
+def test_replay_is_idempotent_for_finished_place(tmp_path):
+    """Alles was al gedaan maar de 'done' regel ontbreekt: opnieuw uitvoeren verandert niets"""
+    src, dst, move_to = str(tmp_path / "a.jpg"), str(tmp_path / "out.jpg"), str(tmp_path / "trash.jpg")
+    for path in (dst, move_to):
+        with open(path, 'wb') as f:
+            f.write(b"pixels")
+    journal = str(tmp_path / "journal.jsonl")
+    write_journal(journal, {"id": 1, "ops": [["place", src, dst, move_to]]})
+
+    q = IOQueue(journal)
+    assert q.flush(timeout=5)
+    assert q.errors == []
+    assert read(dst) == read(move_to) == "pixels"
+
+
+def test_skips_done_batches_and_torn_last_line(tmp_path):
+    a, b = str(tmp_path / "a.txt"), str(tmp_path / "b.txt")
+    journal = str(tmp_path / "journal.jsonl")
+    write_journal(journal,
+                  {"id": 1, "ops": [["write", a, "a"]]},
+                  {"done": 1},
+                  {"id": 2, "ops": [["write", b, "b"]]},
+                  tail='{"id": 3, "ops": [["wri')   # Half geschreven regel
+
+    q = IOQueue(journal)
+    assert q.flush(timeout=5)
+    assert not os.path.exists(a)
+    assert read(b) == "b"
+    assert q.done == 1
+
+
+def test_submit_runs_in_order_and_truncates_journal(tmp_path):
+    src, dst = str(tmp_path / "src.jpg"), str(tmp_path / "dst.jpg")
+    with open(src, 'wb') as f:
+        f.write(b"x")
+    journal = str(tmp_path / "journal.jsonl")
+    q = IOQueue(journal)
+    q.submit([("copy", src, dst), ("remove", src)])
+    assert q.flush(timeout=5)
+    assert read(dst) == "x"
+    assert not os.path.exists(src)
+    assert q.pending == 0 and q.done == 2
+    assert read(journal) == ""
@@ -0,0 +1,70 @@
+import sqlite3
+
+import pytest
+
+from logic import manifest as mf
+from logic.manifest import Manifest
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "manifest.sqlite")
+
+
+def test_sync_keeps_existing_state(tmp_path, db):
+    m = Manifest(db, str(tmp_path))
+    m.sync(["a.jpg", "b.jpg"])
+    m.set_state("a.jpg", mf.ANNOTATED, label="a.txt")
+    m.sync(["a.jpg", "c.jpg"])
+    assert m.state("a.jpg") == mf.ANNOTATED
+    assert m.label("a.jpg") == "a.txt"
+    assert m.state("c.jpg") == mf.PENDING
+    assert sorted(m.names()) == ["b.jpg", "c.jpg"]
+    assert m.count() == 2
+
+
+def test_todo_queries(tmp_path, db):
+    m = Manifest(db, str(tmp_path))
+    m.sync(["a.jpg", "b.jpg", "c.jpg", "d.jpg"])
+    m.set_state("a.jpg", mf.ANNOTATED)
+    m.set_state("c.jpg", mf.REJECTED)
+    m.mark_many(["b.jpg", "d.jpg"], mf.PREANNOTATED, only_from=(mf.PENDING,))
+    m.mark_many(["c.jpg"], mf.PREANNOTATED, only_from=(mf.PENDING,))   # Afgekeurd blijft afgekeurd
+    assert m.first_todo() == "b.jpg"
+    assert m.first_todo(after="b.jpg") == "c.jpg"
+    assert m.state("c.jpg") == mf.REJECTED
+    assert m.counts()[mf.PREANNOTATED] == 2
+    with pytest.raises(ValueError):
+        m.set_state("a.jpg", "bogus")
+
+
+def test_folders_do_not_share_names(tmp_path, db):
+    one = Manifest(db, str(tmp_path / "one"))
+    two = Manifest(db, str(tmp_path / "two"))
+    one.sync(["a.jpg"])
+    two.sync(["a.jpg"])
+    one.set_state("a.jpg", mf.SKIPPED)
+    assert two.state("a.jpg") == mf.PENDING
+    assert one.names() == []
+    assert two.names() == ["a.jpg"]
+
+
+def test_migrates_name_only_schema(tmp_path, db):
+    conn = sqlite3.connect(db)
+    conn.execute("""CREATE TABLE images (name TEXT PRIMARY KEY, state TEXT NOT NULL, label TEXT,
+                    created REAL, updated REAL)""")
+    conn.execute("CREATE INDEX idx_state ON images(state, name)")
+    conn.execute("INSERT INTO images VALUES ('a.jpg', 'annotated', 'a.txt', 1, 1)")
+    conn.commit()
+    conn.close()
+
+    m = Manifest(db, str(tmp_path))
+    assert m.state("a.jpg") == mf.ANNOTATED
+    assert m.label("a.jpg") == "a.txt"
+    assert Manifest(db, str(tmp_path / "other")).state("a.jpg") is None
+
+
+def test_get_manifest_is_shared_per_folder(tmp_path, db):
+    config = {"manifest": db, "input_folder": str(tmp_path / "in")}
+    assert mf.get_manifest(config) is mf.get_manifest(config, str(tmp_path / "in"))
+    assert mf.get_manifest(config) is not mf.get_manifest(config, str(tmp_path / "out"))
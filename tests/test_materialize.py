@@ -0,0 +1,81 @@
+import errno
+import os
+
+from logic import materialize
+from logic.materialize import link_or_copy, place_file
+
+
+def write(path, data=b"pixels"):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_hardlink_when_possible(tmp_path):
+    src = write(tmp_path / "a.jpg")
+    dst = str(tmp_path / "b.jpg")
+    assert link_or_copy(src, dst) == "hardlink"
+    assert os.path.samefile(src, dst)
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+
+
+def test_copy_fallback_without_links(tmp_path, monkeypatch):
+    def no_link(src, dst):
+        raise OSError(errno.EXDEV, "cross-device link")
+
+    monkeypatch.setattr(materialize.os, "link", no_link)
+    monkeypatch.setattr(materialize, "_reflink", lambda src, dst: no_link(src, dst))
+    src = write(tmp_path / "a.jpg")
+    dst = str(tmp_path / "b.jpg")
+    assert link_or_copy(src, dst) == "copy"
+    assert read(dst) == b"pixels" and not os.path.samefile(src, dst)
+
+
+def test_copy_strategy_never_links(tmp_path):
+    src = write(tmp_path / "a.jpg")
+    dst = str(tmp_path / "b.jpg")
+    assert link_or_copy(src, dst, "copy") == "copy"
+    assert not os.path.samefile(src, dst)
+
+
+def test_place_with_move_to_renames(tmp_path):
+    src = write(tmp_path / "in.jpg")
+    dst, move_to = str(tmp_path / "out.jpg"), str(tmp_path / "trash.jpg")
+    assert place_file(src, dst, "auto", move_to) == "rename"
+    assert not os.path.exists(src)
+    assert read(dst) == read(move_to) == b"pixels"
+
+
+def test_place_falls_back_across_filesystems(tmp_path, monkeypatch):
+    src = write(tmp_path / "in.jpg")
+    dst, move_to = str(tmp_path / "out.jpg"), str(tmp_path / "trash.jpg")
+    real_replace = os.replace
+
+    def replace(a, b):
+        if a == src:
+            raise OSError(errno.EXDEV, "cross-device link")   # Hernoemen naar de output kan niet
+        real_replace(a, b)
+
+    monkeypatch.setattr(materialize.os, "replace", replace)
+    assert place_file(src, dst, "auto", move_to) == "hardlink"
+    assert not os.path.exists(src)
+    assert read(dst) == read(move_to) == b"pixels"
+
+
+def test_place_resumes_and_is_idempotent(tmp_path):
+    src = str(tmp_path / "in.jpg")
+    dst, move_to = write(tmp_path / "out.jpg"), str(tmp_path / "trash.jpg")
+    assert place_file(src, dst, "auto", move_to) == "resumed"
+    assert read(move_to) == b"pixels"
+    assert place_file(src, dst, "auto", move_to) is None
+
+
+def test_unknown_strategy_means_auto(tmp_path):
+    src = write(tmp_path / "in.jpg")
+    assert place_file(src, str(tmp_path / "out.jpg"), "bogus") == "hardlink"
+    assert os.path.exists(src)
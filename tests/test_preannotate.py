@@ -0,0 +1,62 @@
+import os
+import sys
+import types
+
+import cv2
+import numpy as np
+import pytest
+
+from logic import model_registry
+from logic.model_handler import ModelHandler
+from logic.preannotate import run
+
+
+class FakeYOLO:
+    """Ultralytics stand-in: laden lukt, exporteren niet (zoals zonder onnx geïnstalleerd)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def export(self, **kwargs):
+        raise RuntimeError("onnx ontbreekt")
+
+    def __call__(self, imgs, **kwargs):
+        imgs = imgs if isinstance(imgs, list) else [imgs]
+        return [types.SimpleNamespace(masks=None, boxes=[]) for _ in imgs]
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "ultralytics", types.SimpleNamespace(YOLO=FakeYOLO))
+    monkeypatch.setattr(model_registry, "_registry", None)   # Verse registry met deze instellingen
+    folder = tmp_path / "in"
+    folder.mkdir()
+    for name in ("a.jpg", "b.jpg"):
+        cv2.imwrite(str(folder / name), np.zeros((32, 48, 3), np.uint8))
+    weights = tmp_path / "det.pt"
+    weights.write_bytes(b"weights")
+    return {
+        "input_folder": str(folder),
+        "model_path_detect": str(weights),
+        "model_path_seg": str(tmp_path / "seg.pt"),
+        "inference_backend": "onnx",
+        "inference_worker": False,
+        "export_cache_dir": str(tmp_path / "exports"),
+        "prediction_store": str(tmp_path / "pre.jsonl"),
+        "prediction_cache": str(tmp_path / "cache.sqlite"),
+        "manifest": str(tmp_path / "manifest.sqlite"),
+    }
+
+
+def test_records_match_the_gui_after_an_export_fallback(settings, capsys):
+    assert run(settings) == 0
+    registry = model_registry.get_registry()
+    assert registry.variant(settings["model_path_detect"]) == ("torch", "fp32")   # Export mislukt
+
+    handler = ModelHandler(settings, registry=registry, use_worker=False)
+    path = os.path.join(settings["input_folder"], "a.jpg")
+    assert handler.stored(path) == []   # Gevonden (geen detecties), niet None
+
+    capsys.readouterr()
+    assert run(settings) == 0
+    assert "2 al voorspeld, 0 te doen" in capsys.readouterr().out
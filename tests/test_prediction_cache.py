@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from logic.prediction_cache import PredictionCache
+
+ANNS = [{"type": "bbox", "class_id": 0, "coords": [1.0, 2.0, 3.0, 4.0]}]
+
+
+def write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = PredictionCache(str(tmp_path / "cache.sqlite"))
+    yield c
+    c.conn.close()
+
+
+def test_roundtrip_and_params_in_key(tmp_path, cache):
+    img = write(tmp_path / "a.jpg", b"image")
+    model = write(tmp_path / "m.pt", b"weights")
+    cache.put(img, model, "standard", ANNS, conf=0.25)
+    assert cache.get(img, model, "standard", conf=0.25) == ANNS
+    assert cache.get(img, model, "standard", conf=0.5) is None
+    assert cache.get(img, model, "dual", conf=0.25) is None
+
+
+def test_new_weights_miss_and_bind_slot_drops_old_rows(tmp_path, cache):
+    img = write(tmp_path / "a.jpg", b"image")
+    model = write(tmp_path / "m.pt", b"weights v1")
+    cache.bind_slot("detect", model)
+    cache.put(img, model, "standard", ANNS)
+
+    write(model, b"weights v2")
+    os.utime(model, ns=(1, 1))   # Andere grootte én mtime: opnieuw hashen
+    assert cache.get(img, model, "standard") is None
+
+    cache.bind_slot("detect", model)
+    assert cache.stats()["entries"] == 0
+    assert cache._total == 0
+
+
+def test_bind_slot_keeps_rows_of_a_model_still_in_use(tmp_path, cache):
+    img = write(tmp_path / "a.jpg", b"image")
+    shared = write(tmp_path / "shared.pt", b"weights")
+    other = write(tmp_path / "other.pt", b"other")
+    cache.bind_slot("detect", shared)
+    cache.bind_slot("seg", shared)
+    cache.put(img, shared, "standard", ANNS)
+    cache.bind_slot("detect", other)
+    assert cache.get(img, shared, "standard") == ANNS
+
+
+def test_renamed_image_hits_and_changed_image_misses(tmp_path, cache):
+    model = write(tmp_path / "m.pt", b"weights")
+    img = write(tmp_path / "a.jpg", b"image")
+    cache.put(img, model, "standard", ANNS)
+
+    moved = str(tmp_path / "b.jpg")
+    os.replace(img, moved)
+    assert cache.get(moved, model, "standard") == ANNS   # Zelfde inhoud
+
+    write(moved, b"other image")
+    assert cache.get(moved, model, "standard") is None
+
+
+def test_image_stamps_survive_a_reopen(tmp_path):
+    model = write(tmp_path / "m.pt", b"weights")
+    img = write(tmp_path / "a.jpg", b"image")
+    db = str(tmp_path / "cache.sqlite")
+    first = PredictionCache(db)
+    first.put(img, model, "standard", ANNS)
+    first.conn.close()
+
+    second = PredictionCache(db)
+    second._hash_file = lambda path: pytest.fail(f"{path} opnieuw gehasht")
+    assert second.get(img, model, "standard") == ANNS
+    second.conn.close()
+
+
+def test_eviction_keeps_total_in_budget(tmp_path, cache):
+    model = write(tmp_path / "m.pt", b"weights")
+    cache.max_bytes = 600
+    for i in range(20):
+        img = write(tmp_path / f"{i}.jpg", f"image {i}".encode())
+        cache.put(img, model, "standard", [dict(ANNS[0], class_id=i)] * 5)
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes
+    assert cache._total == stats["bytes"]
+    assert cache.get(img, model, "standard") is not None   # Nieuwste blijft staan
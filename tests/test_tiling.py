@@ -0,0 +1,102 @@
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from logic.tiling import fast_nms, infer_tiled, make_tiles, overlap_matrix, tile_origins, weighted_fusion
+
+
+def arr(*rows):
+    return np.asarray(rows, dtype=np.float32)
+
+
+def test_tile_origins_cover_the_edge():
+    assert tile_origins(500, 640, 512) == [0]
+    origins = tile_origins(1920, 640, 512)
+    assert origins[0] == 0 and origins[-1] == 1920 - 640
+    assert all(b - a <= 512 for a, b in zip(origins, origins[1:]))
+
+
+def test_make_tiles_are_views_with_origins():
+    img = np.zeros((1080, 1920, 3), np.uint8)
+    tiles, origins = make_tiles(img, 640, 0.2)
+    assert len(tiles) == len(origins)
+    assert all(t.shape == (640, 640, 3) and t.base is img for t in tiles)
+    assert origins[:, 0].max() == 1920 - 640 and origins[:, 1].max() == 1080 - 640
+
+
+def test_overlap_metrics():
+    boxes = arr([0, 0, 10, 10], [0, 0, 5, 10])   # Tweede box ligt helemaal in de eerste
+    assert overlap_matrix(boxes, "iou")[0, 1] == pytest.approx(0.5)
+    assert overlap_matrix(boxes, "ios")[0, 1] == pytest.approx(1.0)
+
+
+def test_fast_nms_suppresses_per_class():
+    boxes = arr([0, 0, 10, 10], [1, 0, 11, 10], [0, 0, 10, 10], [50, 50, 60, 60])
+    scores = arr(0.9, 0.8, 0.7, 0.6)
+    classes = np.array([0, 0, 1, 0])
+    keep, _, _ = fast_nms(boxes, scores, classes, thr=0.5, metric="iou")
+    assert sorted(keep.tolist()) == [0, 2, 3]   # 1 overlapt met 0 (zelfde klasse); 2 is een andere klasse
+
+
+def test_fast_nms_suppressed_box_does_not_suppress():
+    # 1 overlapt met 0 en met 2; 0 en 2 raken elkaar niet. Greedy: 1 valt weg, 2 blijft
+    boxes = arr([0, 0, 10, 10], [4, 0, 14, 10], [8, 0, 18, 10])
+    keep, _, _ = fast_nms(boxes, arr(0.9, 0.8, 0.7), np.zeros(3, int), thr=0.3, metric="iou")
+    assert sorted(keep.tolist()) == [0, 2]
+
+
+def test_weighted_fusion_keeps_chain_ends_apart():
+    boxes = arr([0, 0, 10, 10], [4, 0, 14, 10], [8, 0, 18, 10])
+    heads, fused, _ = weighted_fusion(boxes, arr(0.9, 0.8, 0.7), np.zeros(3, int), thr=0.3, metric="iou")
+    assert heads.tolist() == [0, 2]
+    np.testing.assert_allclose(fused[0], [3.2 / 1.7, 0, 10 + 3.2 / 1.7, 10], rtol=1e-6)   # 0 + 1
+    np.testing.assert_allclose(fused[1], boxes[2])
+
+
+def test_weighted_fusion_averages_clusters():
+    boxes = arr([0, 0, 10, 10], [2, 0, 12, 10], [100, 100, 110, 110])
+    scores = arr(0.75, 0.25, 0.5)
+    heads, fused, fused_scores = weighted_fusion(boxes, scores, np.zeros(3, int), thr=0.5, metric="iou")
+    assert heads.tolist() == [0, 2]
+    np.testing.assert_allclose(fused[0], [0.5, 0, 10.5, 10])   # 0.75 * 0 + 0.25 * 2
+    np.testing.assert_allclose(fused[1], boxes[2])
+    np.testing.assert_allclose(fused_scores, [0.5, 0.5])
+
+
+class Tensor:
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float32)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+
+class Boxes:
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy, self.conf, self.cls = Tensor(xyxy), Tensor(conf), Tensor(cls)
+
+    def __len__(self):
+        return len(self.xyxy.values)
+
+
+class FakeModel:
+    """Vindt in elk beeld één box op (10, 10, 30, 30), in de coördinaten van dat beeld"""
+
+    def __call__(self, imgs, **kwargs):
+        imgs = imgs if isinstance(imgs, list) else [imgs]
+        return [SimpleNamespace(boxes=Boxes([[10, 10, 30, 30]], [0.9], [0]), masks=None) for _ in imgs]
+
+
+@pytest.mark.parametrize("merge", ["nms", "wbf"])
+def test_infer_tiled_maps_to_frame_coordinates(merge):
+    img = np.zeros((100, 200, 3), np.uint8)
+    anns, timings = infer_tiled(FakeModel(), img, threading.Lock(), tile_size=100, tile_overlap=0.0,
+                                tile_full_frame=False, tile_merge=merge)
+    assert timings["tiles_n"] == 2 and timings["raw"] == 2
+    coords = sorted(a["coords"] for a in anns)
+    assert coords == [[10, 10, 30, 30], [110, 10, 130, 30]]
@@ -0,0 +1,131 @@
+import numpy as np
+
+
+def nearest_point(points, x, y, max_dist):
+    """Index van het dichtstbijzijnde punt binnen max_dist, of None. points: (N, 2) array."""
+    if len(points) == 0:
+        return None
+    d2 = np.einsum('ij,ij->i', points - (x, y), points - (x, y))
+    i = int(np.argmin(d2))
+    return i if d2[i] < max_dist * max_dist else None
+
+
+def nearest_segment(starts, ends, x, y, max_dist):
+    """
+    Dichtstbijzijnde lijnstuk (starts[i] -> ends[i]) binnen max_dist.
+    Geeft (index, afstand) terug, of None. Alles in één gevectoriseerde stap.
+    """
+    if len(starts) == 0:
+        return None
+    click = np.array([x, y], dtype=np.float64)
+    seg = ends - starts
+    len_sq = np.einsum('ij,ij->i', seg, seg)
+    # Projectie van de klik op elk lijnstuk, geklemd op [0, 1]; lijnstukken met lengte 0 vallen af
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.einsum('ij,ij->i', click - starts, seg) / len_sq
+    t = np.clip(np.nan_to_num(t), 0.0, 1.0)
+    proj = starts + t[:, None] * seg
+    dist = np.hypot(proj[:, 0] - x, proj[:, 1] - y)
+    dist[len_sq == 0] = np.inf
+    i = int(np.argmin(dist))
+    return (i, float(dist[i])) if dist[i] < max_dist else None
+
+
+class PolygonHitTester:
+    """
+    Houdt een (gesloten) polygoon bij als aaneengesloten float array in beeldcoördinaten
+    en beantwoordt "welk punt / welke lijn ligt het dichtst bij de klik" zonder Python loops.
+
+    Boven `grid_threshold` punten wordt een grid index gebruikt zodat een klik
+    alleen de punten en lijnen in de omliggende cellen bekijkt.
+    """
+
+    def __init__(self, points=None, grid_threshold=2000, cell_size=64.0):
+        self.grid_threshold = grid_threshold
+        self.cell_size = float(cell_size)
+        self.points = np.zeros((0, 2), dtype=np.float64)
+        self._grid = None
+        if points is not None:
+            self.set_points(points)
+
+    def __len__(self):
+        return len(self.points)
+
+    def set_points(self, points):
+        self.points = np.ascontiguousarray(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+        self._grid = None
+
+    def move(self, i, x, y):
+        self.points[i] = (x, y)
+        self._grid = None
+
+    def insert(self, i, x, y):
+        self.points = np.ascontiguousarray(np.insert(self.points, i, (x, y), axis=0))
+        self._grid = None
+
+    def remove(self, i):
+        self.points = np.ascontiguousarray(np.delete(self.points, i, axis=0))
+        self._grid = None
+
+    def edges(self):
+        """(starts, ends) van alle lijnstukken van de gesloten polygoon"""
+        return self.points, np.roll(self.points, -1, axis=0)
+
+    # --- GRID INDEX (alleen voor zeer grote polygonen) ---
+    def _build_grid(self):
+        starts, ends = self.edges()
+        lo = np.floor(np.minimum(starts, ends) / self.cell_size).astype(np.int64)
+        hi = np.floor(np.maximum(starts, ends) / self.cell_size).astype(np.int64)
+        grid = {}
+        for i in range(len(starts)):
+            for gx in range(lo[i, 0], hi[i, 0] + 1):
+                for gy in range(lo[i, 1], hi[i, 1] + 1):
+                    grid.setdefault((gx, gy), []).append(i)
+        self._grid = {k: np.array(v, dtype=np.int64) for k, v in grid.items()}
+
+    def _candidates(self, x, y, max_dist):
+        """Indices van lijnstukken (en dus hun startpunten) in de cellen rond (x, y)"""
+        if len(self.points) < self.grid_threshold:
+            return None
+        if self._grid is None:
+            self._build_grid()
+        r = int(np.ceil(max_dist / self.cell_size))
+        cx, cy = int(np.floor(x / self.cell_size)), int(np.floor(y / self.cell_size))
+        found = [self._grid[(gx, gy)]
+                 for gx in range(cx - r, cx + r + 1)
+                 for gy in range(cy - r, cy + r + 1)
+                 if (gx, gy) in self._grid]
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    # --- QUERIES ---
+    def nearest_vertex(self, x, y, max_dist):
+        cand = self._candidates(x, y, max_dist)
+        if cand is None:
+            return nearest_point(self.points, x, y, max_dist)
+        # Elk punt is het startpunt van een lijnstuk, dus de kandidaat-lijnen dekken alle punten
+        cand = np.unique(np.concatenate([cand, (cand + 1) % len(self.points)])) if len(cand) else cand
+        hit = nearest_point(self.points[cand], x, y, max_dist)
+        return None if hit is None else int(cand[hit])
+
+    def nearest_edge(self, x, y, max_dist):
+        """Index i van het lijnstuk punt[i] -> punt[i+1] binnen max_dist, of None"""
+        if len(self.points) < 2:
+            return None
+        starts, ends = self.edges()
+        cand = self._candidates(x, y, max_dist)
+        if cand is None:
+            hit = nearest_segment(starts, ends, x, y, max_dist)
+            return None if hit is None else hit[0]
+        hit = nearest_segment(starts[cand], ends[cand], x, y, max_dist)
+        return None if hit is None else int(cand[hit[0]])
+
+
+def box_edges(boxes):
+    """(starts, ends) van de 4 randen van elke box [x1, y1, x2, y2]; rand k hoort bij box k // 4"""
+    b = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    corners = np.stack([b[:, [0, 1]], b[:, [2, 1]], b[:, [2, 3]], b[:, [0, 3]]], axis=1)
+    starts = corners.reshape(-1, 2)
+    ends = np.roll(corners, -1, axis=1).reshape(-1, 2)
+    return starts, ends
@@ -0,0 +1,125 @@
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+# (pad, grootte, mtime) -> (breedte, hoogte); LRU, zodat lange sessies niet blijven groeien
+_size_cache = OrderedDict()
+_size_lock = threading.Lock()
+SIZE_CACHE_MAX = 8192
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# SOF markers met afmetingen (alle SOFn behalve DHT/JPG/DAC)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _png_size(f):
+    head = f.read(24)
+    if len(head) < 24 or head[:8] != _PNG_SIGNATURE or head[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", head[16:24])
+
+
+def _exif_orientation(data):
+    """Orientation tag uit een APP1/EXIF blok, of 1 als die er niet is"""
+    if data[:6] != b"Exif\x00\x00":
+        return 1
+    tiff = data[6:]
+    if len(tiff) < 8:
+        return 1
+    endian = "<" if tiff[:2] == b"II" else ">"
+    ifd = struct.unpack(endian + "I", tiff[4:8])[0]
+    if ifd + 2 > len(tiff):
+        return 1
+    count = struct.unpack(endian + "H", tiff[ifd:ifd + 2])[0]
+    for i in range(count):
+        entry = ifd + 2 + i * 12
+        if entry + 12 > len(tiff):
+            break
+        tag = struct.unpack(endian + "H", tiff[entry:entry + 2])[0]
+        if tag == 0x0112:
+            return struct.unpack(endian + "H", tiff[entry + 8:entry + 10])[0]
+    return 1
+
+
+def _jpeg_size(f):
+    if f.read(2) != b"\xff\xd8":
+        return None
+    orientation = 1
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue  # Markers zonder lengte
+        if marker == 0xD9:
+            return None
+        raw = f.read(2)
+        if len(raw) < 2:
+            return None
+        length = struct.unpack(">H", raw)[0]
+        if marker in _JPEG_SOF:
+            seg = f.read(5)
+            if len(seg) < 5:
+                return None
+            h, w = struct.unpack(">HH", seg[1:5])
+            # cv2.imread draait het beeld volgens EXIF; oriëntaties 5-8 wisselen breedte en hoogte
+            if orientation >= 5:
+                w, h = h, w
+            return w, h
+        if marker == 0xE1:
+            # APP1 is ook XMP e.d.: alleen het EXIF blok bepaalt de oriëntatie
+            head = f.read(min(6, length - 2))
+            if head == b"Exif\x00\x00":
+                orientation = _exif_orientation(head + f.read(length - 8))
+            else:
+                f.seek(length - 2 - len(head), os.SEEK_CUR)
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image_size(path):
+    """Afmetingen (breedte, hoogte) uit de bestandsheader, zonder pixels te decoderen"""
+    with open(path, "rb") as f:
+        head = f.read(2)
+        f.seek(0)
+        if head == b"\xff\xd8":
+            size = _jpeg_size(f)
+        elif head == b"\x89P":
+            size = _png_size(f)
+        else:
+            size = None
+    if size is None:
+        # Onbekend of afwijkend formaat: dan toch decoderen
+        import cv2
+        img = cv2.imread(path)
+        if img is None:
+            return None
+        size = (img.shape[1], img.shape[0])
+    return size
+
+
+def image_size(path):
+    """Zoals read_image_size, maar met een cache in het geheugen (ongeldig als het bestand verandert)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (path, st.st_size, st.st_mtime_ns)
+    with _size_lock:
+        size = _size_cache.get(key)
+        if size is not None:
+            _size_cache.move_to_end(key)
+    if size is None:
+        size = read_image_size(path)
+        if size is not None:
+            with _size_lock:
+                _size_cache[key] = size
+                while len(_size_cache) > SIZE_CACHE_MAX:
+                    _size_cache.popitem(last=False)
+    return size
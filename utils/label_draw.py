@@ -0,0 +1,32 @@
+import os
+
+import cv2
+import numpy as np
+
+
+def draw_yolo_labels(img, lbl_path, color=(0, 255, 0), thickness=2):
+    """Tekent een YOLO labelbestand (boxen en polygonen, genormaliseerd) op `img` (in-place)"""
+    if not os.path.exists(lbl_path):
+        return img
+    h, w = img.shape[:2]
+    with open(lbl_path, 'r') as f:
+        for line in f.readlines():
+            try:
+                parts = list(map(float, line.strip().split()))
+                if not parts:
+                    continue
+                coords = parts[1:]
+
+                if len(coords) == 4:  # Bounding Box
+                    cx, cy, bw, bh = coords
+                    x1 = int((cx - bw / 2) * w)
+                    y1 = int((cy - bh / 2) * h)
+                    x2 = int((cx + bw / 2) * w)
+                    y2 = int((cy + bh / 2) * h)
+                    cv2.rectangle(img, (x1, y1), (x2, y2), color, thickness)
+                elif len(coords) > 4:  # Segmentatie/Polygoon
+                    pts = (np.array(coords, dtype=np.float64).reshape(-1, 2) * (w, h)).astype(np.int32)
+                    cv2.polylines(img, [pts.reshape((-1, 1, 2))], True, color, thickness)
+            except Exception as e:
+                print(f"Fout bij lezen label: {e}")
+    return img
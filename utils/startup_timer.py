@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """
+    Houdt bij waar de opstarttijd heen gaat: imports, venster, en het (uitgestelde) bouwen van elk tabblad.
+
+    mark() sluit een fase af (tijd sinds de vorige mark), measure() meet een los blok
+    (bv. een tab die pas bij de eerste activatie gebouwd wordt).
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []          # (naam, ms) in volgorde
+        self.window_ms = None     # Tijd tot het venster zichtbaar was
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    @contextmanager
+    def measure(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - t0) * 1000))
+
+    def window_shown(self):
+        self.mark("venster")
+        self.window_ms = self.elapsed_ms()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def summary(self):
+        parts = ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.phases)
+        shown = f"venster na {self.window_ms:.0f} ms | " if self.window_ms is not None else ""
+        return f"Opstarten: {shown}{parts}"
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,92 @@
+import math
+
+import cv2
+
+
+class ImagePyramid:
+    """
+    Multi-level versie van één beeld (niveau 0 = origineel, elk volgend niveau half zo groot).
+    Niveaus worden pas aangemaakt als ze nodig zijn en blijven daarna bewaard.
+
+    Als niveau 0 zelf al verkleind gedecodeerd is, geeft `full_size` de echte afmetingen;
+    width/height (en dus alle coördinaten) blijven dan in volle resolutie.
+    """
+
+    def __init__(self, img, min_size=256, full_size=None):
+        self.levels = [img]
+        self.min_size = min_size
+        self.full_size = full_size
+
+    @property
+    def width(self):
+        return self.full_size[0] if self.full_size else self.levels[0].shape[1]
+
+    @property
+    def height(self):
+        return self.full_size[1] if self.full_size else self.levels[0].shape[0]
+
+    @property
+    def base_reduction(self):
+        """Bronpixels per pixel van niveau 0 (1.0 als niveau 0 de volle resolutie is)"""
+        return self.width / self.levels[0].shape[1]
+
+    def level(self, k):
+        while len(self.levels) <= k:
+            prev = self.levels[-1]
+            if max(prev.shape[:2]) <= self.min_size:
+                break
+            self.levels.append(cv2.pyrDown(prev))
+        return min(k, len(self.levels) - 1), self.levels[min(k, len(self.levels) - 1)]
+
+    def level_for_scale(self, scale):
+        """Kleinste niveau dat bij deze zoom nog minstens 1 bronpixel per schermpixel heeft"""
+        eff = scale * self.base_reduction
+        if eff >= 1.0:
+            return self.level(0)
+        k = int(math.floor(math.log2(1.0 / eff)))
+        return self.level(k)
+
+
+def render_viewport(pyramid, scale, offset, canvas_w, canvas_h):
+    """
+    Rendert alleen het zichtbare deel van het beeld.
+
+    :param scale: schermpixels per bronpixel (niveau 0)
+    :param offset: canvas positie (x, y) van de linkerbovenhoek van het beeld
+    :return: (array, (x, y)) klaar om op het canvas te zetten, of (None, None) als niets zichtbaar is
+    """
+    ox, oy = offset
+    w, h = pyramid.width, pyramid.height
+
+    # Zichtbaar gebied in bron-coördinaten
+    x0 = max(0.0, -ox / scale)
+    y0 = max(0.0, -oy / scale)
+    x1 = min(float(w), (canvas_w - ox) / scale)
+    y1 = min(float(h), (canvas_h - oy) / scale)
+    if x1 <= x0 or y1 <= y0:
+        return None, None
+
+    k, lvl = pyramid.level_for_scale(scale)
+    lh, lw = lvl.shape[:2]
+    fx, fy = w / lw, h / lh  # bronpixels per niveau-pixel
+
+    # Naar hele niveau-pixels afronden (naar buiten), zodat de randen altijd gevuld zijn
+    lx0, ly0 = int(math.floor(x0 / fx)), int(math.floor(y0 / fy))
+    lx1, ly1 = min(lw, int(math.ceil(x1 / fx))), min(lh, int(math.ceil(y1 / fy)))
+    crop = lvl[ly0:ly1, lx0:lx1]
+    if crop.size == 0:
+        return None, None
+
+    # Positie en grootte van de crop op het canvas
+    cx0 = ox + lx0 * fx * scale
+    cy0 = oy + ly0 * fy * scale
+    cx1 = ox + lx1 * fx * scale
+    cy1 = oy + ly1 * fy * scale
+    out_w = max(1, int(round(cx1 - cx0)))
+    out_h = max(1, int(round(cy1 - cy0)))
+
+    # Inzoomen: scherpe pixels (nearest); uitzoomen: area voor een rustig beeld
+    zoom = out_w / crop.shape[1]
+    interp = cv2.INTER_NEAREST if zoom >= 1.0 else cv2.INTER_AREA
+    rendered = cv2.resize(crop, (out_w, out_h), interpolation=interp)
+    return rendered, (int(round(cx0)), int(round(cy0)))